@@ -1,7 +1,54 @@
 import os
+import time
+from functools import lru_cache
 import streamlit as st
 from langchain_groq import ChatGroq
 
+
+@lru_cache(maxsize=32)
+def build_chat_groq(api_key, model):
+    """
+    One ChatGroq client (and its HTTP connection pool) per API key and model, reused
+    across messages and sessions instead of being constructed on every message.
+    """
+    started = time.perf_counter()
+    llm = ChatGroq(api_key=api_key, model=model)
+    print(f"ChatGroq client for {model} constructed in {(time.perf_counter() - started) * 1000:.1f} ms")
+    return llm
+
+# LLM_ROUTER=1 routes calls over all configured Groq models (the selected one plus the
+# other GROQ_MODEL_OPTIONS), picking the fastest healthy one per call; LLM_ROUTER=fake
+# routes over offline fake providers. OpenAI joins only when the operator opts in with
+# LLM_ROUTER_OPENAI_MODEL (e.g. gpt-4o-mini): its calls are billed to the server's
+# OPENAI_API_KEY for every user, so a key in the environment alone does not enable it.
+LLM_ROUTER = os.getenv("LLM_ROUTER", "")
+LLM_ROUTER_OPENAI_MODEL = os.getenv("LLM_ROUTER_OPENAI_MODEL", "")
+ROUTER_CAPABILITIES = ("chat", "tools", "structured_output")
+
+
+@lru_cache(maxsize=8)
+def build_router(api_key, selected_model, mode):
+    """One router per key/model/mode, so its latency statistics persist across messages."""
+    from src.langgraphagenticai.LLMS.llm_router import RouterChatModel, Provider, FakeChatModel
+    if mode == "fake":
+        providers = [
+            Provider("fake:fast", FakeChatModel(name="fast", latency=(0.05, 0.1)), ROUTER_CAPABILITIES),
+            Provider("fake:slow-tail", FakeChatModel(name="slow-tail", latency=(0.05, 1.5)), ROUTER_CAPABILITIES),
+            Provider("fake:flaky", FakeChatModel(name="flaky", error_rate=0.3), ROUTER_CAPABILITIES),
+        ]
+    else:
+        from src.langgraphagenticai.ui.uiconfigfile import Config
+        models = [selected_model] + [m for m in Config().get_groq_model_options() if m != selected_model]
+        providers = [Provider(f"groq:{m}", build_chat_groq(api_key, m), ROUTER_CAPABILITIES) for m in models]
+        if LLM_ROUTER_OPENAI_MODEL and os.getenv("OPENAI_API_KEY"):
+            from langchain_openai import ChatOpenAI
+            providers.append(Provider(f"openai:{LLM_ROUTER_OPENAI_MODEL}",
+                                      ChatOpenAI(model=LLM_ROUTER_OPENAI_MODEL, api_key=os.getenv("OPENAI_API_KEY")),
+                                      ROUTER_CAPABILITIES))
+    print(f"LLM router over {[provider.name for provider in providers]}")
+    return RouterChatModel(providers=providers)
+
+
 class GroqLLM:
     def __init__(self,user_contols_input):
         self.user_controls_input=user_contols_input
@@ -13,8 +60,11 @@ class GroqLLM:
             if groq_api_key=='' and os.environ["GROQ_API_KEY"] =='':
                 st.error("Please Enter the Groq API KEY")
 
-            llm=ChatGroq(api_key=groq_api_key,model=selected_groq_model)
+            if LLM_ROUTER:
+                llm=build_router(groq_api_key,selected_groq_model,LLM_ROUTER)
+            else:
+                llm=build_chat_groq(groq_api_key,selected_groq_model)
 
         except Exception as e:
             raise ValueError(f"Error Ocuured With Exception : {e}")
-        return llm
\ No newline at end of file
+        return llm
@@ -0,0 +1,69 @@
+import asyncio
+import os
+import queue
+import threading
+
+# Async execution mode for the graphs.
+#
+# Every Streamlit session runs its script on its own thread. In async mode the graphs
+# are not run on those threads: they run as `astream` tasks on ONE event loop shared
+# by all sessions (a daemon thread started on first use), with async Groq and Tavily
+# clients, so waiting on the LLM or the search API costs no thread at all. Events are
+# handed back to the session's thread through a queue as soon as they are produced.
+#
+# The default, GRAPH_EXECUTION_MODE=sync, keeps the original behaviour (graph.stream on
+# the session thread); set GRAPH_EXECUTION_MODE=async to opt in to the shared loop.
+GRAPH_EXECUTION_MODE = os.getenv("GRAPH_EXECUTION_MODE", "sync")
+
+_DONE = object()
+_loop = None
+_lock = threading.Lock()
+
+
+def is_async_mode():
+    return GRAPH_EXECUTION_MODE == "async"
+
+
+def get_event_loop():
+    """The event loop shared by all sessions, running on a daemon thread."""
+    global _loop
+    with _lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="graph-event-loop", daemon=True).start()
+        return _loop
+
+
+def run_coroutine(coroutine):
+    """Runs `coroutine` on the shared loop and waits for its result."""
+    return asyncio.run_coroutine_threadsafe(coroutine, get_event_loop()).result()
+
+
+def iterate_astream(graph, graph_input, config=None, **kwargs):
+    """
+    Synchronous iterator over `graph.astream(graph_input, config, **kwargs)` executed on
+    the shared loop. Events are yielded as they arrive; errors are re-raised here.
+    """
+    events = queue.Queue()
+
+    async def pump():
+        try:
+            async for event in graph.astream(graph_input, config, **kwargs):
+                events.put(event)
+        except BaseException as e:
+            events.put(e)
+        finally:
+            events.put(_DONE)
+
+    future = asyncio.run_coroutine_threadsafe(pump(), get_event_loop())
+    try:
+        while True:
+            event = events.get()
+            if event is _DONE:
+                return
+            if isinstance(event, BaseException):
+                raise event
+            yield event
+    finally:
+        # Session stopped reading (e.g. Streamlit rerun): stop the graph task too
+        future.cancel()
@@ -0,0 +1,66 @@
+import os
+import threading
+
+# Thread-scoped conversation memory for the chat use cases.
+#
+# CHECKPOINT_BACKEND=sqlite (default) keeps conversations in CHECKPOINT_DB, so they survive
+# an app restart; CHECKPOINT_BACKEND=memory keeps them in process memory only. One
+# checkpointer is shared by every compiled graph, and each Streamlit session talks to its
+# own thread_id (held in st.session_state, never in the URL), so sessions never see each
+# other's turns.
+#
+# Per step LangGraph stores the node's writes (the new messages only) and a new blob
+# only for channels whose version changed; the UI sends only the new user message.
+CHECKPOINT_BACKEND = os.getenv("CHECKPOINT_BACKEND", "sqlite")
+CHECKPOINT_DB = os.getenv("CHECKPOINT_DB", "./chat_checkpoints.sqlite3")
+CHECKPOINTED_USECASES = ("Basic Chatbot", "Chatbot With Web")
+
+_checkpointer = None
+_async_checkpointer = None
+_lock = threading.Lock()
+
+
+def get_checkpointer():
+    """The process-wide checkpointer, created on first use."""
+    global _checkpointer
+    with _lock:
+        if _checkpointer is None:
+            if CHECKPOINT_BACKEND == "memory":
+                from langgraph.checkpoint.memory import MemorySaver
+                _checkpointer = MemorySaver()
+            else:
+                import sqlite3
+                from langgraph.checkpoint.sqlite import SqliteSaver  # pip install langgraph-checkpoint-sqlite
+                # Streamlit serves sessions from several threads; SqliteSaver serializes access
+                connection = sqlite3.connect(CHECKPOINT_DB, check_same_thread=False)
+                _checkpointer = SqliteSaver(connection)
+            print(f"Conversation checkpointer: {CHECKPOINT_BACKEND}")
+        return _checkpointer
+
+
+def get_async_checkpointer():
+    """
+    Checkpointer for graphs run with astream on the shared event loop. In-memory threads
+    are shared with the sync checkpointer; SQLite uses AsyncSqliteSaver on the same file.
+    """
+    global _async_checkpointer
+    if CHECKPOINT_BACKEND == "memory":
+        return get_checkpointer()
+    with _lock:
+        if _async_checkpointer is None:
+            import aiosqlite
+            from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+            from src.langgraphagenticai.graph.async_runner import run_coroutine
+
+            async def connect():
+                # The connection belongs to the loop that creates it: the shared graph loop
+                return AsyncSqliteSaver(await aiosqlite.connect(CHECKPOINT_DB))
+
+            _async_checkpointer = run_coroutine(connect())
+            print("Conversation checkpointer: async sqlite")
+        return _async_checkpointer
+
+
+def thread_config(thread_id, usecase):
+    """Run config of one conversation: a session keeps one thread per chat use case."""
+    return {"configurable": {"thread_id": f"{thread_id}:{usecase}"}}
@@ -1,11 +1,14 @@
 from langgraph.graph import StateGraph
-from src.langgraphagenticai.state.state import State
+from src.langgraphagenticai.state.state import State, AINewsState
 from langgraph.graph import START,END
 from src.langgraphagenticai.nodes.basic_chatbot_node import BasicChatbotNode
 from src.langgraphagenticai.tools.search_tool import get_tools,create_tool_node
 from langgraph.prebuilt import tools_condition,ToolNode
 from src.langgraphagenticai.nodes.chatbot_with_Tool_node import ChatbotWithToolNode
 from src.langgraphagenticai.nodes.ai_news_node import AINewsNode
+from src.langgraphagenticai.graph.checkpointer import get_checkpointer, get_async_checkpointer, CHECKPOINTED_USECASES
+from src.langgraphagenticai.graph.async_runner import is_async_mode
+from langchain_core.runnables import RunnableLambda
 
 
 class GraphBuilder:
@@ -23,7 +26,8 @@ class GraphBuilder:
 
         self.basic_chatbot_node=BasicChatbotNode(self.llm)
 
-        self.graph_builder.add_node("chatbot",self.basic_chatbot_node.process)
+        # Sync and async implementations: graph.stream uses the first, graph.astream the second
+        self.graph_builder.add_node("chatbot",RunnableLambda(self.basic_chatbot_node.process,afunc=self.basic_chatbot_node.aprocess))
         self.graph_builder.add_edge(START,"chatbot")
         self.graph_builder.add_edge("chatbot",END)
 
@@ -57,6 +61,8 @@ class GraphBuilder:
 
     def ai_news_builder_graph(self):
 
+        # The news nodes exchange frequency/news_data/summary through the graph state
+        self.graph_builder=StateGraph(AINewsState)
         ai_news_node=AINewsNode(self.llm)
 
         ## added the nodes
@@ -88,4 +94,8 @@ class GraphBuilder:
         if usecase == "AI News":
             self.ai_news_builder_graph()
 
+        if usecase in CHECKPOINTED_USECASES:
+            # Chat turns accumulate per thread_id, so each call only sends the new message
+            checkpointer = get_async_checkpointer() if is_async_mode() else get_checkpointer()
+            return self.graph_builder.compile(checkpointer=checkpointer)
         return self.graph_builder.compile()
@@ -0,0 +1,105 @@
+import hashlib
+import threading
+import time
+
+
+def model_name(model):
+    """Name of the chat model (ChatGroq exposes it as `model_name`)."""
+    return getattr(model, "model_name", None) or getattr(model, "model", None) or type(model).__name__
+
+
+def api_key_fingerprint(model):
+    """
+    Short hash of the model's API key. Graphs bind the model client, so two users with
+    different keys must never share a compiled graph; the key itself is never stored.
+    """
+    if hasattr(model, "providers"):
+        # LLM router: the key material of all its providers
+        return api_key_fingerprint_of(provider.model for provider in model.providers)
+    return api_key_fingerprint_of([model])
+
+
+def api_key_fingerprint_of(models):
+    digest = hashlib.sha256()
+    for model in models:
+        secret = getattr(model, "groq_api_key", None) or getattr(model, "openai_api_key", None)
+        if secret is not None:
+            value = secret.get_secret_value() if hasattr(secret, "get_secret_value") else str(secret)
+            digest.update(value.encode("utf-8"))
+    return digest.hexdigest()[:12]
+
+
+def tool_names(usecase):
+    """Names of the tools the use case's graph is built with (part of the cache key)."""
+    if usecase == "Chatbot With Web":
+        from src.langgraphagenticai.tools.search_tool import get_tools
+        return tuple(sorted(our_tool.name for our_tool in get_tools()))
+    return ()
+
+
+class CompiledGraphCache:
+    """
+    Process-wide cache of compiled graphs keyed by (use case, model name, tool set).
+
+    The nodes keep no per-request data, so one compiled graph is safely reused by every
+    message of every session. The first request for a key builds and compiles the graph
+    while concurrent requests for the same key wait for it instead of compiling again.
+    """
+
+    def __init__(self):
+        self.graphs = {}  # key -> (compiled graph, build time in ms)
+        self.build_locks = {}
+        self.hits = 0
+        self.misses = 0
+        self.saved_ms = 0.0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def make_key(usecase, model):
+        return (usecase, model_name(model), tool_names(usecase), api_key_fingerprint(model))
+
+    def get(self, usecase, model):
+        """Returns the compiled graph for `usecase` bound to `model`, building it on first use."""
+        started = time.perf_counter()
+        key = self.make_key(usecase, model)
+
+        with self.lock:
+            build_lock = self.build_locks.setdefault(key, threading.Lock())
+        with build_lock:
+            with self.lock:
+                cached = self.graphs.get(key)
+                if cached is not None:
+                    self.hits += 1
+                    self.saved_ms += cached[1]
+            if cached is not None:
+                print(f"Graph cache hit {key[:3]}: ready in {(time.perf_counter() - started) * 1000:.1f} ms "
+                      f"(build took {cached[1]:.1f} ms)")
+                return cached[0]
+
+            from src.langgraphagenticai.graph.graph_builder import GraphBuilder
+            build_started = time.perf_counter()
+            graph = GraphBuilder(model).setup_graph(usecase)
+            build_ms = (time.perf_counter() - build_started) * 1000
+            with self.lock:
+                self.graphs[key] = (graph, build_ms)
+                self.misses += 1
+        print(f"Graph cache miss {key[:3]}: built and compiled in {build_ms:.1f} ms")
+        return graph
+
+    def clear(self):
+        with self.lock:
+            self.graphs.clear()
+            self.build_locks.clear()
+
+    def stats(self):
+        with self.lock:
+            return {"graphs": len(self.graphs), "hits": self.hits, "misses": self.misses,
+                    "saved_ms": round(self.saved_ms, 1)}
+
+
+_graph_cache = CompiledGraphCache()
+
+
+def get_graph_cache():
+    """The compiled graphs shared by every session in this process."""
+    return _graph_cache
@@ -1,7 +1,6 @@
+import time
 import streamlit as st
 from src.langgraphagenticai.ui.streamlitui.loadui import LoadStreamlitUI
-from src.langgraphagenticai.LLMS.groqllm import GroqLLM
-from src.langgraphagenticai.graph.graph_builder import GraphBuilder
 from src.langgraphagenticai.ui.streamlitui.display_result import DisplayResultStreamlit
 
 def load_langgraph_agenticai_app():
@@ -21,6 +20,10 @@ def load_langgraph_agenticai_app():
         st.error("Error: Failed to load user input from the UI.")
         return
     
+    if user_input.get("thread_id"):
+        # Earlier turns of this session's conversation (no graph or LLM needed)
+        DisplayResultStreamlit.display_chat_history(user_input["selected_usecase"], user_input["thread_id"])
+
     # Text input for user message
     if st.session_state.IsFetchButtonClicked:
         user_message = st.session_state.timeframe 
@@ -28,10 +31,17 @@ def load_langgraph_agenticai_app():
         user_message = st.chat_input("Enter your message:")
 
     if user_message:
+        # Imported on first message: langchain_groq, langgraph and the Tavily tools are
+        # the slowest imports of the app and are not needed to render the UI
+        from src.langgraphagenticai.LLMS.groqllm import GroqLLM
+        from src.langgraphagenticai.graph.graph_cache import get_graph_cache
+
         try:
-            ## Configure The LLM's
+            ## Configure The LLM's (the client is cached per API key and model)
+            started=time.perf_counter()
             obj_llm_config=GroqLLM(user_contols_input=user_input)
             model=obj_llm_config.get_llm_model()
+            llm_ms=(time.perf_counter()-started)*1000
 
             if not model:
                 st.error("Error: LLM model could not be initialized")
@@ -43,14 +53,24 @@ def load_langgraph_agenticai_app():
             if not usecase:
                     st.error("Error: No use case selected.")
                     return
+
+            if usecase == "AI News":
+                # Keeps the daily/weekly/monthly digests precomputed for every viewer,
+                # with the server's own Groq key (never this user's)
+                from src.langgraphagenticai.scheduler.news_digest_scheduler import ensure_news_scheduler
+                ensure_news_scheduler()
             
-            ## Graph Builder
+            ## Graph Builder: compiled once per (use case, model, tools) and reused
 
-            graph_builder=GraphBuilder(model)
             try:
-                 graph=graph_builder.setup_graph(usecase)
+                 started=time.perf_counter()
+                 graph=get_graph_cache().get(usecase,model)
+                 graph_ms=(time.perf_counter()-started)*1000
+                 print(f"Per-message setup: LLM {llm_ms:.1f} ms, graph {graph_ms:.1f} ms, "
+                       f"cache {get_graph_cache().stats()}")
                  print(user_message)
-                 DisplayResultStreamlit(usecase,graph,user_message).display_result_on_ui()
+                 DisplayResultStreamlit(usecase,graph,user_message,user_input.get("thread_id"),
+                                        user_input.get("TAVILY_API_KEY")).display_result_on_ui()
             except Exception as e:
                  st.error(f"Error: Graph set up failed- {e}")
                  return
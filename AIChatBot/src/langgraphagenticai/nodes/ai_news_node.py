@@ -1,89 +1,234 @@
-from tavily import TavilyClient
+import glob
+import os
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
 from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import RunnableConfig
+from src.langgraphagenticai.tools.search_cache import get_search_cache, tavily_key_from_config
+
+NEWS_QUERY = "Top Artificial Intelligence (AI) technology news India and globally"
+TIME_RANGE_MAP = {'daily': 'd', 'weekly': 'w', 'monthly': 'm', 'year': 'y'}
+DAYS_MAP = {'daily': 1, 'weekly': 7, 'monthly': 30, 'year': 366}
+IST = timezone(timedelta(hours=5, minutes=30))
+MAX_ARTICLE_CHARS = 6000
+SUMMARY_WORKERS = 8
+ARTICLE_CACHE_SIZE = 2000
+NEWS_DIR = "./AINews"
+REQUEST_FILE_TTL = 24 * 3600
+
+ARTICLE_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", "Summarize this AI news article in one or two concise sentences. Reply with the summary only."),
+    ("user", "Title: {title}\nContent: {content}")
+])
+
+
+def search_news(frequency: str, api_key: str = None) -> list:
+    """Tavily news search for the frequency with `api_key` (served from the shared search cache)."""
+    response = get_search_cache().search(
+        NEWS_QUERY,
+        use_case=f"news_{frequency}",
+        api_key=api_key,
+        topic="news",
+        time_range=TIME_RANGE_MAP[frequency],
+        include_answer="advanced",
+        max_results=20,
+        days=DAYS_MAP[frequency],
+        # include_domains=["techcrunch.com", "venturebeat.com/ai", ...]  # Uncomment and add domains if needed
+    )
+    return response.get('results', [])
+
+
+def to_ist_date(published_date: str) -> str:
+    """Tavily dates ('Mon, 14 Oct 2024 10:00:00 GMT' or ISO) as YYYY-MM-DD in IST ('' if unknown)."""
+    if not published_date:
+        return ""
+    try:
+        parsed = parsedate_to_datetime(published_date)
+    except (TypeError, ValueError):
+        try:
+            parsed = datetime.fromisoformat(published_date)
+        except ValueError:
+            return ""
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(IST).strftime("%Y-%m-%d")
+
+
+def summarize_article(llm, item: dict) -> dict:
+    """One-article summary entry: {'url', 'title', 'date', 'summary'}."""
+    # One article per call keeps every prompt far below small context windows (8k for llama3-8b)
+    response = llm.invoke(ARTICLE_PROMPT.format(
+        title=item.get('title', ''),
+        content=item.get('content', '')[:MAX_ARTICLE_CHARS],
+    ))
+    return {
+        'url': item.get('url', ''),
+        'title': item.get('title', ''),
+        'date': to_ist_date(item.get('published_date', '')),
+        'summary': response.content.strip(),
+    }
+
+
+class ArticleSummaryCache:
+    """Thread-safe LRU of article summaries by URL, shared by all graphs in the process."""
+
+    def __init__(self, max_entries=ARTICLE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, url):
+        with self.lock:
+            entry = self.entries.get(url)
+            if entry is not None:
+                self.entries.move_to_end(url)
+            return entry
+
+    def put(self, url, entry):
+        with self.lock:
+            self.entries[url] = entry
+            self.entries.move_to_end(url)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+
+article_summary_cache = ArticleSummaryCache()
+
+
+def summarize_articles(llm, news_items: list, max_workers: int = SUMMARY_WORKERS) -> list:
+    """
+    Map step: summarizes every article in parallel, skipping URLs already in the
+    cache. Returns the summary entries in the order of `news_items`, so total
+    latency is that of the slowest article rather than of all articles combined.
+    A failed article falls back to its title (marked 'failed') instead of failing
+    the digest; fallbacks are not cached.
+    """
+    entries = [article_summary_cache.get(item.get('url', '')) for item in news_items]
+    missing = [i for i, entry in enumerate(entries) if entry is None]
+
+    def summarize(i):
+        item = news_items[i]
+        try:
+            entry = summarize_article(llm, item)
+        except Exception as e:
+            print(f"Error summarizing {item.get('url', '')}: {e}")
+            return {
+                'url': item.get('url', ''),
+                'title': item.get('title', ''),
+                'date': to_ist_date(item.get('published_date', '')),
+                'summary': item.get('title', '') or item.get('url', ''),
+                'failed': True,  # summarized again on the next request or refresh
+            }
+        if entry['url']:
+            article_summary_cache.put(entry['url'], entry)
+        return entry
+
+    started = time.perf_counter()
+    if missing:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for i, entry in zip(missing, executor.map(summarize, missing)):
+                entries[i] = entry
+    print(f"Summarized {len(missing)} of {len(news_items)} articles "
+          f"({len(news_items) - len(missing)} cached) in {time.perf_counter() - started:.1f}s")
+    return entries
+
+
+def format_news_markdown(articles: list) -> str:
+    """Article summaries as markdown grouped by date, latest first."""
+    by_date = {}
+    for article in articles:
+        by_date.setdefault(article['date'] or "Undated", []).append(article)
+
+    sections = []
+    # "Undated" sorts after the YYYY-MM-DD dates when reversed
+    for date in sorted(by_date, key=lambda d: (d != "Undated", d), reverse=True):
+        lines = [f"### {date}"]
+        lines += [f"- [{article['summary']}]({article['url']})" for article in by_date[date]]
+        sections.append("\n".join(lines))
+    return "\n\n".join(sections)
+
+
+def write_atomic(path: str, content: str):
+    """Writes via a temp file + os.replace, so readers never see a partial file."""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+
+
+def prune_request_files(frequency: str, max_age_seconds: int = REQUEST_FILE_TTL):
+    """Deletes per-request summaries older than `max_age_seconds`."""
+    now = time.time()
+    for path in glob.glob(os.path.join(NEWS_DIR, f"{frequency}_summary_*.md")):
+        try:
+            if now - os.path.getmtime(path) > max_age_seconds:
+                os.unlink(path)
+        except OSError:
+            pass  # already removed by a concurrent request
 
 
 class AINewsNode:
     def __init__(self,llm):
         """
         Initialize the AINewsNode with API keys for Tavily and GROQ.
+        The node keeps no per-request data: everything flows through AINewsState.
         """
-        self.tavily = TavilyClient()
         self.llm = llm
-        # this is used to capture various steps in this file so that later can be use for steps shown
-        self.state = {}
 
-    def fetch_news(self, state: dict) -> dict:
+    def fetch_news(self, state: dict, config: RunnableConfig) -> dict:
         """
         Fetch AI news based on the specified frequency.
         
         Args:
-            state (dict): The state dictionary containing 'frequency'.
+            state (dict): The state dictionary whose first message is the frequency.
+            config (RunnableConfig): Run config carrying the session's Tavily key.
         
         Returns:
-            dict: Updated state with 'news_data' key containing fetched news.
+            dict: State update with 'frequency' and 'news_data' (fetched news).
         """
 
         frequency = state['messages'][0].content.lower()
-        self.state['frequency'] = frequency
-        time_range_map = {'daily': 'd', 'weekly': 'w', 'monthly': 'm', 'year': 'y'}
-        days_map = {'daily': 1, 'weekly': 7, 'monthly': 30, 'year': 366}
-
-        response = self.tavily.search(
-            query="Top Artificial Intelligence (AI) technology news India and globally",
-            topic="news",
-            time_range=time_range_map[frequency],
-            include_answer="advanced",
-            max_results=20,
-            days=days_map[frequency],
-            # include_domains=["techcrunch.com", "venturebeat.com/ai", ...]  # Uncomment and add domains if needed
-        )
-
-        state['news_data'] = response.get('results', [])
-        self.state['news_data'] = state['news_data']
-        return state
+        return {'frequency': frequency, 'news_data': search_news(frequency, tavily_key_from_config(config))}
     
 
     def summarize_news(self, state: dict) -> dict:
         """
-        Summarize the fetched news using an LLM.
+        Summarize the fetched news with a per-article map step and a formatting merge step.
         
         Args:
             state (dict): The state dictionary containing 'news_data'.
         
         Returns:
-            dict: Updated state with 'summary' key containing the summarized news.
+            dict: State update with 'summary' containing the summarized news.
         """
 
-        news_items = self.state['news_data']
-
-        prompt_template = ChatPromptTemplate.from_messages([
-            ("system", """Summarize AI news articles into markdown format. For each item include:
-            - Date in **YYYY-MM-DD** format in IST timezone
-            - Concise sentences summary from latest news
-            - Sort news by date wise (latest first)
-            - Source URL as link
-            Use format:
-            ### [Date]
-            - [Summary](URL)"""),
-            ("user", "Articles:\n{articles}")
-        ])
-
-        articles_str = "\n\n".join([
-            f"Content: {item.get('content', '')}\nURL: {item.get('url', '')}\nDate: {item.get('published_date', '')}"
-            for item in news_items
-        ])
-
-        response = self.llm.invoke(prompt_template.format(articles=articles_str))
-        state['summary'] = response.content
-        self.state['summary'] = state['summary']
-        return self.state
+        # Map: one short LLM call per article (in parallel, cached by URL)
+        articles = summarize_articles(self.llm, state['news_data'])
+        # Reduce: sort by date and format the markdown without another LLM call
+        return {'summary': format_news_markdown(articles)}
     
     def save_result(self,state):
-        frequency = self.state['frequency']
-        summary = self.state['summary']
-        filename = f"./AINews/{frequency}_summary.md"
-        with open(filename, 'w') as f:
-            f.write(f"# {frequency.capitalize()} AI News Summary\n\n")
-            f.write(summary)
-        self.state['filename'] = filename
-        return self.state
\ No newline at end of file
+        """
+        Writes this request's summary to its own file and atomically replaces the
+        shared {frequency}_summary.md, so concurrent requests never clobber each other.
+        """
+        frequency = state['frequency']
+        content = f"# {frequency.capitalize()} AI News Summary\n\n{state['summary']}"
+
+        filename = os.path.join(NEWS_DIR, f"{frequency}_summary_{uuid.uuid4().hex[:12]}.md")
+        write_atomic(filename, content)
+        write_atomic(os.path.join(NEWS_DIR, f"{frequency}_summary.md"), content)
+        prune_request_files(frequency)
+        return {'filename': filename}
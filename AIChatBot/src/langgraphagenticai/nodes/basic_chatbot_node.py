@@ -1,4 +1,6 @@
+import asyncio
 from src.langgraphagenticai.state.state import State
+from src.langgraphagenticai.nodes.context_window import prepare_model_input
 
 class BasicChatbotNode:
     """
@@ -11,5 +13,13 @@ class BasicChatbotNode:
         """
         Processes the input state and generates a chatbot response.
         """
-        return {"messages":self.llm.invoke(state['messages'])}
+        return {"messages":self.llm.invoke(prepare_model_input(state['messages'], llm=self.llm))}
+
+    async def aprocess(self,state:State)->dict:
+        """
+        Async version of `process` used by graph.astream (ChatGroq's async client).
+        """
+        # prepare_model_input may call the LLM to summarize old turns: keep it off the event loop
+        prompt = await asyncio.to_thread(prepare_model_input, state['messages'], llm=self.llm)
+        return {"messages":await self.llm.ainvoke(prompt)}
 
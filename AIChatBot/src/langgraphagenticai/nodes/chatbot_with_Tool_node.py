@@ -1,4 +1,7 @@
+import asyncio
+from langchain_core.runnables import RunnableLambda
 from src.langgraphagenticai.state.state import State
+from src.langgraphagenticai.nodes.context_window import prepare_model_input
 
 class ChatbotWithToolNode:
     """
@@ -30,7 +33,15 @@ class ChatbotWithToolNode:
             """
             Chatbot logic for processing the input state and returning a response.
             """
-            return {"messages": [llm_with_tools.invoke(state["messages"])]}
+            # Older search results are shortened and old turns summarized before each call
+            return {"messages": [llm_with_tools.invoke(prepare_model_input(state["messages"], llm=self.llm))]}
 
-        return chatbot_node
+        async def achatbot_node(state: State):
+            """
+            Async version of chatbot_node, used when the graph runs with astream.
+            """
+            prompt = await asyncio.to_thread(prepare_model_input, state["messages"], llm=self.llm)
+            return {"messages": [await llm_with_tools.ainvoke(prompt)]}
+
+        return RunnableLambda(chatbot_node, afunc=achatbot_node, name="chatbot")
 
@@ -0,0 +1,168 @@
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+from src.langgraphagenticai.nodes.ai_news_node import (
+    NEWS_DIR, search_news, summarize_articles, format_news_markdown, write_atomic
+)
+from src.langgraphagenticai.tools.search_cache import SEARCH_TTLS
+
+FREQUENCIES = ["daily", "weekly", "monthly"]
+# A digest is refreshed when it is older than the search TTL of its frequency
+# (refreshing sooner would only get the cached search results back)
+REFRESH_INTERVALS = {frequency: SEARCH_TTLS[f"news_{frequency}"] for frequency in FREQUENCIES}
+POLL_SECONDS = 60
+# The scheduler works for every viewer, so it runs on the server's own Groq and Tavily
+# accounts (GROQ_API_KEY / TAVILY_API_KEY in the environment), never on the keys a user
+# typed into the sidebar (those only travel with that user's own graph runs)
+NEWS_DIGEST_MODEL = os.getenv("NEWS_DIGEST_MODEL", os.getenv("GROQ_MODEL", "llama-3.1-8b-instant"))
+SERVER_TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")
+
+
+class NewsDigestStore:
+    """
+    Latest digest per frequency, as ./AINews/{frequency}_digest.json plus the
+    {frequency}_summary.md the UI has always shown. Files are replaced atomically,
+    so readers never see a half-written digest.
+    """
+
+    def __init__(self, directory=NEWS_DIR):
+        self.directory = directory
+
+    def _path(self, frequency, suffix):
+        return os.path.join(self.directory, f"{frequency}_{suffix}")
+
+    def load(self, frequency):
+        try:
+            with open(self._path(frequency, "digest.json"), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def save(self, frequency, digest):
+        markdown = f"# {frequency.capitalize()} AI News Summary\n\n{digest['markdown']}"
+        write_atomic(self._path(frequency, "summary.md"), markdown)
+        write_atomic(self._path(frequency, "digest.json"), json.dumps(digest, indent=1))
+
+    def age_seconds(self, digest):
+        generated_at = datetime.fromisoformat(digest["generated_at"])
+        return (datetime.now(timezone.utc) - generated_at).total_seconds()
+
+
+def refresh_digest(llm, frequency, store, tavily_api_key=None):
+    """
+    Fetches the news for `frequency` and rebuilds its digest. Articles whose URL was
+    already summarized in the previous digest reuse that summary; only new URLs, and
+    URLs whose summary failed last time (title fallbacks), go to the LLM. Articles no
+    longer in the results drop out of the digest.
+    """
+    started = time.perf_counter()
+    previous = (store.load(frequency) or {}).get("articles", {})
+
+    articles = {}
+    new_items = []
+    for item in search_news(frequency, tavily_api_key):
+        url = item.get("url", "")
+        if not url or url in articles:
+            continue
+        reused = previous.get(url)
+        articles[url] = reused if reused is not None and not reused.get("failed") else None
+        if articles[url] is None:
+            new_items.append(item)
+
+    # New articles are summarized in parallel
+    for entry in summarize_articles(llm, new_items):
+        articles[entry["url"]] = entry
+    new_urls = len(new_items)
+
+    digest = {
+        "frequency": frequency,
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "articles": articles,
+        "markdown": format_news_markdown(list(articles.values())),
+    }
+    store.save(frequency, digest)
+    print(f"Refreshed {frequency} AI news digest: {len(articles)} articles, "
+          f"{new_urls} newly summarized, {time.perf_counter() - started:.1f}s")
+    return digest
+
+
+class NewsDigestScheduler:
+    """Background thread keeping every frequency's digest fresh."""
+
+    def __init__(self, llm, tavily_api_key=None, store=None, frequencies=FREQUENCIES, intervals=REFRESH_INTERVALS):
+        self.llm = llm
+        self.tavily_api_key = tavily_api_key
+        self.store = store or NewsDigestStore()
+        self.frequencies = frequencies
+        self.intervals = intervals
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="news-digest-scheduler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def is_stale(self, frequency):
+        digest = self.store.load(frequency)
+        return digest is None or self.store.age_seconds(digest) >= self.intervals[frequency]
+
+    def run_once(self):
+        """Refreshes the stale digests; a failing frequency does not block the others."""
+        for frequency in self.frequencies:
+            if self._stop.is_set():
+                return
+            if self.is_stale(frequency):
+                try:
+                    refresh_digest(self.llm, frequency, self.store, self.tavily_api_key)
+                except Exception as e:
+                    print(f"Error refreshing {frequency} AI news digest: {e}")
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.run_once()
+            self._stop.wait(POLL_SECONDS)
+
+
+def build_server_llm():
+    """The scheduler's ChatGroq client from server-side config, or None without GROQ_API_KEY."""
+    api_key = os.getenv("GROQ_API_KEY")
+    if not api_key:
+        return None
+    from langchain_groq import ChatGroq
+    return ChatGroq(api_key=api_key, model=NEWS_DIGEST_MODEL)
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def ensure_news_scheduler():
+    """
+    Starts the process-wide scheduler on first call; later calls return the running one.
+    Returns None when the server has no GROQ_API_KEY or TAVILY_API_KEY: digests are then
+    only built on demand by the AI News graph (or by running this module from cron).
+    """
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            llm = build_server_llm()
+            if llm is None or not SERVER_TAVILY_API_KEY:
+                print("AI news scheduler disabled: GROQ_API_KEY and TAVILY_API_KEY must be set on the server")
+                return None
+            _scheduler = NewsDigestScheduler(llm, SERVER_TAVILY_API_KEY).start()
+        return _scheduler
+
+
+if __name__ == "__main__":
+    # One refresh pass, e.g. from cron:  python -m src.langgraphagenticai.scheduler.news_digest_scheduler
+    # Needs GROQ_API_KEY and TAVILY_API_KEY in the environment.
+    server_llm = build_server_llm()
+    if server_llm is None or not SERVER_TAVILY_API_KEY:
+        raise SystemExit("GROQ_API_KEY and TAVILY_API_KEY must be set")
+    NewsDigestScheduler(server_llm, SERVER_TAVILY_API_KEY).run_once()
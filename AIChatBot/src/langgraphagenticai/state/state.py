@@ -7,4 +7,15 @@ class State(TypedDict):
     """
     Represent the structure of the state used in graph
     """
-    messages: Annotated[List,add_messages]
\ No newline at end of file
+    messages: Annotated[List,add_messages]
+
+class AINewsState(TypedDict, total=False):
+    """
+    State of the AI News graph. Every request carries its own data here (nothing is
+    kept on the node), so one compiled graph can serve concurrent requests.
+    """
+    messages: Annotated[List,add_messages]
+    frequency: str
+    news_data: List[dict]
+    summary: str
+    filename: str
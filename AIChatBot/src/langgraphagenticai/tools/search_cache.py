@@ -0,0 +1,238 @@
+import asyncio
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from pydantic import SecretStr
+
+
+# Seconds a cached search stays fresh, per use case
+SEARCH_TTLS = {
+    "chat": 15 * 60,
+    "news_daily": 3 * 3600,
+    "news_weekly": 12 * 3600,
+    "news_monthly": 24 * 3600,
+    "news_year": 3 * 24 * 3600,
+}
+DEFAULT_TTL = SEARCH_TTLS["chat"]
+MAX_ENTRIES = 512
+
+
+class TavilyBackend:
+    """Real Tavily search (TavilyClient.search) with one API key."""
+
+    def __init__(self, api_key):
+        from tavily import TavilyClient
+        self.api_key = api_key
+        self.client = TavilyClient(api_key=api_key)
+        self._async_client = None
+
+    def search(self, query, **params):
+        return self.client.search(query=query, **params)
+
+    async def asearch(self, query, **params):
+        # AsyncTavilyClient (httpx.AsyncClient) awaits the API without holding a thread
+        if self._async_client is None:
+            from tavily import AsyncTavilyClient
+            self._async_client = AsyncTavilyClient(api_key=self.api_key)
+        return await self._async_client.search(query=query, **params)
+
+
+class StubSearchBackend:
+    """
+    Offline backend returning deterministic fake results in Tavily's response format.
+    Selected with SEARCH_BACKEND=stub; `calls` counts real (uncached) searches.
+    """
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def search(self, query, max_results=5, **params):
+        with self.lock:
+            self.calls += 1
+        time.sleep(self.latency)
+        return self._response(query, max_results)
+
+    async def asearch(self, query, max_results=5, **params):
+        with self.lock:
+            self.calls += 1
+        await asyncio.sleep(self.latency)
+        return self._response(query, max_results)
+
+    def _response(self, query, max_results):
+        return {
+            "query": query,
+            "answer": f"Stub answer for: {query}",
+            "results": [
+                {
+                    "title": f"Result {i + 1} for {query}",
+                    "url": f"https://example.com/{hashlib.sha1(query.encode('utf-8')).hexdigest()[:8]}/{i + 1}",
+                    "content": f"Stub content {i + 1} about {query}.",
+                    "published_date": time.strftime("%Y-%m-%d"),
+                    "score": round(1.0 - i / max(max_results, 1), 3),
+                }
+                for i in range(max_results)
+            ],
+        }
+
+
+def normalize_query(query):
+    """Case and whitespace do not change the results, so they do not change the key."""
+    return re.sub(r"\s+", " ", query).strip().lower()
+
+
+class SearchCache:
+    """
+    Process-wide TTL cache in front of a search backend.
+
+    Entries are keyed by the normalized query plus all search parameters. Identical
+    searches running at the same time are coalesced: the first caller queries the
+    backend, the others wait for its result. Errors are not cached.
+    """
+
+    def __init__(self, backend=None, max_entries=MAX_ENTRIES):
+        self._backend = backend
+        self._tavily_backends = {}  # Tavily key fingerprint -> TavilyBackend
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # key -> (expires_at, response), least recently used first
+        self.in_flight = {}  # key -> Event set when the search finishes
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def backend_for(self, api_key=None):
+        """
+        The backend for one search. The caller passes the Tavily key (the session's key
+        for chat, the server's key for background jobs) and gets one client per key;
+        TAVILY_API_KEY is never read from the process environment, which concurrent
+        sessions share. Created lazily: importing this module never needs a key.
+        """
+        with self.lock:
+            if self._backend is None and os.getenv("SEARCH_BACKEND") == "stub":
+                self._backend = StubSearchBackend()
+            if self._backend is not None:
+                return self._backend
+            if not api_key:
+                raise ValueError("A Tavily API key is required for web search.")
+            fingerprint = hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:12]
+            backend = self._tavily_backends.get(fingerprint)
+            if backend is None:
+                backend = self._tavily_backends[fingerprint] = TavilyBackend(api_key)
+            return backend
+
+    @staticmethod
+    def make_key(query, params):
+        payload = json.dumps([normalize_query(query), params], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def search(self, query, use_case="chat", ttl=None, api_key=None, **params):
+        """
+        Cached equivalent of TavilyClient.search(query, **params).
+
+        Args:
+            use_case: Key of SEARCH_TTLS deciding how long the result stays fresh.
+            ttl: Explicit TTL in seconds, overrides the use case.
+            api_key: Tavily API key of the caller (not part of the cache key).
+        """
+        ttl = ttl if ttl is not None else SEARCH_TTLS.get(use_case, DEFAULT_TTL)
+        key = self.make_key(query, params)
+
+        while True:
+            with self.lock:
+                entry = self.entries.get(key)
+                if entry is not None and entry[0] > time.time():
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                waiting_on = self.in_flight.get(key)
+                if waiting_on is None:
+                    self.in_flight[key] = threading.Event()
+                    self.misses += 1
+                    break
+            # Same search already running in another thread: reuse its result
+            # (if that search failed, the next loop makes this thread search itself)
+            waiting_on.wait()
+
+        try:
+            started = time.perf_counter()
+            response = self.backend_for(api_key).search(query, **params)
+            print(f"Search '{query}' ({use_case}) took {time.perf_counter() - started:.2f}s")
+            with self.lock:
+                self.entries[key] = (time.time() + ttl, response)
+                self.entries.move_to_end(key)
+                while len(self.entries) > self.max_entries:
+                    self.entries.popitem(last=False)
+            return response
+        finally:
+            with self.lock:
+                self.in_flight.pop(key).set()
+
+    async def asearch(self, query, use_case="chat", ttl=None, api_key=None, **params):
+        """
+        Async equivalent of `search` for graphs run on an event loop: same entries, TTLs
+        and coalescing, but the backend call is awaited instead of blocking a thread.
+        """
+        ttl = ttl if ttl is not None else SEARCH_TTLS.get(use_case, DEFAULT_TTL)
+        key = self.make_key(query, params)
+
+        while True:
+            with self.lock:
+                entry = self.entries.get(key)
+                if entry is not None and entry[0] > time.time():
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                waiting_on = self.in_flight.get(key)
+                if waiting_on is None:
+                    self.in_flight[key] = threading.Event()
+                    self.misses += 1
+                    break
+            # The same search is running elsewhere (any thread or task): wait off the loop
+            await asyncio.to_thread(waiting_on.wait)
+
+        try:
+            started = time.perf_counter()
+            response = await self.backend_for(api_key).asearch(query, **params)
+            print(f"Search '{query}' ({use_case}) took {time.perf_counter() - started:.2f}s (async)")
+            with self.lock:
+                self.entries[key] = (time.time() + ttl, response)
+                self.entries.move_to_end(key)
+                while len(self.entries) > self.max_entries:
+                    self.entries.popitem(last=False)
+            return response
+        finally:
+            with self.lock:
+                self.in_flight.pop(key).set()
+
+    def stats(self):
+        with self.lock:
+            return {"entries": len(self.entries), "hits": self.hits, "misses": self.misses}
+
+
+def tavily_key_config(api_key):
+    """
+    Run-config entry carrying a session's Tavily key to the search tool and news nodes.
+    Wrapped in SecretStr: LangGraph copies plain-string configurable values into the
+    checkpoint metadata, so a bare key would be stored with the conversation.
+    """
+    return {"tavily_api_key": SecretStr(api_key)} if api_key else {}
+
+
+def tavily_key_from_config(config):
+    """The Tavily key of the run (see tavily_key_config), or None."""
+    secret = (config or {}).get("configurable", {}).get("tavily_api_key")
+    return secret.get_secret_value() if secret is not None else None
+
+
+_search_cache = SearchCache()
+
+
+def get_search_cache():
+    """The cache shared by every graph and session in this process."""
+    return _search_cache
@@ -1,11 +1,46 @@
-from langchain_community.tools.tavily_search import TavilySearchResults
+from langchain_core.runnables import RunnableConfig
+from langchain_core.tools import StructuredTool
 from langgraph.prebuilt import ToolNode
+from src.langgraphagenticai.tools.search_cache import get_search_cache, tavily_key_from_config
+
+
+def _format_results(response):
+    return [
+        {"title": result.get("title", ""), "url": result.get("url", ""), "content": result.get("content", "")}
+        for result in response.get("results", [])
+    ]
+
+
+def _search(query: str, config: RunnableConfig) -> list:
+    # Same name and output shape as TavilySearchResults, but served through the shared
+    # cache so repeated questions (and repeated tool calls) do not hit the API again.
+    # The session's Tavily key comes with the run config (the model never sees it)
+    return _format_results(get_search_cache().search(
+        query, use_case="chat", api_key=tavily_key_from_config(config), max_results=2))
+
+
+async def _asearch(query: str, config: RunnableConfig) -> list:
+    # Used when the graph runs with astream: the Tavily request is awaited on the loop
+    return _format_results(await get_search_cache().asearch(
+        query, use_case="chat", api_key=tavily_key_from_config(config), max_results=2))
+
+
+tavily_search_results_json = StructuredTool.from_function(
+    func=_search,
+    coroutine=_asearch,
+    name="tavily_search_results_json",
+    description=(
+        "A search engine optimized for comprehensive, accurate, and trusted results. "
+        "Useful for when you need to answer questions about current events. "
+        "Input should be a search query."
+    ),
+)
 
 def get_tools():
     """
     Return the list of tools to be used in the chatbot
     """
-    tools=[TavilySearchResults(max_results=2)]
+    tools=[tavily_search_results_json]
     return tools
 
 def create_tool_node(tools):
@@ -13,4 +48,3 @@ def create_tool_node(tools):
     creates and returns a tool node for the graph
     """
     return ToolNode(tools=tools)
-
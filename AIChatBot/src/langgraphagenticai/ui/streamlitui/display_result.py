@@ -1,13 +1,50 @@
 import streamlit as st
-from langchain_core.messages import HumanMessage,AIMessage,ToolMessage
+from langchain_core.messages import HumanMessage,AIMessage,AIMessageChunk,ToolMessage
 import json
+from datetime import datetime
 
 
 class DisplayResultStreamlit:
-    def __init__(self,usecase,graph,user_message):
+    def __init__(self,usecase,graph,user_message,thread_id=None,tavily_api_key=None):
         self.usecase= usecase
         self.graph = graph
         self.user_message = user_message
+        self.thread_id = thread_id
+        self.tavily_api_key = tavily_api_key
+
+    @property
+    def config(self):
+        """
+        Run config of this session: its conversation thread in the checkpointer and its
+        own Tavily key for the search tool / news search (never the process environment).
+        """
+        from src.langgraphagenticai.graph.checkpointer import thread_config, CHECKPOINTED_USECASES
+        from src.langgraphagenticai.tools.search_cache import tavily_key_config
+        config = thread_config(self.thread_id, self.usecase) if self.usecase in CHECKPOINTED_USECASES else {"configurable": {}}
+        config["configurable"].update(tavily_key_config(self.tavily_api_key))
+        return config
+
+    def stream(self, graph_input, **kwargs):
+        """
+        Graph events for this turn: from astream on the shared event loop in async mode,
+        otherwise from graph.stream on this session's thread.
+        """
+        from src.langgraphagenticai.graph.async_runner import is_async_mode, iterate_astream
+        if is_async_mode():
+            return iterate_astream(self.graph, graph_input, self.config, **kwargs)
+        return self.graph.stream(graph_input, self.config, **kwargs)
+
+    @staticmethod
+    def session_turns(usecase, thread_id):
+        """Turns shown in this session, so reruns redraw the chat without reading the checkpoint."""
+        return st.session_state.setdefault("chat_turns", {}).setdefault(f"{thread_id}:{usecase}", [])
+
+    @staticmethod
+    def display_chat_history(usecase, thread_id):
+        """Redraws the conversation so far from the turns kept in this session."""
+        for turn in DisplayResultStreamlit.session_turns(usecase, thread_id):
+            with st.chat_message(turn["role"]):
+                st.write(turn["content"])
 
     def display_result_on_ui(self):
         usecase= self.usecase
@@ -15,7 +52,9 @@ class DisplayResultStreamlit:
         user_message = self.user_message
         print(user_message)
         if usecase =="Basic Chatbot":
-                for event in graph.stream({'messages':("user",user_message)}):
+                turns = self.session_turns(usecase, self.thread_id)
+                # Only the new message is sent; earlier turns come from the thread's checkpoint
+                for event in self.stream({'messages':("user",user_message)}):
                     print(event.values())
                     for value in event.values():
                         print(value['messages'])
@@ -23,38 +62,88 @@ class DisplayResultStreamlit:
                             st.write(user_message)
                         with st.chat_message("assistant"):
                             st.write(value["messages"].content)
+                        turns.append({"role": "user", "content": user_message})
+                        turns.append({"role": "assistant", "content": value["messages"].content})
 
         elif usecase=="Chatbot With Web":
-             # Prepare state and invoke the graph
-            initial_state = {"messages": [user_message]}
-            res = graph.invoke(initial_state)
-            for message in res['messages']:
-                if type(message) == HumanMessage:
-                    with st.chat_message("user"):
-                        st.write(message.content)
-                elif type(message)==ToolMessage:
-                    with st.chat_message("ai"):
-                        st.write("Tool Call Start")
-                        st.write(message.content)
-                        st.write("Tool Call End")
-                elif type(message)==AIMessage and message.content:
-                    with st.chat_message("assistant"):
-                        st.write(message.content)
-                        
+            self.stream_chatbot_with_web()
+
 
         elif usecase == "AI News":
+            from src.langgraphagenticai.scheduler.news_digest_scheduler import NewsDigestStore
             frequency = self.user_message
+            digest_store = NewsDigestStore()
+            digest = digest_store.load(frequency.lower())
+            if digest is not None:
+                # Precomputed by the background scheduler: served without any search or LLM call
+                self.display_news_digest(digest_store, digest)
+                return
+
             with st.spinner("Fetching and summarizing news... ⏳"):
-                result = graph.invoke({"messages": frequency})
                 try:
-                    # Read the markdown file
-                    AI_NEWS_PATH = f"./AINews/{frequency.lower()}_summary.md"
-                    with open(AI_NEWS_PATH, "r") as file:
-                        markdown_content = file.read()
-
-                    # Display the markdown content in Streamlit
-                    st.markdown(markdown_content, unsafe_allow_html=True)
-                except FileNotFoundError:
-                    st.error(f"News Not Generated or File not found: {AI_NEWS_PATH}")
+                    # The summary comes from this request's own graph state, not a shared file
+                    result = graph.invoke({"messages": frequency}, self.config)
+                    st.markdown(f"# {frequency.capitalize()} AI News Summary\n\n{result['summary']}", unsafe_allow_html=True)
+                    st.caption(f"Saved to {result['filename']}")
                 except Exception as e:
-                    st.error(f"An error occurred: {str(e)}")
\ No newline at end of file
+                    st.error(f"An error occurred: {str(e)}")
+
+    def display_news_digest(self, digest_store, digest):
+        """
+        Shows a precomputed digest with its generation time.
+        """
+        from src.langgraphagenticai.scheduler.news_digest_scheduler import REFRESH_INTERVALS
+        frequency = digest["frequency"]
+        generated_at = datetime.fromisoformat(digest["generated_at"]).astimezone()
+        age_minutes = int(digest_store.age_seconds(digest) // 60)
+        st.caption(f"🕒 Generated {generated_at:%Y-%m-%d %H:%M %Z} ({age_minutes} min ago) · "
+                   f"{len(digest['articles'])} articles")
+        if age_minutes * 60 >= REFRESH_INTERVALS.get(frequency, 0):
+            st.caption("🔄 A fresher digest is being prepared in the background.")
+        st.markdown(f"# {frequency.capitalize()} AI News Summary\n\n{digest['markdown']}", unsafe_allow_html=True)
+
+    def stream_chatbot_with_web(self):
+        """
+        Streams the "Chatbot With Web" graph: LLM tokens are written into the assistant
+        bubble as they arrive ("messages" mode) and tool results are shown once the
+        tool node finishes ("updates" mode).
+        """
+        graph = self.graph
+        initial_state = {"messages": [self.user_message]}
+        turns = self.session_turns(self.usecase, self.thread_id)
+
+        with st.chat_message("user"):
+            st.write(self.user_message)
+        turns.append({"role": "user", "content": self.user_message})
+
+        placeholder = None
+        response_text = ""
+        for mode, payload in self.stream(initial_state, stream_mode=["messages", "updates"]):
+            if mode == "messages":
+                chunk, metadata = payload
+                if isinstance(chunk, AIMessageChunk) and chunk.content and metadata.get("langgraph_node") == "chatbot":
+                    if placeholder is None:
+                        placeholder = st.chat_message("assistant").empty()
+                        response_text = ""
+                    response_text += chunk.content
+                    placeholder.write(response_text + "▌")
+
+            elif mode == "updates":
+                for node, update in payload.items():
+                    if placeholder is not None:
+                        # Finalise the bubble that was being streamed
+                        placeholder.write(response_text)
+                        turns.append({"role": "assistant", "content": response_text})
+                        placeholder = None
+                    if node != "tools":
+                        continue
+                    for message in (update or {}).get("messages", []):
+                        if type(message)==ToolMessage:
+                            with st.chat_message("ai"):
+                                st.write("Tool Call Start")
+                                st.write(message.content)
+                                st.write("Tool Call End")
+
+        if placeholder is not None:
+            placeholder.write(response_text)
+            turns.append({"role": "assistant", "content": response_text})
@@ -1,5 +1,5 @@
 import streamlit as st
-import os
+import uuid
 
 from src.langgraphagenticai.ui.uiconfigfile import Config
 
@@ -36,12 +36,22 @@ class LoadStreamlitUI:
             self.user_controls["selected_usecase"]=st.selectbox("Select Usecases",usecase_options)
 
             if self.user_controls["selected_usecase"] =="Chatbot With Web" or self.user_controls["selected_usecase"] =="AI News" :
-                os.environ["TAVILY_API_KEY"]=self.user_controls["TAVILY_API_KEY"]=st.session_state["TAVILY_API_KEY"]=st.text_input("TAVILY API KEY",type="password")
+                # Kept in this session only: os.environ is shared by every session of the process
+                self.user_controls["TAVILY_API_KEY"]=st.session_state["TAVILY_API_KEY"]=st.text_input("TAVILY API KEY",type="password")
 
                 # Validate API key
                 if not self.user_controls["TAVILY_API_KEY"]:
                     st.warning("⚠️ Please enter your TAVILY_API_KEY key to proceed. Don't have? refer : https://app.tavily.com/home")
 
+            if self.user_controls["selected_usecase"] in ("Basic Chatbot", "Chatbot With Web"):
+                # One conversation thread per browser session. The id is kept in this session
+                # only, never in the URL: anyone with the link could otherwise read the thread.
+                if "thread_id" not in st.session_state:
+                    st.session_state.thread_id = uuid.uuid4().hex
+                if st.button("🆕 New Chat", use_container_width=True):
+                    st.session_state.thread_id = uuid.uuid4().hex
+                self.user_controls["thread_id"] = st.session_state.thread_id
+
             if self.user_controls['selected_usecase']=="AI News":
                 st.subheader("📰 AI News Explorer ")
                 
@@ -0,0 +1,70 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Concurrency stress test of the AI News graph, offline:
+#   python stress_ai_news.py [invokes] [threads]
+#
+# Runs many daily/weekly/monthly requests on one compiled graph from a thread pool,
+# with the stub search backend and a fake LLM, and checks that every request gets
+# its own frequency, summary and output file (no state shared between requests).
+
+os.environ["SEARCH_BACKEND"] = "stub"
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from src.langgraphagenticai.graph.graph_builder import GraphBuilder
+from src.langgraphagenticai.nodes import ai_news_node
+
+FREQUENCIES = ["daily", "weekly", "monthly"]
+
+
+class FakeLLM:
+    """Chat model stand-in: echoes the article title, with a little latency."""
+
+    def __init__(self, latency=0.01):
+        self.latency = latency
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def invoke(self, prompt):
+        with self.lock:
+            self.calls += 1
+        time.sleep(self.latency)
+        title = str(prompt).split("Title: ", 1)[-1].split("\n", 1)[0]
+        return AIMessage(content=f"Summary of {title}")
+
+
+def run_stress(invokes=60, threads=16):
+    ai_news_node.NEWS_DIR = tempfile.mkdtemp(prefix="ainews_stress_")
+    graph = GraphBuilder(FakeLLM()).setup_graph("AI News")
+
+    def invoke(i):
+        frequency = FREQUENCIES[i % len(FREQUENCIES)]
+        result = graph.invoke({"messages": [HumanMessage(content=frequency.capitalize())]})
+
+        assert result["frequency"] == frequency, (frequency, result["frequency"])
+        assert "Summary of Result 1 for" in result["summary"], result["summary"][:200]
+        with open(result["filename"], encoding="utf-8") as f:
+            content = f.read()
+        assert content.startswith(f"# {frequency.capitalize()} AI News Summary"), content[:80]
+        assert content.endswith(result["summary"])
+        return result["filename"]
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        filenames = list(executor.map(invoke, range(invokes)))
+    elapsed = time.perf_counter() - started
+
+    assert len(set(filenames)) == invokes, f"{invokes - len(set(filenames))} requests shared an output file"
+    for frequency in FREQUENCIES:
+        assert os.path.exists(os.path.join(ai_news_node.NEWS_DIR, f"{frequency}_summary.md"))
+    print(f"{invokes} invokes on {threads} threads in {elapsed:.2f}s: "
+          f"{len(set(filenames))} distinct files in {ai_news_node.NEWS_DIR}")
+
+
+if __name__ == "__main__":
+    run_stress(*(int(arg) for arg in sys.argv[1:3]))
@@ -5,7 +5,8 @@ from langchain_openai import ChatOpenAI
 from langchain_core.tools import tool
 from langgraph.graph.message import add_messages
 from langgraph.graph import StateGraph, END
-from langgraph.prebuilt import ToolNode
+from context_window import prepare_model_input
+from tool_executor import ParallelToolExecutor
 
 load_dotenv()
 
@@ -50,7 +51,8 @@ def save(filename: str) -> str:
 
 tools = [update, save]
 
-model = ChatOpenAI(model="gpt-4o").bind_tools(tools)
+summarizer = ChatOpenAI(model="gpt-4o") # summarizes old turns for the pre-model hook
+model = summarizer.bind_tools(tools)
 
 def our_agent(state: AgentState) -> AgentState:
     system_prompt = SystemMessage(content=f"""
@@ -74,7 +76,8 @@ def our_agent(state: AgentState) -> AgentState:
 
     all_messages = [system_prompt] + list(state["messages"]) + [user_message]
 
-    response = model.invoke(all_messages)
+    # Earlier 'update' results each hold a full copy of the document; only the latest is sent whole
+    response = model.invoke(prepare_model_input(all_messages, llm=summarizer))
 
     print(f"\n🤖 AI: {response.content}")
     if hasattr(response, "tool_calls") and response.tool_calls:
@@ -114,7 +117,8 @@ def print_messages(messages):
 graph = StateGraph(AgentState)
 
 graph.add_node("agent", our_agent)
-graph.add_node("tools", ToolNode(tools))
+# update/save share the global document, so they keep their call order
+graph.add_node("tools", ParallelToolExecutor(tools, sequential_tools=["update", "save"]))
 
 graph.set_entry_point("agent")
 
@@ -1,52 +1,120 @@
 import os
-from typing import TypedDict, List, Union
-from langchain_core.messages import HumanMessage, AIMessage
+import sqlite3
+from typing import TypedDict, Annotated, Sequence
+from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, SystemMessage, RemoveMessage
+from langchain_core.messages.utils import count_tokens_approximately
 from langchain_openai import ChatOpenAI
 from langgraph.graph import StateGraph, START, END
+from langgraph.graph.message import add_messages
+from langgraph.checkpoint.sqlite import SqliteSaver  # pip install langgraph-checkpoint-sqlite
 from dotenv import load_dotenv
+from context_window import split_live_window
 
 load_dotenv()
 
+# The conversation is checkpointed to SQLite after every step, so a crash or restart
+# resumes the same thread. Old turns are folded into a running summary once the live
+# window exceeds MAX_LIVE_TOKENS, which keeps the prompt size (and cost) bounded.
+CHECKPOINT_DB = "memory_agent.sqlite3"
+LOG_FILE = "logging.txt"
+THREAD_ID = os.getenv("MEMORY_AGENT_THREAD", "default")
+MAX_LIVE_TOKENS = 2000  # summarize when the live messages grow past this
+KEEP_LIVE_TOKENS = 1000  # most recent messages kept verbatim after summarizing
+
+
 class AgentState(TypedDict):
-    messages: List[Union[HumanMessage, AIMessage]]
+    messages: Annotated[Sequence[BaseMessage], add_messages]
+    summary: str
+
 
 llm = ChatOpenAI(model="gpt-4o")
 
+
+def summarize(state: AgentState) -> AgentState:
+    """Folds the oldest turns into the running summary when the live window is too big"""
+    messages = state["messages"]
+    if count_tokens_approximately(messages) <= MAX_LIVE_TOKENS:
+        return {}
+
+    old, recent = split_live_window(messages, KEEP_LIVE_TOKENS)
+    if not old:
+        return {}
+
+    previous = state.get("summary", "")
+    instruction = (
+        f"This is the summary of the conversation so far:\n{previous}\n\n"
+        "Extend it with the new messages above. Keep facts, names and decisions."
+        if previous else
+        "Summarize the conversation above. Keep facts, names and decisions."
+    )
+    response = llm.invoke(old + [HumanMessage(content=instruction)])
+    print(f"\n[memory] Summarized {len(old)} old messages, keeping {len(recent)} live")
+
+    # RemoveMessage deletes the summarized messages from the checkpointed state
+    return {
+        "summary": response.content,
+        "messages": [RemoveMessage(id=message.id) for message in old],
+    }
+
+
 def process(state: AgentState) -> AgentState:
     """This node will solve the request you input"""
-    response = llm.invoke(state["messages"])
+    prompt = list(state["messages"])
+    if state.get("summary"):
+        prompt = [SystemMessage(content=f"Summary of the earlier conversation:\n{state['summary']}")] + prompt
 
-    state["messages"].append(AIMessage(content=response.content)) 
+    response = llm.invoke(prompt)
     print(f"\nAI: {response.content}")
-    print("CURRENT STATE: ", state["messages"])
+    print(f"LIVE WINDOW: {len(state['messages']) + 1} messages, "
+          f"~{count_tokens_approximately(state['messages'])} tokens")
+
+    return {"messages": [AIMessage(content=response.content)]}
 
-    return state
 
 graph = StateGraph(AgentState)
+graph.add_node("summarize", summarize)
 graph.add_node("process", process)
-graph.add_edge(START, "process")
-graph.add_edge("process", END) 
-agent = graph.compile()
+graph.add_edge(START, "summarize")
+graph.add_edge("summarize", "process")
+graph.add_edge("process", END)
+
+
+def append_to_log(messages):
+    """Appends messages to the log as they happen (nothing is lost if the process dies)"""
+    with open(LOG_FILE, "a") as file:
+        for message in messages:
+            if isinstance(message, HumanMessage):
+                file.write(f"You: {message.content}\n")
+            elif isinstance(message, AIMessage):
+                file.write(f"AI: {message.content}\n\n")
+        file.flush()
+        os.fsync(file.fileno())
+
 
+def run_conversation():
+    connection = sqlite3.connect(CHECKPOINT_DB, check_same_thread=False)
+    agent = graph.compile(checkpointer=SqliteSaver(connection))
+    config = {"configurable": {"thread_id": THREAD_ID}}
 
-conversation_history = []
+    existing = agent.get_state(config).values
+    if existing.get("messages"):
+        print(f"Resuming thread '{THREAD_ID}' with {len(existing['messages'])} live messages"
+              + (" and a summary of earlier turns." if existing.get("summary") else "."))
+    else:
+        with open(LOG_FILE, "a") as file:
+            file.write(f"Your Conversation Log (thread {THREAD_ID}):\n")
 
-user_input = input("Enter: ")
-while user_input != "exit":
-    conversation_history.append(HumanMessage(content=user_input))
-    result = agent.invoke({"messages": conversation_history})
-    conversation_history = result["messages"]
     user_input = input("Enter: ")
+    while user_input != "exit":
+        human = HumanMessage(content=user_input)
+        # Only the new message is sent; the rest of the state comes from the checkpoint
+        result = agent.invoke({"messages": [human]}, config)
+        append_to_log([human, result["messages"][-1]])
+        user_input = input("Enter: ")
 
+    connection.close()
+    print(f"Conversation saved to {CHECKPOINT_DB} (thread '{THREAD_ID}') and {LOG_FILE}")
 
-with open("logging.txt", "w") as file:
-    file.write("Your Conversation Log:\n")
-    
-    for message in conversation_history:
-        if isinstance(message, HumanMessage):
-            file.write(f"You: {message.content}\n")
-        elif isinstance(message, AIMessage):
-            file.write(f"AI: {message.content}\n\n")
-    file.write("End of Conversation")
 
-print("Conversation saved to logging.txt")
\ No newline at end of file
+if __name__ == "__main__":
+    run_conversation()
@@ -1,5 +1,6 @@
 from dotenv import load_dotenv
 import os
+import hashlib
 from langgraph.graph import StateGraph, END
 from typing import TypedDict, Annotated, Sequence
 from langchain_core.messages import BaseMessage, SystemMessage, HumanMessage, ToolMessage
@@ -10,6 +11,8 @@ from langchain_community.document_loaders import PyPDFLoader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_chroma import Chroma
 from langchain_core.tools import tool
+from context_window import prepare_model_input
+from tool_executor import ParallelToolExecutor
 
 load_dotenv()
 
@@ -17,55 +20,120 @@ llm = ChatOpenAI(
     model="gpt-4o", temperature = 0) # I want to minimize hallucination - temperature = 0 makes the model output more deterministic 
 
 # Our Embedding Model - has to also be compatible with the LLM
+embedding_model_name = "text-embedding-3-small"
 embeddings = OpenAIEmbeddings(
-    model="text-embedding-3-small",
+    model=embedding_model_name,
 )
 
 
 pdf_path = "Stock_Market_Performance_2024.pdf"
 
+# The persisted Chroma database lives in its own folder next to this script (git-ignored)
+persist_directory = os.path.join(os.path.dirname(os.path.abspath(__file__)), "chroma_db")
+collection_name = "stock_market"
+chunk_size = 1000
+chunk_overlap = 200
+
 
 # Safety measure I have put for debugging purposes :)
 if not os.path.exists(pdf_path):
     raise FileNotFoundError(f"PDF file not found: {pdf_path}")
 
-pdf_loader = PyPDFLoader(pdf_path) # This loads the PDF
 
-# Checks if the PDF is there
-try:
-    pages = pdf_loader.load()
-    print(f"PDF has been loaded and has {len(pages)} pages")
-except Exception as e:
-    print(f"Error loading PDF: {e}")
-    raise
+def compute_source_hash():
+    """Hash of everything the index depends on: PDF bytes, chunking and embedding model."""
+    digest = hashlib.sha256()
+    with open(pdf_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    digest.update(f"{chunk_size}:{chunk_overlap}:{embedding_model_name}".encode("utf-8"))
+    return digest.hexdigest()
 
-# Chunking Process
-text_splitter = RecursiveCharacterTextSplitter(
-    chunk_size=1000,
-    chunk_overlap=200
-)
 
+def load_and_split_pdf():
+    pdf_loader = PyPDFLoader(pdf_path) # This loads the PDF
 
-pages_split = text_splitter.split_documents(pages) # We now apply this to our pages
+    # Checks if the PDF is there
+    try:
+        pages = pdf_loader.load()
+        print(f"PDF has been loaded and has {len(pages)} pages")
+    except Exception as e:
+        print(f"Error loading PDF: {e}")
+        raise
 
-persist_directory = r"C:\Vaibhav\LangGraph_Book\LangGraphCourse\Agents"
-collection_name = "stock_market"
+    # Chunking Process
+    text_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap
+    )
 
-# If our collection does not exist in the directory, we create using the os command
-if not os.path.exists(persist_directory):
-    os.makedirs(persist_directory)
+    return text_splitter.split_documents(pages) # We now apply this to our pages
 
 
-try:
-    # Here, we actually create the chroma database using our embeddigns model
-    vectorstore = Chroma.from_documents(
-        documents=pages_split,
-        embedding=embeddings,
-        persist_directory=persist_directory,
-        collection_name=collection_name
+def load_or_build_vectorstore():
+    """
+    Reopens the persisted collection when it was built from the same source hash,
+    otherwise (re)indexes the PDF. Chunk ids are derived from the source hash, so an
+    interrupted build is resumed by upserting and restarts never add duplicates.
+    """
+    source_hash = compute_source_hash()
+
+    # If our collection does not exist in the directory, we create using the os command
+    if not os.path.exists(persist_directory):
+        os.makedirs(persist_directory)
+
+    vectorstore = Chroma(
+        collection_name=collection_name,
+        embedding_function=embeddings,
+        persist_directory=persist_directory
     )
-    print(f"Created ChromaDB vector store!")
-    
+    metadata = vectorstore._collection.metadata or {}
+    count = vectorstore._collection.count()
+
+    if metadata.get("source_hash") == source_hash and metadata.get("chunk_count") == count:
+        print(f"Reusing ChromaDB vector store ({count} chunks, source unchanged)")
+        return vectorstore
+
+    if count and metadata.get("building_hash") != source_hash:
+        # Built from another PDF/chunking (or by an older version of this script
+        # that appended duplicates on every run): old chunks would be stale, start over
+        print("Source changed, rebuilding ChromaDB vector store")
+        vectorstore.delete_collection()
+        vectorstore = Chroma(
+            collection_name=collection_name,
+            embedding_function=embeddings,
+            persist_directory=persist_directory
+        )
+
+    # Marks the build as in progress, so a crash is resumed instead of rebuilt
+    vectorstore._collection.modify(metadata={"building_hash": source_hash})
+
+    pages_split = load_and_split_pdf()
+    ids = [
+        hashlib.sha1(f"{source_hash}:{i}".encode("utf-8")).hexdigest()
+        for i in range(len(pages_split))
+    ]
+    # Chunks already written by an interrupted run are skipped (same content -> same id)
+    existing = set(vectorstore.get(ids=ids, include=[])["ids"])
+    missing = [i for i, chunk_id in enumerate(ids) if chunk_id not in existing]
+    if missing:
+        vectorstore.add_documents(
+            documents=[pages_split[i] for i in missing],
+            ids=[ids[i] for i in missing]
+        )
+
+    # Recorded last: a collection without the hash is treated as incomplete
+    vectorstore._collection.modify(metadata={
+        "building_hash": source_hash,
+        "source_hash": source_hash,
+        "chunk_count": len(pages_split),
+    })
+    print(f"Created ChromaDB vector store with {len(pages_split)} chunks!")
+    return vectorstore
+
+
+try:
+    vectorstore = load_or_build_vectorstore()
 except Exception as e:
     print(f"Error setting up ChromaDB: {str(e)}")
     raise
@@ -97,6 +165,7 @@ def retriever_tool(query: str) -> str:
 
 tools = [retriever_tool]
 
+summarizer = llm # unbound model, used to summarize old turns
 llm = llm.bind_tools(tools)
 
 class AgentState(TypedDict):
@@ -117,14 +186,15 @@ Please always cite the specific parts of the documents you use in your answers.
 """
 
 
-tools_dict = {our_tool.name: our_tool for our_tool in tools} # Creating a dictionary of our tools
+tool_executor = ParallelToolExecutor(tools) # Runs the retrieval queries of one turn concurrently
 
 # LLM Agent
 def call_llm(state: AgentState) -> AgentState:
     """Function to call the LLM with the current state."""
     messages = list(state['messages'])
     messages = [SystemMessage(content=system_prompt)] + messages
-    message = llm.invoke(messages)
+    # Older retrieved chunks are shortened and old turns summarized so the prompt stays bounded
+    message = llm.invoke(prepare_model_input(messages, llm=summarizer))
     return {'messages': [message]}
 
 
@@ -133,21 +203,11 @@ def take_action(state: AgentState) -> AgentState:
     """Execute tool calls from the LLM's response."""
 
     tool_calls = state['messages'][-1].tool_calls
-    results = []
     for t in tool_calls:
         print(f"Calling Tool: {t['name']} with query: {t['args'].get('query', 'No query provided')}")
-        
-        if not t['name'] in tools_dict: # Checks if a valid tool is present
-            print(f"\nTool: {t['name']} does not exist.")
-            result = "Incorrect Tool Name, Please Retry and Select tool from List of Available tools."
-        
-        else:
-            result = tools_dict[t['name']].invoke(t['args'].get('query', ''))
-            print(f"Result length: {len(str(result))}")
-            
 
-        # Appends the Tool Message
-        results.append(ToolMessage(tool_call_id=t['id'], name=t['name'], content=str(result)))
+    # ToolMessages come back in the same order as tool_calls
+    results = tool_executor.run(tool_calls)
 
     print("Tools Execution Complete. Back to the model!")
     return {'messages': results}
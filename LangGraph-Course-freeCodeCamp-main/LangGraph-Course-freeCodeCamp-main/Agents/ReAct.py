@@ -7,7 +7,8 @@ from langchain_openai import ChatOpenAI
 from langchain_core.tools import tool
 from langgraph.graph.message import add_messages
 from langgraph.graph import StateGraph, END
-from langgraph.prebuilt import ToolNode
+from context_window import prepare_model_input
+from tool_executor import ParallelToolExecutor
 
 
 load_dotenv()
@@ -34,14 +35,15 @@ def multiply(a: int, b: int):
 
 tools = [add, subtract, multiply]
 
-model = ChatOpenAI(model = "gpt-4o").bind_tools(tools)
+summarizer = ChatOpenAI(model = "gpt-4o") # summarizes old turns for the pre-model hook
+model = summarizer.bind_tools(tools)
 
 
 def model_call(state:AgentState) -> AgentState:
     system_prompt = SystemMessage(content=
         "You are my AI assistant, please answer my query to the best of your ability."
     )
-    response = model.invoke([system_prompt] + state["messages"])
+    response = model.invoke(prepare_model_input([system_prompt] + list(state["messages"]), llm=summarizer))
     return {"messages": [response]}
 
 
@@ -58,7 +60,7 @@ graph = StateGraph(AgentState)
 graph.add_node("our_agent", model_call)
 
 
-tool_node = ToolNode(tools=tools)
+tool_node = ParallelToolExecutor(tools)
 graph.add_node("tools", tool_node)
 
 graph.set_entry_point("our_agent")
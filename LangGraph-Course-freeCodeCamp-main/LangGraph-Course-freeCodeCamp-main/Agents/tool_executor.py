@@ -0,0 +1,68 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from langchain_core.messages import ToolMessage
+
+# Runs all tool calls of one AI message concurrently on a thread pool and returns the
+# ToolMessages in the order the model issued the calls. Tool calls are mostly I/O
+# (vector search, HTTP), so threads are enough to overlap them.
+#
+# Tools that share mutable state (e.g. Drafter's global document) can be listed in
+# `sequential_tools`: their calls run one after another, in call order, on a single
+# worker while the other tools still run in parallel.
+#
+# Usage as a graph node:  graph.add_node("tools", ParallelToolExecutor(tools))
+
+
+class ParallelToolExecutor:
+    def __init__(self, tools, max_workers=8, sequential_tools=()):
+        self.tools_by_name = {our_tool.name: our_tool for our_tool in tools}
+        self.sequential_tools = set(sequential_tools)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tool")
+
+    def _run_one(self, tool_call):
+        """Runs a single tool call; errors become the ToolMessage content so the model can react."""
+        name = tool_call['name']
+        started = time.perf_counter()
+
+        if name not in self.tools_by_name:
+            print(f"\nTool: {name} does not exist.")
+            content, status = "Incorrect Tool Name, Please Retry and Select tool from List of Available tools.", "error"
+        else:
+            try:
+                content, status = str(self.tools_by_name[name].invoke(tool_call['args'])), "success"
+            except Exception as e:
+                content, status = f"Error running tool {name}: {e}", "error"
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        print(f"Tool {name} {tool_call['args']} -> {len(content)} chars in {elapsed_ms:.0f} ms ({status})")
+        message = ToolMessage(tool_call_id=tool_call['id'], name=name, content=content, status=status)
+        return message, elapsed_ms
+
+    def _run_in_order(self, tool_calls):
+        return [self._run_one(tool_call) for tool_call in tool_calls]
+
+    def run(self, tool_calls):
+        """Executes `tool_calls` concurrently and returns their ToolMessages in call order."""
+        started = time.perf_counter()
+
+        sequential = [i for i, tool_call in enumerate(tool_calls) if tool_call['name'] in self.sequential_tools]
+        futures = {
+            i: self.executor.submit(self._run_one, tool_call)
+            for i, tool_call in enumerate(tool_calls)
+            if i not in sequential
+        }
+        if sequential:
+            sequential_future = self.executor.submit(self._run_in_order, [tool_calls[i] for i in sequential])
+
+        results = {i: future.result() for i, future in futures.items()}
+        if sequential:
+            results.update(zip(sequential, sequential_future.result()))
+
+        tool_ms = sum(elapsed_ms for _, elapsed_ms in results.values())
+        wall_ms = (time.perf_counter() - started) * 1000
+        print(f"Executed {len(tool_calls)} tool calls in {wall_ms:.0f} ms (sum of tool times {tool_ms:.0f} ms)")
+        return [results[i][0] for i in range(len(tool_calls))]
+
+    def __call__(self, state):
+        """Graph node: runs the tool calls of the last message in state['messages']."""
+        return {'messages': self.run(state['messages'][-1].tool_calls)}
@@ -1,16 +1,6 @@
 import os
 import streamlit as st
-from streamlit_chat import message
 import base64
-from io import BytesIO
-from PIL import Image
-import tempfile
-from pyvis.network import Network
-import streamlit.components.v1 as components
-from streamlit_option_menu import option_menu
-from streamlit_extras.stylable_container import stylable_container
-import requests
-from bs4 import BeautifulSoup
 
 # Import backend services
 from backend_services import (
@@ -22,8 +12,15 @@ from backend_services import (
     get_mock_response,
     process_documents,
     summarize_documents,
-    get_tavily_search_response
+    get_tavily_search_response,
+    stream_mock_response,
+    stream_tavily_search_response,
+    get_llm,
+    EMBEDDING_MODEL,
+    LLM_ROUTER
 )
+from job_runner import get_job_runner, get_client_id
+from resource_cache import get_shared_index_cache, sources_content_hash
 
 # Avatars removed as per user request
 
@@ -669,18 +666,278 @@ st.markdown("""
     }
     </style>
     """, unsafe_allow_html=True)
-# Helper function to show spinner overlay
-def show_spinner_overlay(title, subtitle):
-    spinner_html = f"""
-    <div class="spinner-overlay">
-        <div class="spinner-modal">
-            <div class="spinner-circle"></div>
-            <div class="spinner-title">{title}</div>
-            <div class="spinner-subtitle spinner-dots">{subtitle}</div>
-        </div>
-    </div>
+def escape_message(text):
+    """Escapes quotes so message text can be embedded in the chat bubble HTML."""
+    return text.replace('"', '&quot;').replace("'", "&#39;")
+
+def user_message_html(user_msg, first_message=False):
+    """HTML for a user chat bubble."""
+    top_margin = "margin-top: 0;" if first_message else ""
+    return f"""
+                <div class="user-message" style="{top_margin}">
+                    <div class="message-bubble user-bubble">
+                        <div style="font-weight: 600; margin-bottom: 6px; font-size: 0.85rem; color: #6b7280; display: flex; align-items: center;">
+                            <span style="margin-right: 6px;">🙂</span> You
+                        </div>
+                        <div style="color: #374151; line-height: 1.7;">{escape_message(user_msg)}</div>
+                    </div>
+                </div>
+                """
+
+def bot_message_html(response_text):
+    """HTML for an assistant chat bubble."""
+    return f"""
+                <div class="bot-message">
+                    <div class="message-bubble bot-bubble">
+                        <div style="font-weight: 600; margin-bottom: 6px; font-size: 0.85rem; color: #6366f1; display: flex; align-items: center;">
+                            <span style="margin-right: 6px;">🤖</span> Assistant
+                        </div>
+                        <div style="color: #374151; line-height: 1.7;">{escape_message(response_text)}</div>
+                    </div>
+                </div>
+                """
+
+def sources_html(sources):
+    """HTML for the sources list shown under an assistant message."""
+    html = "<div style='margin-top: 12px; padding-top: 12px; border-top: 1px dashed #e5e7eb;'>"
+    html += "<div style='font-size: 0.8rem; color: #6b7280; margin-bottom: 8px; font-weight: 500;'>📚 Sources:</div>"
+    html += "<div style='display: flex; flex-direction: column; gap: 8px;'>"
+    
+    for source in sources:
+        source_name = source.get('source', 'Unknown Source')
+        preview = escape_message(source.get('page_content', ''))
+        
+        html += f"""
+                        <div style='background: #f9fafb; border-radius: 8px; padding: 10px; border: 1px solid #e5e7eb;'>
+                            <div style='font-size: 0.8rem; font-weight: 500; color: #4b5563;'>{source_name}</div>
+                            <div style='font-size: 0.75rem; color: #6b7280; margin-top: 4px;'>{preview}</div>
+                        </div>
+                        """
+    
+    html += "</div></div>"
+    return html
+
+def stream_response_to_chat(user_input, result):
+    """Renders the answer tokens into a live chat bubble as they arrive.
+    
+    Args:
+        user_input (str): The question being answered
+        result (dict): {'stream': iterator of str, 'sources': list} from a stream_* backend call
+        
+    Returns:
+        dict: {'response': str, 'sources': list}, ready to append to the chat history
     """
-    return st.markdown(spinner_html, unsafe_allow_html=True)
+    live_area = st.empty()
+    response_text = ""
+    with live_area.container():
+        st.markdown(user_message_html(user_input, first_message=True), unsafe_allow_html=True)
+        bot_placeholder = st.empty()
+        bot_placeholder.markdown(bot_message_html("▌"), unsafe_allow_html=True)
+        for token in result['stream']:
+            response_text += token
+            bot_placeholder.markdown(bot_message_html(response_text + "▌"), unsafe_allow_html=True)
+    
+    # The finished exchange is rendered by the chat history below (with its sources)
+    live_area.empty()
+    return {'response': response_text, 'sources': result.get('sources', [])}
+
+# Chat history
+# Turns are append-only, so each turn's HTML is built once and kept in session state.
+# Only the newest CHAT_HISTORY_PAGE_SIZE turns are rendered by default, as a single
+# markdown element, which keeps rerun cost flat however long the conversation gets.
+
+CHAT_HISTORY_PAGE_SIZE = 10
+CHAT_DIVIDER_HTML = """
+                    <div style="margin: 20px 0; border-top: 1px dashed #e5e7eb;"></div>
+                    """
+
+def chat_turn_html(i):
+    """HTML for turn `i` (user message, answer, sources), built on first use and cached."""
+    cache = st.session_state['chat_turn_html']
+    if len(cache) > len(st.session_state['generated']):
+        # History was reset; cached turns no longer match
+        cache.clear()
+    while len(cache) <= i:
+        cache.append(None)
+    
+    if cache[i] is None:
+        bot_response = st.session_state["generated"][i]
+        
+        # Handle both string and dictionary responses (for backward compatibility)
+        if isinstance(bot_response, dict):
+            response_text = bot_response.get('response', '')
+            sources = bot_response.get('sources', [])
+        else:
+            response_text = bot_response
+            sources = []
+        
+        html = bot_message_html(response_text)
+        if sources:
+            html += sources_html(sources)
+        cache[i] = html
+    return cache[i]
+
+@st.fragment
+def render_chat_history():
+    """Renders the newest turns; older ones are only built when the user asks for them."""
+    num_pairs = len(st.session_state['generated'])
+    window = min(st.session_state['chat_history_window'], num_pairs)
+    oldest_shown = num_pairs - window
+    
+    parts = []
+    for i in reversed(range(oldest_shown, num_pairs)):
+        # The user bubble is cheap and its top margin depends on position, so it is not cached
+        parts.append(user_message_html(st.session_state['past'][i], first_message=(i == num_pairs - 1)))
+        parts.append(chat_turn_html(i))
+        # Add elegant divider between conversation pairs
+        if i > 0:
+            parts.append(CHAT_DIVIDER_HTML)
+    st.markdown("".join(parts), unsafe_allow_html=True)
+    
+    if oldest_shown > 0:
+        older = min(CHAT_HISTORY_PAGE_SIZE, oldest_shown)
+        if st.button(f"⬇️ Show {older} older messages ({oldest_shown} hidden)", use_container_width=True):
+            st.session_state['chat_history_window'] += CHAT_HISTORY_PAGE_SIZE
+            st.rerun(scope="fragment")
+
+# Background jobs
+# Long operations run on the shared job runner so the chat stays usable while they
+# work. Job functions run in worker threads: they must not call Streamlit APIs and
+# report progress through `job.update` instead.
+
+def process_documents_job(uploaded_files, websites, content_hash, client_id, job):
+    """Builds the index, or reuses the one another session already built from the same sources."""
+    def build():
+        success, message, vector_db = process_documents(
+            uploaded_files,
+            websites,
+            progress_callback=job.update,
+            collection_name=f"docs_{content_hash[:16]}"
+        )
+        if not success:
+            raise ValueError(message)
+        return vector_db
+    
+    try:
+        vector_db, reused = get_shared_index_cache().acquire(client_id, content_hash, build)
+    except ValueError as e:
+        return False, str(e), None
+    
+    num_chunks = vector_db._collection.count()
+    if reused:
+        return True, f"Loaded shared index with {num_chunks} document chunks.", vector_db
+    return True, f"Successfully processed {num_chunks} document chunks.", vector_db
+
+def knowledge_graph_job(documents, job):
+    from graph_creation import create_and_open_knowledge_graph
+    job.update(message=f"Extracting knowledge triples from {len(documents)} chunks...")
+    return create_and_open_knowledge_graph(documents, progress_callback=job.update)
+
+def audio_job(summary, job):
+    job.update(message="Converting summary to speech...")
+    return {'summary': summary, 'audio': text_to_speech(summary)}
+
+def summarize_files_job(uploaded_files, job):
+    doc_list = []
+    for file in uploaded_files:
+        job.update(message=f"Reading {file.name}")
+        docs = extract_text_from_file(file)
+        if docs:
+            doc_list.extend(docs)
+    return summarize_documents(doc_list, progress_callback=job.update) if doc_list else None
+
+def summarize_links_job(urls, job):
+    link_docs = []
+    for url in urls:
+        job.update(message=f"Fetching {url}")
+        docs = extract_text_from_url(url)
+        if docs:
+            link_docs.extend(docs)
+    return summarize_documents(link_docs, progress_callback=job.update) if link_docs else None
+
+def start_job(operation, fn, *args):
+    """Submits `fn` to the job runner and reruns so the progress panel shows up."""
+    get_job_runner().submit(get_client_id(), operation, fn, *args)
+    st.session_state.is_processing = True
+    st.session_state.current_operation = operation
+    st.rerun()
+
+def notify(level, message):
+    """Queues a message shown in the sidebar on the next run."""
+    st.session_state['job_notices'].append((level, message))
+
+def apply_job_result(job):
+    """Copies a finished job's result into session state (runs in the script thread)."""
+    if job.status == "failed":
+        notify("error", f"{job.name} failed: {job.error}")
+        return
+    
+    if job.name == "Processing Documents":
+        success, message, vector_db = job.result
+        if success:
+            st.session_state.documents_processed = True
+            st.session_state.processing_status = message
+            st.session_state.vector_db = vector_db
+            notify("success", message)
+        else:
+            notify("error", f"Error: {message}")
+    
+    elif job.name == "Generating Knowledge Graph":
+        if job.result:
+            notify("success", f"Knowledge graph generated successfully with {job.result} triples!")
+        else:
+            notify("error", "Failed to generate or open the knowledge graph. Please check the console for details.")
+    
+    elif job.name in ("Generating Doc Audio", "Generating Link Audio"):
+        summary_type = 'doc' if job.name == "Generating Doc Audio" else 'link'
+        if job.result['audio']:
+            st.session_state[f'{summary_type}_audio_base64'] = job.result['audio']
+            st.session_state[f'{summary_type}_audio_available'] = True
+            st.session_state[f'last_{summary_type}_summary'] = job.result['summary']
+            notify("success", "Audio generated successfully!")
+        else:
+            notify("error", "Failed to generate audio. Please try again.")
+    
+    elif job.name in ("Summarizing Documents", "Summarizing Links"):
+        summary_type = 'doc' if job.name == "Summarizing Documents" else 'link'
+        if job.result:
+            st.session_state[f'{summary_type}_summary'] = job.result
+            # Clear any existing audio when generating a new summary
+            st.session_state[f'{summary_type}_audio_available'] = False
+            st.session_state[f'last_{summary_type}_summary'] = job.result
+            notify("success", f"{'Document' if summary_type == 'doc' else 'Link'} summary generated successfully!")
+        else:
+            notify("warning", "Please upload documents first." if summary_type == 'doc' else "Please add website URLs first.")
+
+def sync_background_jobs():
+    """Applies finished jobs and derives the processing flags from the jobs still running."""
+    runner = get_job_runner()
+    client_id = get_client_id()
+    for job in runner.pop_finished(client_id):
+        apply_job_result(job)
+    active = runner.active_jobs(client_id)
+    st.session_state.is_processing = bool(active)
+    st.session_state.current_operation = active[0].name if active else None
+    
+    # The shared index may have been evicted while this session sat idle
+    if st.session_state.get('vector_db') is not None and not get_shared_index_cache().touch(client_id):
+        st.session_state.vector_db = None
+        st.session_state.documents_processed = False
+        st.session_state.processing_status = "Your document index expired. Please process your documents again."
+
+@st.fragment(run_every=1.0)
+def show_background_jobs():
+    """Polls the running jobs; reruns the whole app once they finish to apply results."""
+    jobs = [job.snapshot() for job in get_job_runner().jobs_for(get_client_id())]
+    if not any(job['status'] in ("pending", "running") for job in jobs):
+        st.rerun()
+    
+    for job in jobs:
+        st.progress(job['progress'], text=f"⏳ {job['name']}: {job['message']}")
+        if job['partial_results']:
+            with st.expander(f"Partial results ({len(job['partial_results'])})"):
+                for partial in job['partial_results']:
+                    st.markdown(partial)
 
 # Initialize session state
 if 'generated' not in st.session_state:
@@ -705,12 +962,20 @@ if 'current_operation' not in st.session_state:
     st.session_state['current_operation'] = None
 if 'use_external_search' not in st.session_state:
     st.session_state['use_external_search'] = False
+if 'job_notices' not in st.session_state:
+    st.session_state['job_notices'] = []
+if 'chat_turn_html' not in st.session_state:
+    st.session_state['chat_turn_html'] = []
+if 'chat_history_window' not in st.session_state:
+    st.session_state['chat_history_window'] = CHAT_HISTORY_PAGE_SIZE
 
 # Core application logic remains in app.py
 # Backend services have been moved to backend_services.py
 
 # Main App
 def main():
+    sync_background_jobs()
+    
     # Enhanced main title with elegant styling
     st.markdown("""
     <div style="text-align: center; padding: 2rem 0 1.5rem 0; margin-bottom: 2rem;">
@@ -793,37 +1058,35 @@ def main():
         if st.session_state.processing_status:
             st.info(st.session_state.processing_status)
         
+        # Progress of background jobs and messages from the ones that just finished
+        if st.session_state.is_processing:
+            show_background_jobs()
+        for level, notice in st.session_state['job_notices']:
+            getattr(st, level)(notice)
+        st.session_state['job_notices'] = []
+        
         # Process Documents button
         if st.button("🔍 Process Documents", use_container_width=True, 
                     disabled=not (uploaded_files or st.session_state.websites) or st.session_state.is_processing):
             if uploaded_files or st.session_state.websites:
-                st.session_state.is_processing = True
-                st.session_state.current_operation = "Processing Documents"
-                st.rerun()
+                websites = list(st.session_state.websites) if st.session_state.websites else None
+                start_job(
+                    "Processing Documents",
+                    process_documents_job,
+                    list(uploaded_files or []),
+                    websites,
+                    sources_content_hash(uploaded_files, websites, EMBEDDING_MODEL),
+                    get_client_id()
+                )
             else:
                 st.warning("Please upload documents or add website URLs first.")
         
-        # Execute processing if flagged
-        if st.session_state.is_processing and st.session_state.current_operation == "Processing Documents":
-            show_spinner_overlay("Processing Documents", "Analyzing and indexing your documents")
-            
-            success, message, vector_db = process_documents(
-                uploaded_files, 
-                st.session_state.websites if st.session_state.websites else None
-            )
-            
-            st.session_state.is_processing = False
-            st.session_state.current_operation = None
-            
-            if success:
-                st.session_state.documents_processed = True
-                st.session_state.processing_status = message
-                st.session_state.vector_db = vector_db
-                st.success(message)
-            else:
-                st.error(f"Error: {message}")
-            
-            st.rerun()
+        with st.expander("🧮 Server Memory"):
+            st.json(get_shared_index_cache().memory_report())
+        if LLM_ROUTER:
+            with st.expander("🔀 LLM Router"):
+                # Rolling p50/p95 latency and error rate per provider
+                st.json(get_llm().stats_report())
         
         # Add a button to open the knowledge graph HTML with enhanced styling
         st.markdown("""
@@ -833,16 +1096,6 @@ def main():
         """, unsafe_allow_html=True)
         if st.button("🎨 Generate Knowledge Graph", use_container_width=True, 
                     disabled=not st.session_state.documents_processed or st.session_state.is_processing):
-            st.session_state.is_processing = True
-            st.session_state.current_operation = "Generating Knowledge Graph"
-            st.rerun()
-        
-        # Execute knowledge graph generation if flagged
-        if st.session_state.is_processing and st.session_state.current_operation == "Generating Knowledge Graph":
-            from graph_creation import create_and_open_knowledge_graph
-            
-            show_spinner_overlay("Generating Knowledge Graph", "Creating visual representation of your data")
-            
             # Get the processed documents from the vector database
             if hasattr(st.session_state, 'vector_db') and st.session_state.vector_db is not None:
                 # Get all document chunks from the vector store
@@ -864,24 +1117,11 @@ def main():
                             ))
                 
                 if documents:
-                    success = create_and_open_knowledge_graph(documents, st_progress=st)
-                    st.session_state.is_processing = False
-                    st.session_state.current_operation = None
-                    
-                    if not success:
-                        st.error("Failed to generate or open the knowledge graph. Please check the console for details.")
-                    else:
-                        st.success("Knowledge graph generated successfully!")
+                    start_job("Generating Knowledge Graph", knowledge_graph_job, documents)
                 else:
-                    st.session_state.is_processing = False
-                    st.session_state.current_operation = None
                     st.warning("No document content available to generate knowledge graph.")
             else:
-                st.session_state.is_processing = False
-                st.session_state.current_operation = None
                 st.warning("No processed documents found. Please process your documents first.")
-            
-            st.rerun()
     
     # Main content area with elegant styling
     st.markdown("<div style='margin-top: 1rem;'></div>", unsafe_allow_html=True)
@@ -920,95 +1160,24 @@ def main():
             # Add user message to chat history
             st.session_state.past.append(user_input)
             
-            # Generate response based on search mode
+            # Generate response based on search mode, streaming tokens into the chat bubble
             if st.session_state['use_external_search']:
                 # Use Tavily external search
                 with st.spinner("🔍 Searching the web..."):
-                    response = get_tavily_search_response(user_input)
-                    st.session_state.generated.append(response)
+                    result = stream_tavily_search_response(user_input)
             else:
                 # Use document-based RAG
                 with st.spinner("Analyzing your question..."):
                     # Pass the database if it exists in session state
                     db = st.session_state.get('vector_db', None)
-                    response = get_mock_response(user_input, db=db)
-                    st.session_state.generated.append(response)
+                    result = stream_mock_response(user_input, db=db)
+            
+            response = stream_response_to_chat(user_input, result)
+            st.session_state.generated.append(response)
         
         # Display chat history (newest conversations at the top)
         if st.session_state['generated']:
-            
-            # Get the total number of message pairs
-            num_pairs = len(st.session_state['generated'])
-            
-            # Display message pairs in reverse order (newest first)
-            first_message = True
-            for i in reversed(range(num_pairs)):
-                # User message with elegant styling
-                user_msg = st.session_state['past'][i].replace('"', '&quot;').replace("'", "&#39;")
-                top_margin = "margin-top: 0;" if first_message else ""
-                st.markdown(f"""
-                <div class="user-message" style="{top_margin}">
-                    <div class="message-bubble user-bubble">
-                        <div style="font-weight: 600; margin-bottom: 6px; font-size: 0.85rem; color: #6b7280; display: flex; align-items: center;">
-                            <span style="margin-right: 6px;">🙂</span> You
-                        </div>
-                        <div style="color: #374151; line-height: 1.7;">{user_msg}</div>
-                    </div>
-                </div>
-                """, unsafe_allow_html=True)
-                
-                # Bot response with elegant styling
-                bot_response = st.session_state["generated"][i]
-                
-                # Handle both string and dictionary responses (for backward compatibility)
-                if isinstance(bot_response, dict):
-                    response_text = bot_response.get('response', '').replace('"', '&quot;').replace("'", "&#39;")
-                    sources = bot_response.get('sources', [])
-                else:
-                    response_text = bot_response.replace('"', '&quot;').replace("'", "&#39;")
-                    sources = []
-                
-                # Display the response
-                st.markdown(f"""
-                <div class="bot-message">
-                    <div class="message-bubble bot-bubble">
-                        <div style="font-weight: 600; margin-bottom: 6px; font-size: 0.85rem; color: #6366f1; display: flex; align-items: center;">
-                            <span style="margin-right: 6px;">🤖</span> Assistant
-                        </div>
-                        <div style="color: #374151; line-height: 1.7;">{response_text}</div>
-                    </div>
-                </div>
-                """, unsafe_allow_html=True)
-                
-                # Display sources if available
-                if sources:
-                    sources_html = "<div style='margin-top: 12px; padding-top: 12px; border-top: 1px dashed #e5e7eb;'>"
-                    sources_html += "<div style='font-size: 0.8rem; color: #6b7280; margin-bottom: 8px; font-weight: 500;'>📚 Sources:</div>"
-                    sources_html += "<div style='display: flex; flex-direction: column; gap: 8px;'>"
-                    
-                    for source in sources:
-                        source_name = source.get('source', 'Unknown Source')
-                        preview = source.get('page_content', '').replace('"', '&quot;').replace("'", "&#39;")
-                        
-                        sources_html += f"""
-                        <div style='background: #f9fafb; border-radius: 8px; padding: 10px; border: 1px solid #e5e7eb;'>
-                            <div style='font-size: 0.8rem; font-weight: 500; color: #4b5563;'>{source_name}</div>
-                            <div style='font-size: 0.75rem; color: #6b7280; margin-top: 4px;'>{preview}</div>
-                        </div>
-                        """
-                    
-                    sources_html += "</div></div>"
-                    st.markdown(sources_html, unsafe_allow_html=True)
-                
-                # Add elegant divider between conversation pairs
-                if i > 0:
-                    st.markdown("""
-                    <div style="margin: 20px 0; border-top: 1px dashed #e5e7eb;"></div>
-                    """, unsafe_allow_html=True)
-                
-                first_message = False
-            
-            # end chat history
+            render_chat_history()
         else:
             # Empty state with elegant styling (only show when no messages)
             st.markdown("""
@@ -1040,10 +1209,8 @@ def main():
                 # Add a button to generate audio for document summary
                 if st.button("🔊 Generate Audio", key="generate_doc_audio_btn", 
                            disabled=st.session_state.is_processing, use_container_width=True):
-                    st.session_state.is_processing = True
-                    st.session_state.current_operation = "Generating Doc Audio"
                     st.session_state['active_summary_type'] = 'doc'
-                    st.rerun()
+                    start_job("Generating Doc Audio", audio_job, st.session_state['doc_summary'])
             st.markdown("</div>", unsafe_allow_html=True)
         
         # Display link summary if it exists in session state
@@ -1057,10 +1224,8 @@ def main():
                 # Add a button to generate audio for link summary
                 if st.button("🔊 Generate Audio", key="generate_link_audio_btn", 
                            disabled=st.session_state.is_processing, use_container_width=True):
-                    st.session_state.is_processing = True
-                    st.session_state.current_operation = "Generating Link Audio"
                     st.session_state['active_summary_type'] = 'link'
-                    st.rerun()
+                    start_job("Generating Link Audio", audio_job, st.session_state['link_summary'])
             st.markdown("</div>", unsafe_allow_html=True)
         
         # Display audio player for document summary
@@ -1129,44 +1294,6 @@ def main():
                     st.session_state['link_audio_available'] = False
             st.markdown("</div>", unsafe_allow_html=True)
         
-        # Execute audio generation for document summary
-        if st.session_state.is_processing and st.session_state.current_operation == "Generating Doc Audio":
-            show_spinner_overlay("Generating Audio", "Converting document summary to speech")
-            
-            audio_data = text_to_speech(st.session_state['doc_summary'])
-            
-            st.session_state.is_processing = False
-            st.session_state.current_operation = None
-            
-            if audio_data:
-                st.session_state['doc_audio_base64'] = audio_data
-                st.session_state['doc_audio_available'] = True
-                st.session_state['last_doc_summary'] = st.session_state['doc_summary']
-                st.success("Audio generated successfully!")
-            else:
-                st.error("Failed to generate audio. Please try again.")
-            
-            st.rerun()
-        
-        # Execute audio generation for link summary
-        if st.session_state.is_processing and st.session_state.current_operation == "Generating Link Audio":
-            show_spinner_overlay("Generating Audio", "Converting link summary to speech")
-            
-            audio_data = text_to_speech(st.session_state['link_summary'])
-            
-            st.session_state.is_processing = False
-            st.session_state.current_operation = None
-            
-            if audio_data:
-                st.session_state['link_audio_base64'] = audio_data
-                st.session_state['link_audio_available'] = True
-                st.session_state['last_link_summary'] = st.session_state['link_summary']
-                st.success("Audio generated successfully!")
-            else:
-                st.error("Failed to generate audio. Please try again.")
-            
-            st.rerun()
-        
         # Summarize section with enhanced styling
         st.markdown("""
         <div style="background: white; padding: 1rem; border-radius: 12px; box-shadow: 0 2px 4px rgba(0, 0, 0, 0.05); margin-top: 1.5rem;">
@@ -1176,96 +1303,16 @@ def main():
         # Summarize Documents button
         if st.button("📝 Summarize Documents", use_container_width=True, 
                     disabled=st.session_state.is_processing or not uploaded_files):
-            st.session_state.is_processing = True
-            st.session_state.current_operation = "Summarizing Documents"
-            st.rerun()
+            start_job("Summarizing Documents", summarize_files_job, list(uploaded_files))
         
         st.markdown("<div style='margin: 0.75rem 0;'></div>", unsafe_allow_html=True)
         
         # Summarize Links button
         if st.button("🌐 Summarize Links", use_container_width=True, 
                     disabled=st.session_state.is_processing or not st.session_state.websites):
-            st.session_state.is_processing = True
-            st.session_state.current_operation = "Summarizing Links"
-            st.rerun()
+            start_job("Summarizing Links", summarize_links_job, list(st.session_state.websites))
         
         st.markdown("</div>", unsafe_allow_html=True)
-        
-        # Execute document summarization if flagged
-        if st.session_state.is_processing and st.session_state.current_operation == "Summarizing Documents":
-            show_spinner_overlay("Summarizing Documents", "Analyzing document content and generating summary")
-            
-            doc_list = []
-            
-            # Process uploaded files only
-            if uploaded_files:
-                for file in uploaded_files:
-                    docs = extract_text_from_file(file)
-                    if docs:
-                        doc_list.extend(docs)
-            
-            if doc_list:
-                try:
-                    # Use the summarize_documents function
-                    summary = summarize_documents(doc_list)
-                    st.session_state['doc_summary'] = summary
-                    
-                    # Clear any existing audio when generating a new summary
-                    st.session_state['doc_audio_available'] = False
-                    st.session_state['last_doc_summary'] = summary
-                    
-                    st.session_state.is_processing = False
-                    st.session_state.current_operation = None
-                    st.success("Document summary generated successfully!")
-                except Exception as e:
-                    st.session_state.is_processing = False
-                    st.session_state.current_operation = None
-                    st.error(f"Error generating document summary: {str(e)}")
-                    st.session_state['doc_summary'] = ""
-            else:
-                st.session_state.is_processing = False
-                st.session_state.current_operation = None
-                st.warning("Please upload documents first.")
-            
-            st.rerun()
-        
-        # Execute link summarization if flagged
-        if st.session_state.is_processing and st.session_state.current_operation == "Summarizing Links":
-            show_spinner_overlay("Summarizing Links", "Analyzing link content and generating summary")
-            
-            link_docs = []
-            
-            # Process websites only
-            if st.session_state.websites:
-                for url in st.session_state.websites:
-                    docs = extract_text_from_url(url)
-                    if docs:
-                        link_docs.extend(docs)
-            
-            if link_docs:
-                try:
-                    # Use the summarize_documents function
-                    summary = summarize_documents(link_docs)
-                    st.session_state['link_summary'] = summary
-                    
-                    # Clear any existing audio when generating a new summary
-                    st.session_state['link_audio_available'] = False
-                    st.session_state['last_link_summary'] = summary
-                    
-                    st.session_state.is_processing = False
-                    st.session_state.current_operation = None
-                    st.success("Link summary generated successfully!")
-                except Exception as e:
-                    st.session_state.is_processing = False
-                    st.session_state.current_operation = None
-                    st.error(f"Error generating link summary: {str(e)}")
-                    st.session_state['link_summary'] = ""
-            else:
-                st.session_state.is_processing = False
-                st.session_state.current_operation = None
-                st.warning("Please add website URLs first.")
-            
-            st.rerun()
 
 if __name__ == "__main__":
     main()
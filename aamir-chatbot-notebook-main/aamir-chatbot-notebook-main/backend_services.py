@@ -1,24 +1,19 @@
 import os
 import base64
-import requests
 import tempfile
-from bs4 import BeautifulSoup
-import PyPDF2
-import docx2txt
-from pptx import Presentation
-import networkx as nx
-from gtts import gTTS
 from io import BytesIO
+from functools import lru_cache
 
-from pptx import Presentation
-from langchain_core.documents import Document
 from dotenv import load_dotenv
-import os
-from langchain_google_genai import ChatGoogleGenerativeAI , GoogleGenerativeAIEmbeddings
-from langchain_community.vectorstores import Chroma
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_community.tools.tavily_search import TavilySearchResults
-from langchain_core.messages import HumanMessage
+from langchain_core.documents import Document
+from langchain_core.prompts import PromptTemplate
+from langchain_core.output_parsers import StrOutputParser
+
+# Parsers (pptx, pypdf, docx2txt), gTTS, networkx, Chroma, search and the Google
+# GenAI clients are imported inside the functions that use them, so importing this
+# module (and the first page render) does not pay for features nobody used yet.
+# See startup_profile.py for the import-time report.
+
 # from langchain.embeddings import OpenAIEmbeddings
 
 # Global variable to store the vector database
@@ -26,13 +21,66 @@ vector_db = None
 
 load_dotenv()
 
-embeddings = GoogleGenerativeAIEmbeddings(model="models/text-embedding-004")
-llm = ChatGoogleGenerativeAI(model="models/gemini-2.5-flash")
+EMBEDDING_MODEL = "models/text-embedding-004"
+CHAT_MODEL = "models/gemini-2.5-flash"
+# Web search runs on the server's Tavily account (.env), passed explicitly to the search cache
+TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")
+
+
+# Model clients are thread-safe and hold no per-user state, so one instance per
+# process is shared by every Streamlit session and background job.
+@lru_cache(maxsize=None)
+def get_embeddings():
+    from langchain_google_genai import GoogleGenerativeAIEmbeddings
+    return GoogleGenerativeAIEmbeddings(model=EMBEDDING_MODEL)
+
+
+# LLM_ROUTER=1 routes each call to the fastest healthy of CHAT_MODEL and ROUTER_MODELS
+# (see llm_router.py); LLM_ROUTER=fake uses offline fake providers.
+LLM_ROUTER = os.getenv("LLM_ROUTER", "")
+ROUTER_MODELS = ["models/gemini-2.5-flash-lite", "models/gemini-2.0-flash"]
+ROUTER_CAPABILITIES = ("chat", "tools", "structured_output", "long_context")
+
+
+# Call sites whose prompts repeat on unchanged input get their own LLM cache namespace
+# and TTL (see llm_cache.py, enabled with LLM_CACHE=1)
+LLM_CACHE_TTLS = {
+    "summarize_map": 30 * 24 * 3600,
+}
+
+
+@lru_cache(maxsize=None)
+def get_llm(cache_namespace=None):
+    """
+    The shared chat model. With a `cache_namespace`, a separate instance whose responses
+    are cached under that namespace (a no-op unless LLM_CACHE=1).
+    """
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    from llm_cache import get_llm_cache
+    cache = get_llm_cache(cache_namespace, ttl=LLM_CACHE_TTLS.get(cache_namespace)) if cache_namespace else None
+    if not LLM_ROUTER:
+        return ChatGoogleGenerativeAI(model=CHAT_MODEL, cache=cache)
+
+    from llm_router import RouterChatModel, Provider, FakeChatModel
+    if LLM_ROUTER == "fake":
+        providers = [
+            Provider("fake:fast", FakeChatModel(name="fast", latency=(0.05, 0.1)), ROUTER_CAPABILITIES),
+            Provider("fake:slow-tail", FakeChatModel(name="slow-tail", latency=(0.05, 1.5)), ROUTER_CAPABILITIES),
+            Provider("fake:flaky", FakeChatModel(name="flaky", error_rate=0.3), ROUTER_CAPABILITIES),
+        ]
+    else:
+        providers = [
+            Provider(f"google:{model}", ChatGoogleGenerativeAI(model=model), ROUTER_CAPABILITIES)
+            for model in [CHAT_MODEL] + ROUTER_MODELS
+        ]
+    print(f"LLM router over {[provider.name for provider in providers]}")
+    return RouterChatModel(providers=providers, cache=cache)
 
 
 
 def extract_ppt(file_path):
     """Loads a PPTX file using python-pptx and converts it to a list of LangChain Documents."""
+    from pptx import Presentation
     prs = Presentation(file_path)
     langchain_documents = []
     
@@ -70,17 +118,15 @@ def extract_ppt(file_path):
 
     return langchain_documents
 
-from langchain_community.document_loaders import Docx2txtLoader
-
 def extract_word(file_path):
+    from langchain_community.document_loaders import Docx2txtLoader
     loader = Docx2txtLoader(file_path)
     word_documents = loader.load()
     
     return word_documents
 
-from langchain_community.document_loaders import PyPDFLoader
-
 def extract_pdf(file_path):
+    from langchain_community.document_loaders import PyPDFLoader
     loader=PyPDFLoader(file_path)
     docs = loader.load()
     print(docs)
@@ -120,6 +166,7 @@ def extract_text_from_file(file):
                     doc.metadata['source'] = file.name
                 
             elif file_extension in ['pptx', 'ppt']:
+                from pptx import Presentation
                 prs = Presentation(tmp_file_path)
                 for i, slide in enumerate(prs.slides):
                     slide_text = []
@@ -157,12 +204,6 @@ def extract_text_from_file(file):
         
     return documents
 
-from langchain_community.document_loaders import WebBaseLoader
-from langchain_core.prompts import PromptTemplate
-from langchain_core.output_parsers import StrOutputParser
-from langchain_core.runnables import RunnableLambda
-import bs4
-
 def extract_text_from_url(url):
     """
     Extract text content from a given URL using WebBaseLoader.
@@ -182,6 +223,7 @@ def extract_text_from_url(url):
             url = f'https://{url}'
             
         # Configure WebBaseLoader with custom settings
+        from langchain_community.document_loaders import WebBaseLoader
         loader = WebBaseLoader(
             web_path=url,
             # Add any additional configuration here if needed
@@ -195,25 +237,37 @@ def extract_text_from_url(url):
     except Exception as e:
         raise Exception(f"Error processing URL {url}: {str(e)}")
 
-from dotenv import load_dotenv
-
-
-def process_documents(uploaded_files, website_urls=None):
+def process_documents(uploaded_files, website_urls=None, progress_callback=None, collection_name="langchain"):
     """
     Process all uploaded files and website URLs to create a vector database.
     
     Args:
         uploaded_files: List of uploaded file objects
         website_urls: List of website URLs (optional)
+        progress_callback: Optional callable(progress, message) for background jobs
+        collection_name: Chroma collection to create; in-memory collections with the
+            same name share storage within the process, so pass a unique name per index
         
     Returns:
         tuple: (success: bool, message: str, db: Chroma)
     """
+    def report(progress, message):
+        if progress_callback:
+            progress_callback(progress, message)
+    
+    from langchain_community.vectorstores import Chroma
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+    
     try:
         all_documents = []
+        # Reading sources is the first half of the work, embedding the second
+        total_sources = max(len(uploaded_files) + len(website_urls or []), 1)
+        done_sources = 0
         
         # Process uploaded files
         for file in uploaded_files:
+            report(0.5 * done_sources / total_sources, f"Reading {file.name}")
+            done_sources += 1
             try:
                 docs = extract_text_from_file(file)
                 if docs:
@@ -225,6 +279,8 @@ def process_documents(uploaded_files, website_urls=None):
         # Process website URLs
         if website_urls:
             for url in website_urls:
+                report(0.5 * done_sources / total_sources, f"Fetching {url}")
+                done_sources += 1
                 try:
                     docs = extract_text_from_url(url)
                     if docs:
@@ -244,12 +300,14 @@ def process_documents(uploaded_files, website_urls=None):
             is_separator_regex=False,
         )
         chunks = text_splitter.split_documents(all_documents)
+        report(0.5, f"Embedding {len(chunks)} chunks")
         
         # Create in-memory vector store
         global vector_db
         vector_db = Chroma.from_documents(
             documents=chunks,
-            embedding=embeddings,
+            embedding=get_embeddings(),
+            collection_name=collection_name,
             persist_directory=None  # This ensures it's not persisted to disk
         )
         
@@ -264,6 +322,7 @@ def generate_knowledge_graph(texts):
     """Generate a knowledge graph from the provided texts."""
     # Simple keyword extraction and relationship mapping
     # In a real implementation, you'd use NLP techniques
+    import networkx as nx
     G = nx.Graph()
     
     # Add nodes and edges based on co-occurrence
@@ -311,6 +370,7 @@ def text_to_speech(text, max_retries=2):
             print(f"Attempt {attempt + 1}: Generating speech for text (first 100 chars): {text[:100]}...")
             
             # Try with a timeout to prevent hanging
+            from gtts import gTTS
             tts = gTTS(text=text, lang='en', slow=False)
             
             # Use a buffer to store the audio data
@@ -343,16 +403,20 @@ def text_to_speech(text, max_retries=2):
     
     return None
 
-def summarize_documents(docs):
+def summarize_documents(docs, progress_callback=None):
     """
     Summarize documents using a map-reduce approach.
     
     Args:
         docs: List of Document objects to be summarized
+        progress_callback: Optional callable(progress, message, partial_result) that
+            receives each chunk summary as soon as it is ready
         
     Returns:
         str: A comprehensive summary of all documents
     """
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+    
     # 1. Split documents into chunks
     text_splitter = RecursiveCharacterTextSplitter(chunk_size=10000, chunk_overlap=500)
     chunks = text_splitter.split_documents(docs)
@@ -361,27 +425,86 @@ def summarize_documents(docs):
     map_prompt = PromptTemplate.from_template(
         "Write a concise summary of the following chunk of text:\n{context}\nCONCISE SUMMARY:"
     )
-    map_chain = map_prompt | llm | StrOutputParser()
+    # Map calls on unchanged chunks repeat exactly, so they can be served from the LLM cache
+    map_chain = map_prompt | get_llm("summarize_map") | StrOutputParser()
     
     # 3. Define the REDUCE Step
     reduce_prompt = PromptTemplate.from_template(
         "The following are concise summaries. Combine them into a single, comprehensive final summary:\n{context}\nFINAL SUMMARY:"
     )
-    reduce_chain = reduce_prompt | llm | StrOutputParser()
+    reduce_chain = reduce_prompt | get_llm() | StrOutputParser()
     
     # 4. Map-Reduce Process
     # MAP: Apply the map_chain to every document chunk
-    summaries = [map_chain.invoke({"context": chunk.page_content}) for chunk in chunks]
+    summaries = []
+    for i, chunk in enumerate(chunks):
+        summary = map_chain.invoke({"context": chunk.page_content})
+        summaries.append(summary)
+        if progress_callback:
+            # Leave the last 10% for the reduce call
+            progress_callback(0.9 * (i + 1) / len(chunks), f"Summarized part {i + 1} of {len(chunks)}", summary)
     
     # REDUCE: Combine all the summaries into a single string for the final prompt
     combined_summaries = "\n\n---\n\n".join(summaries)
+    if progress_callback:
+        progress_callback(0.9, "Combining partial summaries")
     
     # FINAL REDUCE CALL
     final_summary = reduce_chain.invoke({"context": combined_summaries})
-    
+
+    from llm_cache import llm_cache_stats
+    print(f"LLM cache: {llm_cache_stats()}")
     return final_summary
 
 
+RAG_PROMPT_TEMPLATE = """Use the following pieces of context to answer the question at the end. 
+        If you don't know the answer, just say that you don't know, don't try to make up an answer.
+        
+        {context}
+        
+        Question: {question}
+        
+        helpful Answer:"""
+
+
+def _retrieve_rag_context(user_input, db=None):
+    """Runs the similarity search for a RAG answer.
+    
+    Returns:
+        tuple: (context: str, sources: list) or (None, message) when there is nothing to answer from
+    """
+    # Get relevant documents from the database
+    if db is None:
+        from app import vector_db
+        db = vector_db
+        
+    if db is None:
+        return None, "I don't have any knowledge base to reference. Please upload some documents first."
+        
+    # Get the most relevant documents
+    docs = db.similarity_search(user_input, k=3)
+    
+    if not docs:
+        return None, "I couldn't find any relevant information in the knowledge base to answer your question."
+        
+    # Extract unique sources from documents
+    sources = []
+    seen_sources = set()
+    
+    for doc in docs:
+        source = doc.metadata.get('source', 'Unknown Source')
+        if source not in seen_sources:
+            seen_sources.add(source)
+            sources.append({
+                'source': source,
+                'page_content': doc.page_content[:200] + '...' if len(doc.page_content) > 200 else doc.page_content
+            })
+    
+    # Format the context from the documents
+    context = "\n\n".join([f"Document {i+1}:\n{doc.page_content}" for i, doc in enumerate(docs)])
+    return context, sources
+
+
 def get_mock_response(user_input, db=None):
     """Generate a response using RAG with the vector database.
     
@@ -397,61 +520,16 @@ def get_mock_response(user_input, db=None):
             }
     """
     try:
-        # Get relevant documents from the database
-        if db is None:
-            from app import vector_db
-            db = vector_db
-            
-        if db is None:
-            return {
-                'response': "I don't have any knowledge base to reference. Please upload some documents first.",
-                'sources': []
-            }
-            
-        # Get the most relevant documents
-        docs = db.similarity_search(user_input, k=3)
-        
-        if not docs:
+        context, sources = _retrieve_rag_context(user_input, db)
+        if context is None:
             return {
-                'response': "I couldn't find any relevant information in the knowledge base to answer your question.",
+                'response': sources,
                 'sources': []
             }
-            
-        # Extract unique sources from documents
-        sources = []
-        seen_sources = set()
-        
-        for doc in docs:
-            source = doc.metadata.get('source', 'Unknown Source')
-            if source not in seen_sources:
-                seen_sources.add(source)
-                sources.append({
-                    'source': source,
-                    'page_content': doc.page_content[:200] + '...' if len(doc.page_content) > 200 else doc.page_content
-                })
-        
-        # Format the context from the documents
-        context = "\n\n".join([f"Document {i+1}:\n{doc.page_content}" for i, doc in enumerate(docs)])
-        
-        # Create a prompt template
-        template = """Use the following pieces of context to answer the question at the end. 
-        If you don't know the answer, just say that you don't know, don't try to make up an answer.
-        
-        {context}
-        
-        Question: {question}
-        
-        helpful Answer:"""
         
         # Generate response using the LLM
-        from langchain_core.prompts import PromptTemplate
-        # from langchain_openai import ChatOpenAI
-        
-        prompt = PromptTemplate(template=template, input_variables=["context", "question"])
-        embeddings = GoogleGenerativeAIEmbeddings(model="models/text-embedding-004")
-        llm = ChatGoogleGenerativeAI(model="models/gemini-2.5-flash")
-        
-        chain = prompt | llm
+        prompt = PromptTemplate(template=RAG_PROMPT_TEMPLATE, input_variables=["context", "question"])
+        chain = prompt | get_llm()
         
         # Generate the response
         response = chain.invoke({"context": context, "question": user_input})
@@ -467,6 +545,97 @@ def get_mock_response(user_input, db=None):
         return "I encountered an error while processing your request. Please try again later."
 
 
+def stream_mock_response(user_input, db=None):
+    """Streaming variant of get_mock_response.
+    
+    Retrieval runs up front; the answer is generated with `chain.stream` so tokens
+    can be rendered as they arrive.
+    
+    Returns:
+        dict: {
+                'stream': iterator of str,  # Answer tokens
+                'sources': list             # Source documents, shown once the stream ends
+            }
+    """
+    try:
+        context, sources = _retrieve_rag_context(user_input, db)
+    except Exception as e:
+        print(f"Error generating response: {str(e)}")
+        return {
+            'stream': iter(["I encountered an error while processing your request. Please try again later."]),
+            'sources': []
+        }
+    
+    if context is None:
+        return {'stream': iter([sources]), 'sources': []}
+    
+    prompt = PromptTemplate(template=RAG_PROMPT_TEMPLATE, input_variables=["context", "question"])
+    chain = prompt | get_llm() | StrOutputParser()
+    
+    def token_stream():
+        try:
+            for token in chain.stream({"context": context, "question": user_input}):
+                yield token
+        except Exception as e:
+            print(f"Error generating response: {str(e)}")
+            yield "\n\nI encountered an error while processing your request. Please try again later."
+    
+    return {'stream': token_stream(), 'sources': sources}
+
+
+TAVILY_PROMPT_TEMPLATE = """You are a helpful AI assistant with access to web search results. 
+Use the following search results to provide a comprehensive and accurate answer to the user's question.
+Cite the sources when relevant.
+
+Search Results:
+{search_context}
+
+User Question: {user_query}
+
+Provide a detailed and well-structured answer based on the search results above:"""
+
+
+def _tavily_search_context(user_query):
+    """Runs the Tavily search and formats the results.
+    
+    Returns:
+        tuple: (search_context: str, sources: list), search_context is None when nothing was found
+    """
+    # Search through the process-wide cache (same question within the TTL = no API call)
+    from search_cache import get_search_cache
+    print(f"Searching for: {user_query}")
+    response = get_search_cache().search(
+        user_query,
+        use_case="chat",
+        api_key=TAVILY_API_KEY,
+        max_results=5,
+        search_depth="advanced",
+        include_answer=True,
+        include_raw_content=False,
+        include_images=False
+    )
+    search_results = response.get('results', [])
+    
+    if not search_results:
+        return None, []
+    
+    # Extract and format the search results
+    context_parts = []
+    sources = []
+    for idx, result in enumerate(search_results, 1):
+        if isinstance(result, dict):
+            title = result.get('title', 'No title')
+            content = result.get('content', result.get('snippet', 'No content'))
+            url = result.get('url', '')
+            context_parts.append(f"{idx}. {title}\n{content}\nSource: {url}\n")
+            sources.append({
+                'source': url or title,
+                'page_content': content[:200] + '...' if len(content) > 200 else content
+            })
+    
+    return "\n".join(context_parts), sources
+
+
 def get_tavily_search_response(user_query):
     """
     Generate a response using Tavily search tool and LLM with LCEL.
@@ -478,51 +647,14 @@ def get_tavily_search_response(user_query):
         str: Generated response based on Tavily search results
     """
     try:
-        # Initialize Tavily search tool
-        tavily_tool = TavilySearchResults(
-            max_results=5,
-            search_depth="advanced",
-            include_answer=True,
-            include_raw_content=False,
-            include_images=False
-        )
-        
-        # Bind the tool to the LLM
-        llm_with_tools = llm.bind_tools([tavily_tool])
-        
-        # Get search results from Tavily
-        print(f"Searching for: {user_query}")
-        search_results = tavily_tool.invoke({"query": user_query})
+        search_context, _ = _tavily_search_context(user_query)
         
         # Format search results into a readable context
-        if not search_results:
+        if not search_context:
             return "I couldn't find any relevant information from the web. Please try rephrasing your query."
         
-        # Extract and format the search results
-        context_parts = []
-        for idx, result in enumerate(search_results, 1):
-            if isinstance(result, dict):
-                title = result.get('title', 'No title')
-                content = result.get('content', result.get('snippet', 'No content'))
-                url = result.get('url', '')
-                context_parts.append(f"{idx}. {title}\n{content}\nSource: {url}\n")
-        
-        search_context = "\n".join(context_parts)
-        
-        # Create a prompt template for generating response using LCEL
-        prompt_template = """You are a helpful AI assistant with access to web search results. 
-Use the following search results to provide a comprehensive and accurate answer to the user's question.
-Cite the sources when relevant.
-
-Search Results:
-{search_context}
-
-User Question: {user_query}
-
-Provide a detailed and well-structured answer based on the search results above:"""
-        
         prompt = PromptTemplate(
-            template=prompt_template,
+            template=TAVILY_PROMPT_TEMPLATE,
             input_variables=["search_context", "user_query"]
         )
         
@@ -530,7 +662,7 @@ Provide a detailed and well-structured answer based on the search results above:
         chain = (
             {"search_context": lambda x: search_context, "user_query": lambda x: x}
             | prompt
-            | llm
+            | get_llm()
             | StrOutputParser()
         )
         
@@ -543,4 +675,45 @@ Provide a detailed and well-structured answer based on the search results above:
         error_msg = f"Error with Tavily search: {str(e)}"
         print(error_msg)
         return f"I encountered an error while searching the web: {str(e)}. Please try again later."
-    
\ No newline at end of file
+
+
+def stream_tavily_search_response(user_query):
+    """
+    Streaming variant of get_tavily_search_response.
+    
+    Returns:
+        dict: {
+                'stream': iterator of str,  # Answer tokens
+                'sources': list             # Search results used as context
+            }
+    """
+    try:
+        search_context, sources = _tavily_search_context(user_query)
+    except Exception as e:
+        print(f"Error with Tavily search: {str(e)}")
+        return {
+            'stream': iter([f"I encountered an error while searching the web: {str(e)}. Please try again later."]),
+            'sources': []
+        }
+    
+    if not search_context:
+        return {
+            'stream': iter(["I couldn't find any relevant information from the web. Please try rephrasing your query."]),
+            'sources': []
+        }
+    
+    prompt = PromptTemplate(
+        template=TAVILY_PROMPT_TEMPLATE,
+        input_variables=["search_context", "user_query"]
+    )
+    chain = prompt | get_llm() | StrOutputParser()
+    
+    def token_stream():
+        try:
+            for token in chain.stream({"search_context": search_context, "user_query": user_query}):
+                yield token
+        except Exception as e:
+            print(f"Error with Tavily search: {str(e)}")
+            yield f"\n\nI encountered an error while searching the web: {str(e)}. Please try again later."
+    
+    return {'stream': token_stream(), 'sources': sources}
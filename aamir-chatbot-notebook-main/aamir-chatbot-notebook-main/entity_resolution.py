@@ -0,0 +1,301 @@
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+import unicodedata
+from collections import Counter
+
+# Entity resolution for knowledge-graph triples.
+#
+# "Machine Learning", "machine learning" and "ML" should be one node. Names are resolved
+# in stages, cheapest first:
+#   1. the persisted alias index (normalized name -> canonical name): a dict lookup, so
+#      every name seen in an earlier run resolves in O(1);
+#   2. normalization (case, punctuation, leading articles, simple plurals);
+#   3. acronyms ("ML" -> "Machine Learning") among the names of this run and the index,
+#      only for names written in capitals and only when exactly one name has those initials;
+#   4. embedding similarity: names are blocked by the first letter of their normalized
+#      form, and each block is compared with one vectorized cosine-similarity matrix
+#      (no Python double loop); pairs above SIMILARITY_THRESHOLD are merged.
+# New aliases are written back to the index so the next run skips stages 2-4 for them.
+# Wrong merges are undone with `python entity_resolution.py forget "<canonical name>"`,
+# and `python entity_resolution.py reset` deletes the whole index.
+
+ALIAS_INDEX_PATH = os.getenv("ENTITY_ALIAS_INDEX", "entity_aliases.json")
+EMBEDDINGS_PATH = os.getenv("ENTITY_EMBEDDINGS", "entity_embeddings.npz")
+SIMILARITY_THRESHOLD = 0.92
+MAX_BLOCK_SIZE = 2000  # larger blocks are compared in slices of this many rows
+
+_ARTICLES = re.compile(r"^(the|a|an)\s+")
+
+
+def normalize_entity(name):
+    """Case-, punctuation- and article-insensitive form of an entity name."""
+    text = unicodedata.normalize("NFKC", name).lower().strip()
+    text = re.sub(r"[^\w\s]", " ", text)
+    text = re.sub(r"\s+", " ", text).strip()
+    text = _ARTICLES.sub("", text)
+    # Plural of the last word ("neural networks" -> "neural network"), not "ss"/"us"/"is"
+    if len(text) > 4 and text.endswith("s") and not text.endswith(("ss", "us", "is")):
+        text = text[:-1]
+    return text
+
+
+def acronym(normalized):
+    """Initials of a multi-word name ("machine learning" -> "ml"), else None."""
+    words = normalized.split()
+    return "".join(word[0] for word in words) if len(words) > 1 else None
+
+
+def _write_atomic(path, write):
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    os.close(fd)
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+
+
+class AliasIndex:
+    """
+    Persisted alias table (normalized alias -> canonical name) plus the embedding of
+    every canonical name, so new names can be compared with earlier runs' entities.
+    """
+
+    def __init__(self, path=ALIAS_INDEX_PATH, embeddings_path=EMBEDDINGS_PATH):
+        self.path = path
+        self.embeddings_path = embeddings_path
+        self.aliases = {}
+        self.embeddings = {}  # canonical name -> unit vector (numpy array)
+        self.lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        if os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as f:
+                self.aliases = json.load(f).get("aliases", {})
+        if os.path.exists(self.embeddings_path):
+            import numpy as np
+            with np.load(self.embeddings_path, allow_pickle=False) as data:
+                self.embeddings = dict(zip(data["names"].tolist(), data["vectors"]))
+
+    def save(self):
+        def write_aliases(tmp_path):
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"aliases": self.aliases}, f, ensure_ascii=False, indent=1)
+
+        _write_atomic(self.path, write_aliases)
+        if self.embeddings:
+            import numpy as np
+            names = list(self.embeddings)
+
+            def write_embeddings(tmp_path):
+                with open(tmp_path, "wb") as f:
+                    np.savez(f, names=np.array(names), vectors=np.stack([self.embeddings[n] for n in names]))
+
+            _write_atomic(self.embeddings_path, write_embeddings)
+        elif os.path.exists(self.embeddings_path):
+            os.remove(self.embeddings_path)
+
+    def reset(self):
+        """Forgets every alias and embedding and deletes the persisted files."""
+        with self.lock:
+            self.aliases, self.embeddings = {}, {}
+            for path in (self.path, self.embeddings_path):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def forget(self, canonical_names):
+        """Drops the given canonical names with all their aliases; returns the aliases removed."""
+        canonical_names = set(canonical_names)
+        with self.lock:
+            removed = [alias for alias, canonical in self.aliases.items() if canonical in canonical_names]
+            for alias in removed:
+                del self.aliases[alias]
+            for canonical in canonical_names:
+                self.embeddings.pop(canonical, None)
+            self.save()
+        return len(removed)
+
+    def lookup(self, name):
+        """Canonical name of `name` if it was resolved before, else None (O(1))."""
+        return self.aliases.get(normalize_entity(name))
+
+    def canonical_names(self):
+        return set(self.aliases.values())
+
+
+class EntityResolver:
+    """Maps the entity names of one extraction run onto canonical names."""
+
+    def __init__(self, index, embed_documents=None, threshold=SIMILARITY_THRESHOLD):
+        self.index = index
+        self.embed_documents = embed_documents  # callable(list[str]) -> list[vector], optional
+        self.threshold = threshold
+
+    def resolve(self, names):
+        """
+        Returns {name: canonical name} for every name and records the new aliases.
+        The most frequent surface form of a group becomes its canonical name (ties go to
+        the shortest name that is not an acronym), unless the group already has a
+        canonical name in the index.
+        """
+        with self.index.lock:
+            mapping, counts = {}, Counter(name.strip() for name in names if name.strip())
+
+            # 1. Known aliases
+            unknown = []
+            for name in counts:
+                canonical = self.index.lookup(name)
+                if canonical is not None:
+                    mapping[name] = canonical
+                else:
+                    unknown.append(name)
+            if not unknown:
+                return mapping
+            known_canonicals = self.index.canonical_names() | set(mapping.values())
+
+            # 2. Group the unknown names by normalized form
+            groups = {}
+            for name in unknown:
+                groups.setdefault(normalize_entity(name) or name.lower(), []).append(name)
+            parent = {key: key for key in groups}
+
+            def find(key):
+                while parent[key] != key:
+                    parent[key] = parent[parent[key]]
+                    key = parent[key]
+                return key
+
+            # Known canonical names take part in the matching but are never renamed
+            anchors = {normalize_entity(canonical): canonical for canonical in known_canonicals}
+
+            # 3. Acronyms, against this run's names and the known canonical names. Only a
+            # name written in capitals counts as an acronym ("ML", not "Go"), and initials
+            # shared by several names ("GO": "Graph Optimization", "Gene Ontology") are skipped
+            by_acronym = {}
+            for key in list(groups) + list(anchors):
+                initials = acronym(key)
+                if initials:
+                    by_acronym.setdefault(initials, set()).add(key)
+            merged_into_anchor = {}
+            for key in groups:
+                candidates = by_acronym.get(key, set()) - {key}
+                if len(candidates) != 1 or not any(name.isupper() for name in groups[key]):
+                    continue
+                target = next(iter(candidates))
+                if target in groups:
+                    parent[find(key)] = find(target)
+                else:
+                    merged_into_anchor[key] = anchors[target]
+
+            # 4. Embedding similarity within blocks
+            key_vectors = {}
+            if self.embed_documents is not None:
+                key_vectors = self._merge_similar(groups, anchors, parent, find, merged_into_anchor)
+
+            # Pick a canonical name per cluster and record every alias
+            clusters = {}
+            for key in groups:
+                clusters.setdefault(find(key), []).append(key)
+            for root, keys in clusters.items():
+                members = [name for key in keys for name in groups[key]]
+                anchor = next((merged_into_anchor[key] for key in keys if key in merged_into_anchor), None)
+                if anchor is None:
+                    anchor = next((anchors[key] for key in keys if key in anchors), None)
+                canonical = anchor or max(members, key=lambda name: (counts[name], len(name) > 4, -len(name)))
+                for key in keys:
+                    self.index.aliases[key] = canonical
+                for name in members:
+                    mapping[name] = canonical
+                    self.index.aliases[normalize_entity(name) or name.lower()] = canonical
+                # Remember one vector per canonical name for the next runs' comparisons
+                if canonical not in self.index.embeddings:
+                    vector = next((key_vectors[key] for key in keys if key in key_vectors), None)
+                    if vector is not None:
+                        self.index.embeddings[canonical] = vector
+
+            self.index.save()
+            merged = len(counts) - len(set(mapping.values()))
+            print(f"Entity resolution: {len(counts)} names -> {len(set(mapping.values()))} entities "
+                  f"({merged} merged, {len(counts) - len(unknown)} from the alias index)")
+            return mapping
+
+    def _merge_similar(self, groups, anchors, parent, find, merged_into_anchor):
+        """Union-merges similar names; returns the unit vector of every embedded name."""
+        import numpy as np
+
+        new_keys = [key for key in groups if key not in merged_into_anchor]
+        if not new_keys:
+            return {}
+        try:
+            vectors = np.asarray(self.embed_documents(new_keys), dtype=np.float32)
+        except Exception as e:
+            print(f"Entity resolution: embeddings unavailable, skipping similarity merge ({e})")
+            return {}
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True) + 1e-12
+
+        # Canonical names of earlier runs join the blocks with their stored vectors
+        anchor_keys = [key for key, canonical in anchors.items() if canonical in self.index.embeddings]
+        keys = new_keys + anchor_keys
+        if anchor_keys:
+            stored = np.stack([self.index.embeddings[anchors[key]] for key in anchor_keys]).astype(np.float32)
+            if stored.shape[1] == vectors.shape[1]:
+                vectors = np.vstack([vectors, stored])
+            else:
+                keys = new_keys  # embedding model changed: stored vectors are not comparable
+
+        blocks = {}
+        for row, key in enumerate(keys):
+            blocks.setdefault(key[:1], []).append(row)
+
+        for rows in blocks.values():
+            if len(rows) < 2:
+                continue
+            block = vectors[rows]
+            for start in range(0, len(rows), MAX_BLOCK_SIZE):
+                similarity = block[start:start + MAX_BLOCK_SIZE] @ block.T  # cosine: rows are unit vectors
+                for i, j in zip(*np.nonzero(similarity >= self.threshold)):
+                    a, b = keys[rows[start + i]], keys[rows[j]]
+                    if a == b:
+                        continue
+                    a_new, b_new = a in groups, b in groups
+                    if a_new and b_new:
+                        parent[find(a)] = find(b)
+                    elif a_new and a not in merged_into_anchor:
+                        merged_into_anchor[a] = anchors[b]
+                    elif b_new and b not in merged_into_anchor:
+                        merged_into_anchor[b] = anchors[a]
+
+        return {key: vectors[row] for row, key in enumerate(new_keys)}
+
+
+_alias_index = None
+_alias_index_lock = threading.Lock()
+
+
+def get_alias_index():
+    """The alias index shared by every session and background job in this process."""
+    global _alias_index
+    with _alias_index_lock:
+        if _alias_index is None:
+            _alias_index = AliasIndex()
+        return _alias_index
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "stats"
+    index = AliasIndex()
+    if command == "reset":
+        index.reset()
+        print(f"Deleted {index.path} and {index.embeddings_path}")
+    elif command == "forget":
+        print(f"Removed {index.forget(sys.argv[2:])} aliases of {', '.join(sys.argv[2:])}")
+    else:
+        print(f"{len(index.aliases)} aliases of {len(index.canonical_names())} entities, "
+              f"{len(index.embeddings)} embeddings")
@@ -10,9 +10,14 @@ from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.documents import Document 
 from dotenv import load_dotenv
+from llm_cache import get_llm_cache
 
 load_dotenv()
 
+# Extraction of unchanged documents repeats the same prompt at temperature 0.1, so the
+# triples are served from the LLM cache (when LLM_CACHE=1) for this long
+KG_CACHE_TTL = 30 * 24 * 3600
+
 
 # --- 1. Define Pydantic Schema for Structured Output ---
 
@@ -26,9 +31,181 @@ class KnowledgeGraphSchema(BaseModel):
     """A container for the list of knowledge triples extracted from the text."""
     triples: List[KnowledgeTriple]
 
-# --- 2. Main Logic Function ---
+# --- 2. Per-chunk Extraction ---
+
+# The documents are extracted chunk by chunk instead of in one huge request: each chunk's
+# triples are validated on their own, failed chunks are retried, and the graph is
+# rendered from whatever was extracted even if some chunks still fail.
+KG_CHUNK_CHARS = 6000
+KG_CHUNK_OVERLAP = 200
+KG_MAX_RETRIES = 2  # extra attempts for the chunks that failed
+KG_RETRY_DELAY = 2.0  # seconds, doubled on every retry round
+KG_MAX_WORKERS = 4
+
+KG_SYSTEM_INSTRUCTION = (
+    "You are an expert knowledge graph extractor. "
+    "Your task is to analyze the provided text and extract a list of "
+    "accurate Subject-Predicate-Object triples. The output MUST be a JSON "
+    "object that strictly adheres to the provided schema. "
+    "Identify the most important entities and their direct relationships."
+)
+
+
+def split_into_chunks(docs: List[Document], chunk_chars: int = KG_CHUNK_CHARS) -> List[str]:
+    """Splits the documents' text into chunks of at most `chunk_chars` characters."""
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+    splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_chars, chunk_overlap=KG_CHUNK_OVERLAP)
+    return [chunk.page_content for chunk in splitter.split_documents(docs) if chunk.page_content.strip()]
+
+
+def validate_triples(candidates) -> List[KnowledgeTriple]:
+    """
+    Validates triples one by one, so a single malformed triple does not discard the rest
+    of the chunk. Accepts KnowledgeTriple objects or raw dicts (e.g. tool-call arguments).
+    """
+    valid = []
+    for candidate in candidates or []:
+        try:
+            triple = candidate if isinstance(candidate, KnowledgeTriple) else KnowledgeTriple.model_validate(candidate)
+        except Exception:
+            continue
+        triple = KnowledgeTriple(subject=triple.subject.strip(), predicate=triple.predicate.strip(), object=triple.object.strip())
+        if triple.subject and triple.predicate and triple.object:
+            valid.append(triple)
+    return valid
+
+
+def build_extraction_chain(api_key: str, use_cache: bool = True):
+    """
+    Prompt | Gemini with structured output, returning the raw message alongside the parse.
+    Retries use `use_cache=False`: the cache stores the raw response before it is parsed,
+    so a cached chain would replay the same unusable response.
+    """
+    llm = ChatGoogleGenerativeAI(
+        model="gemini-2.5-flash",
+        api_key=api_key,
+        temperature=0.1,
+        # cache=False bypasses any cache, including a global one
+        cache=get_llm_cache("knowledge_graph", ttl=KG_CACHE_TTL) if use_cache else False
+    )
+    prompt = ChatPromptTemplate.from_messages([
+        ("system", KG_SYSTEM_INSTRUCTION),
+        ("human", "Extract knowledge triples from the following text:\n\n{text}"),
+    ])
+    # include_raw keeps the tool-call arguments when the schema as a whole fails to parse
+    return prompt | llm.with_structured_output(KnowledgeGraphSchema, include_raw=True)
+
+
+def extract_chunk_triples(chain, text: str) -> List[KnowledgeTriple]:
+    """
+    Extracts the triples of one chunk. Raises when the call fails or nothing in the
+    response is a valid triple, so the chunk is retried.
+    """
+    response = chain.invoke({"text": text})
+    parsed = response.get("parsed")
+    if isinstance(parsed, KnowledgeGraphSchema):
+        return validate_triples(parsed.triples)
+
+    # Salvage the valid triples from the raw tool call
+    raw = response.get("raw")
+    triples = []
+    for tool_call in getattr(raw, "tool_calls", None) or []:
+        triples.extend(validate_triples(tool_call.get("args", {}).get("triples")))
+    if not triples:
+        raise ValueError(f"unparseable response: {response.get('parsing_error')}")
+    return triples
+
+
+def extract_triples(chain, chunks: List[str], progress_callback=None, retry_chain=None):
+    """
+    Extracts all chunks in parallel, then retries only the failed ones with
+    `retry_chain` (an uncached chain; defaults to `chain`).
+
+    Returns:
+        tuple: (deduplicated triples in chunk order, number of chunks that still failed)
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    import time
+
+    results = {}
+    pending = list(range(len(chunks)))
+    delay = KG_RETRY_DELAY
+    for attempt in range(KG_MAX_RETRIES + 1):
+        if attempt:
+            print(f"Retrying {len(pending)} failed chunks in {delay:.0f}s (attempt {attempt + 1})...")
+            time.sleep(delay)
+            delay *= 2
+
+        attempt_chain = retry_chain if attempt and retry_chain is not None else chain
+
+        def run(index):
+            try:
+                return index, extract_chunk_triples(attempt_chain, chunks[index]), None
+            except Exception as e:
+                return index, None, e
 
-def generate_knowledge_graph(docs: List[Document], html_filepath: str = "knowledge_graph.html") -> int:
+        failed = []
+        with ThreadPoolExecutor(max_workers=KG_MAX_WORKERS) as executor:
+            for index, triples, error in executor.map(run, pending):
+                if error is None:
+                    results[index] = triples
+                else:
+                    print(f"Chunk {index + 1}/{len(chunks)} failed: {error}")
+                    failed.append(index)
+                if progress_callback:
+                    progress_callback(len(results) / len(chunks),
+                                      f"Extracted triples from {len(results)} of {len(chunks)} chunks")
+        pending = failed
+        if not pending:
+            break
+
+    seen = set()
+    triples = []
+    for index in sorted(results):
+        for triple in results[index]:
+            key = (triple.subject, triple.predicate, triple.object)
+            if key not in seen:
+                seen.add(key)
+                triples.append(triple)
+    return triples, len(pending)
+
+
+def resolve_entities(triples: List[KnowledgeTriple]):
+    """
+    Merges the different names of one entity ("ML", "machine learning", ...) before the
+    graph is built, using the persisted alias index (see entity_resolution.py).
+
+    Returns:
+        tuple: (triples with canonical names, {canonical name: other names seen this run})
+    """
+    from entity_resolution import EntityResolver, get_alias_index
+    from backend_services import get_embeddings
+
+    resolver = EntityResolver(get_alias_index(), embed_documents=get_embeddings().embed_documents)
+    mapping = resolver.resolve([t.subject for t in triples] + [t.object for t in triples])
+
+    aliases = {}
+    for name, canonical in mapping.items():
+        if name != canonical:
+            aliases.setdefault(canonical, set()).add(name)
+
+    seen = set()
+    resolved = []
+    for triple in triples:
+        subject, obj = mapping.get(triple.subject, triple.subject), mapping.get(triple.object, triple.object)
+        key = (subject, triple.predicate, obj)
+        # "ML -> is -> Machine Learning" collapses into a self-loop: drop it
+        if subject == obj or key in seen:
+            continue
+        seen.add(key)
+        resolved.append(KnowledgeTriple(subject=subject, predicate=triple.predicate, object=obj))
+    return resolved, aliases
+
+
+# --- 3. Main Logic Function ---
+
+def generate_knowledge_graph(docs: List[Document], html_filepath: str = "knowledge_graph.html",
+                             progress_callback=None) -> int:
     """
     Generates an interactive knowledge graph from a list of Document objects using 
     Gemini, NetworkX, and Pyvis, and saves it as an HTML file.
@@ -36,71 +213,46 @@ def generate_knowledge_graph(docs: List[Document], html_filepath: str = "knowled
     Args:
         docs: A list of Document objects containing the text content.
         html_filepath: The path to save the generated HTML file.
+        progress_callback: Optional callable(progress, message) for extraction progress.
+
+    Returns:
+        int: Number of triples in the graph (0 if nothing could be extracted; no file is written).
     """
     print("Starting Knowledge Graph generation from Document list...")
 
-    # Combine all document contents into a single string for the LLM
-    text_input = " ".join([doc.page_content for doc in docs])
-    
-    if not text_input.strip():
+    chunks = split_into_chunks(docs)
+    if not chunks:
         print("ERROR: Input documents contained no readable text content.")
-        return
+        return 0
 
     # Configuration and Initialization
     # NOTE: Ensure the GOOGLE_API_KEY environment variable is set.
     api_key = os.environ.get("GOOGLE_API_KEY", "")
     if not api_key:
         print("ERROR: GOOGLE_API_KEY environment variable is not set. Cannot proceed with LLM call.")
-        return
-
-    # 1. Initialize LLM with structured output
-    try:
-        llm = ChatGoogleGenerativeAI(
-            model="gemini-2.5-flash",
-            api_key=api_key,
-            temperature=0.1
-        )
-        
-        # Use with_structured_output to force the model to return JSON matching the schema
-        structured_llm = llm.with_structured_output(KnowledgeGraphSchema)
-        
-        # Define the system instruction and user prompt
-        system_instruction = (
-            "You are an expert knowledge graph extractor. "
-            "Your task is to analyze the provided text and extract a list of "
-            "accurate Subject-Predicate-Object triples. The output MUST be a JSON "
-            "object that strictly adheres to the provided schema. "
-            "Identify the most important entities and their direct relationships."
-        )
-        
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", system_instruction),
-            ("human", "Extract knowledge triples from the following text:\n\n{text}"),
-        ])
-
-        # Chain the prompt and the LLM
-        kg_chain = prompt | structured_llm
-
-        print("Calling Gemini model to extract triples...")
-        response_data = kg_chain.invoke({"text": text_input})
-        
-    except Exception as e:
-        print(f"An error occurred during LLM invocation: {e}")
-        return
+        return 0
 
-    # 2. Extract Triples
-    if not response_data or not isinstance(response_data, KnowledgeGraphSchema):
-        print("ERROR: Failed to parse structured output from the LLM.")
-        return
+    # 1. Extract validated triples chunk by chunk
+    print(f"Calling Gemini model to extract triples from {len(chunks)} chunks...")
+    triples, failed_chunks = extract_triples(
+        build_extraction_chain(api_key), chunks, progress_callback,
+        retry_chain=build_extraction_chain(api_key, use_cache=False),
+    )
 
-    triples = response_data.triples
     if not triples:
         print("No knowledge triples were extracted by the model.")
-        return
+        return 0
 
+    if failed_chunks:
+        print(f"WARNING: {failed_chunks} of {len(chunks)} chunks failed; rendering a partial graph.")
     print(f"Successfully extracted {len(triples)} triples.")
     
-    # 3. Build the NetworkX Graph
+    # 2. Merge aliases, then build the NetworkX Graph
+    triples, aliases = resolve_entities(triples)
+
+    def node_title(name):
+        return f"{name} (also: {', '.join(sorted(aliases[name]))})" if name in aliases else name
+
     graph = nx.DiGraph()
     for triple in triples:
         subject = triple.subject.strip()
@@ -108,14 +260,14 @@ def generate_knowledge_graph(docs: List[Document], html_filepath: str = "knowled
         obj = triple.object.strip()
 
         # Add nodes
-        graph.add_node(subject, title=subject, group='subject')
-        graph.add_node(obj, title=obj, group='object')
+        graph.add_node(subject, title=node_title(subject), group='subject')
+        graph.add_node(obj, title=node_title(obj), group='object')
 
         # Add edge (relationship)
         # Use the predicate as the edge label
         graph.add_edge(subject, obj, title=predicate, label=predicate)
 
-    # 4. Convert to Pyvis Network for visualization
+    # 3. Convert to Pyvis Network for visualization
     # Note: notebook=False ensures it's configured for a standalone HTML file
     net = Network(height="750px", width="100%", bgcolor="#222222", font_color="white", notebook=False)
     net.toggle_physics(True) 
@@ -165,7 +317,7 @@ def generate_knowledge_graph(docs: List[Document], html_filepath: str = "knowled
         }
     """)
     
-    # 5. Save the HTML file with the number of triples in a comment
+    # 4. Save the HTML file
     net.save_graph(html_filepath)
     
     # Add professional styling and header to the HTML file
@@ -401,8 +553,6 @@ def generate_knowledge_graph(docs: List[Document], html_filepath: str = "knowled
     </style>
 </head>
 <body>
-    <!-- Triples extracted: {len(triples)} -->
-    
     <div class="header">
         <div class="header-content">
             <div class="title-section">
@@ -469,16 +619,12 @@ def generate_knowledge_graph(docs: List[Document], html_filepath: str = "knowled
             f.seek(0)
             f.truncate()
             f.write(styled_html)
-        else:
-            # Fallback: just add the comment if regex fails
-            f.seek(0, 0)
-            f.write(f"<!-- Triples extracted: {len(triples)} -->\n" + content)
     
     print(f"Successfully generated and saved knowledge graph with {len(triples)} triples to: {html_filepath}")
     return len(triples)
 
 
-# --- 3. Example Usage ---
+# --- 4. Example Usage ---
 
 if __name__ == "__main__":
     # Example documents, simulating chunking or retrieval
@@ -505,16 +651,17 @@ if __name__ == "__main__":
     print("\nTo view the graph, open 'ai_knowledge_kg.html' in your web browser.")
 
 
-def create_and_open_knowledge_graph(documents: List[Document], st_progress=None) -> bool:
+def create_and_open_knowledge_graph(documents: List[Document], st_progress=None, progress_callback=None) -> int:
     """
     Creates a knowledge graph from the provided documents and opens it in the default web browser.
     
     Args:
         documents: List of Document objects containing the text content for graph generation.
         st_progress: Optional Streamlit object for showing progress (used in Streamlit apps).
+        progress_callback: Optional callable(progress, message) for extraction progress.
         
     Returns:
-        bool: True if the graph was successfully generated and opened, False otherwise.
+        int: Number of triples in the opened graph, 0 if no graph could be generated.
     """
     if st_progress:
         status = st_progress.status("🔄 Extracting knowledge triples from documents...")
@@ -524,34 +671,18 @@ def create_and_open_knowledge_graph(documents: List[Document], st_progress=None)
         with tempfile.NamedTemporaryFile(delete=False, suffix='.html') as tmp_file:
             html_path = tmp_file.name
         
-        # Generate the knowledge graph
-        if st_progress:
-            status.update(label="🔄 Extracting knowledge triples from documents...")
-        
-        # Call the generate_knowledge_graph function and capture the number of triples
-        generate_knowledge_graph(docs=documents, html_filepath=html_path)
-        
-        # Get the number of triples from the generated graph
-        try:
-            with open(html_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                # Extract the number of triples from the generated HTML
-                # This assumes the generate_knowledge_graph function adds a comment with the count
-                import re
-                match = re.search(r'<!-- Triples extracted: (\d+) -->', content)
-                num_triples = int(match.group(1)) if match else 0
-        except Exception as e:
-            num_triples = 0
+        # The triple count comes straight from the generator (partial graphs included)
+        num_triples = generate_knowledge_graph(docs=documents, html_filepath=html_path,
+                                               progress_callback=progress_callback)
+        if num_triples == 0:
+            raise ValueError("no knowledge triples could be extracted")
         
         if st_progress:
-            if num_triples > 0:
-                status.update(label=f"✅ Successfully extracted {num_triples} knowledge triples! Opening graph...", state="complete")
-            else:
-                status.update(label="⚠️ Generated knowledge graph (could not determine number of triples)", state="complete")
+            status.update(label=f"✅ Successfully extracted {num_triples} knowledge triples! Opening graph...", state="complete")
         
         # Open in default browser
         webbrowser.open(f'file://{os.path.abspath(html_path)}')
-        return True
+        return num_triples
         
     except Exception as e:
         error_msg = f"Error creating/opening knowledge graph: {e}"
@@ -562,5 +693,4 @@ def create_and_open_knowledge_graph(documents: List[Document], st_progress=None)
         # Clean up the temporary file if it was created
         if 'html_path' in locals() and os.path.exists(html_path):
             os.unlink(html_path)
-        return False
- 
\ No newline at end of file
+        return 0
@@ -0,0 +1,141 @@
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+
+# Finished jobs nobody collected (e.g. the browser tab was closed or refreshed) are dropped after this
+FINISHED_JOB_TTL_SECONDS = 3600
+
+
+class Job:
+    """State of one background operation, shared between the worker thread and the UI."""
+
+    def __init__(self, client_id, name):
+        self.id = uuid.uuid4().hex
+        self.client_id = client_id
+        self.name = name
+        self.status = "pending"  # pending -> running -> done | failed
+        self.progress = 0.0
+        self.message = "Waiting to start..."
+        self.partial_results = []
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self._lock = threading.Lock()
+
+    def update(self, progress=None, message=None, partial_result=None):
+        """Progress callback handed to the backend functions.
+
+        Args:
+            progress (float): Fraction between 0 and 1
+            message (str): Short status text shown in the UI
+            partial_result: Intermediate output (e.g. one chunk summary) shown while running
+        """
+        with self._lock:
+            if progress is not None:
+                self.progress = max(0.0, min(1.0, progress))
+            if message is not None:
+                self.message = message
+            if partial_result is not None:
+                self.partial_results.append(partial_result)
+
+    @property
+    def is_active(self):
+        return self.status in ("pending", "running")
+
+    def snapshot(self):
+        """Consistent copy of the fields the UI reads."""
+        with self._lock:
+            return {
+                'id': self.id,
+                'name': self.name,
+                'status': self.status,
+                'progress': self.progress,
+                'message': self.message,
+                'partial_results': list(self.partial_results),
+            }
+
+
+class JobRunner:
+    """Thread pool plus a registry of jobs keyed by client.
+
+    A thread pool (not a process pool) is used because results such as the Chroma
+    vector store are in-memory objects that cannot be pickled across processes.
+    Worker functions must not call Streamlit APIs; they report through `job.update`.
+    """
+
+    def __init__(self, max_workers=4):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="app-job")
+        self.jobs = {}
+        self.lock = threading.Lock()
+
+    def submit(self, client_id, name, fn, *args, **kwargs):
+        """Runs `fn(*args, job=job, **kwargs)` in the background and returns the job."""
+        job = Job(client_id, name)
+        with self.lock:
+            self._evict_stale()
+            self.jobs[job.id] = job
+        self.executor.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def _run(self, job, fn, args, kwargs):
+        job.status = "running"
+        job.update(message="Running...")
+        try:
+            job.result = fn(*args, job=job, **kwargs)
+            job.update(progress=1.0, message="Completed")
+            job.status = "done"
+        except Exception as e:
+            print(f"Background job '{job.name}' failed:\n{traceback.format_exc()}")
+            job.error = str(e)
+            job.status = "failed"
+        finally:
+            job.finished_at = time.time()
+
+    def _evict_stale(self):
+        now = time.time()
+        stale = [
+            job_id for job_id, job in self.jobs.items()
+            if job.finished_at and now - job.finished_at > FINISHED_JOB_TTL_SECONDS
+        ]
+        for job_id in stale:
+            del self.jobs[job_id]
+
+    def jobs_for(self, client_id):
+        with self.lock:
+            return [job for job in self.jobs.values() if job.client_id == client_id]
+
+    def active_jobs(self, client_id):
+        return [job for job in self.jobs_for(client_id) if job.is_active]
+
+    def pop_finished(self, client_id):
+        """Removes and returns the client's finished jobs, so each result is applied once."""
+        with self.lock:
+            finished = [
+                job for job in self.jobs.values()
+                if job.client_id == client_id and not job.is_active
+            ]
+            for job in finished:
+                del self.jobs[job.id]
+        return sorted(finished, key=lambda job: job.created_at)
+
+
+@st.cache_resource
+def get_job_runner():
+    """One runner per server process, so jobs survive reruns."""
+    return JobRunner()
+
+
+def get_client_id():
+    """Stable id for this browser session.
+
+    Kept in st.session_state only, never in the URL: anyone given the link could
+    otherwise read this session's jobs and their results. A page refresh starts a
+    new session, so jobs it left running are dropped once their TTL runs out."""
+    if "client_id" not in st.session_state:
+        st.session_state.client_id = uuid.uuid4().hex
+    return st.session_state.client_id
@@ -0,0 +1,212 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import streamlit as st
+
+# Indexes are evicted (least recently used first) once their estimated size exceeds this
+MAX_INDEX_BYTES = int(os.getenv("SHARED_INDEX_MAX_BYTES", 1024 * 1024 * 1024))
+# A session that has not been seen for this long stops holding its index
+HOLDER_TTL_SECONDS = 2 * 3600
+# text-embedding-004 vectors, stored as float32
+EMBEDDING_DIMENSION = 768
+
+
+def sources_content_hash(uploaded_files, website_urls=None, model_name=""):
+    """
+    Hash of everything that determines an index: file bytes, URLs and embedding model.
+    Upload order and file names do not matter, so identical uploads share one index.
+    """
+    file_digests = sorted(hashlib.sha256(file.getvalue()).hexdigest() for file in uploaded_files or [])
+    digest = hashlib.sha256(model_name.encode("utf-8"))
+    for file_digest in file_digests:
+        digest.update(b"file:" + file_digest.encode("ascii"))
+    for url in sorted(website_urls or []):
+        digest.update(b"url:" + url.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def estimate_index_bytes(vector_db):
+    """Rough in-memory size of a Chroma index: float32 vectors plus chunk text."""
+    results = vector_db._collection.get(include=['documents'])
+    documents = results.get('documents') or []
+    return len(documents) * EMBEDDING_DIMENSION * 4 + sum(len(doc.encode("utf-8")) for doc in documents)
+
+
+def process_memory_bytes():
+    """Resident set size of this process (0 if it cannot be determined)."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        pass
+    try:
+        import resource
+        # Peak rather than current RSS; ru_maxrss is in KiB on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    except ImportError:
+        return 0
+
+
+class _IndexEntry:
+    def __init__(self, vector_db, size_bytes):
+        self.vector_db = vector_db
+        self.size_bytes = size_bytes
+        self.holders = set()
+        self.last_used = time.time()
+
+
+class SharedIndexCache:
+    """
+    Process-wide cache of immutable vector indexes keyed by content hash.
+
+    Every session (holder) references at most one index; the holder count is the
+    reference count. Unreferenced indexes stay cached for reuse until the total
+    estimated size exceeds `max_bytes`, then they are dropped oldest first.
+    Referenced indexes are never evicted, so the limit is soft.
+    """
+
+    def __init__(self, max_bytes=MAX_INDEX_BYTES, holder_ttl=HOLDER_TTL_SECONDS):
+        self.max_bytes = max_bytes
+        self.holder_ttl = holder_ttl
+        self.entries = OrderedDict()  # content hash -> _IndexEntry, least recently used first
+        self.holder_keys = {}  # holder id -> content hash
+        self.holder_seen = {}  # holder id -> last time the session was active
+        self.building = {}  # content hash -> Event, so concurrent identical uploads build once
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    # --- 1. Acquire / Release ---
+
+    def acquire(self, holder, content_hash, build):
+        """
+        Returns (vector_db, reused). `build()` creates the index on a miss; a second
+        session asking for the same hash while it builds waits for that build instead.
+        The holder's previous index (if any) is released.
+        """
+        while True:
+            with self.lock:
+                entry = self.entries.get(content_hash)
+                if entry is not None:
+                    self.hits += 1
+                    self._hold(holder, content_hash, entry)
+                    return entry.vector_db, True
+                in_flight = self.building.get(content_hash)
+                if in_flight is None:
+                    self.misses += 1
+                    self.building[content_hash] = threading.Event()
+                    break
+            # Another session is building the same index; retry once it is done
+            in_flight.wait()
+
+        try:
+            vector_db = build()
+            size_bytes = estimate_index_bytes(vector_db)
+            with self.lock:
+                entry = _IndexEntry(vector_db, size_bytes)
+                self.entries[content_hash] = entry
+                self._hold(holder, content_hash, entry)
+                self._evict()
+            return vector_db, False
+        finally:
+            with self.lock:
+                self.building.pop(content_hash).set()
+
+    def _hold(self, holder, content_hash, entry):
+        previous = self.holder_keys.get(holder)
+        if previous is not None and previous != content_hash and previous in self.entries:
+            self.entries[previous].holders.discard(holder)
+        entry.holders.add(holder)
+        entry.last_used = time.time()
+        self.entries.move_to_end(content_hash)
+        self.holder_keys[holder] = content_hash
+        self.holder_seen[holder] = time.time()
+
+    def release(self, holder):
+        """Drops the holder's reference; the index stays cached until evicted."""
+        with self.lock:
+            self._release(holder)
+            self._evict()
+
+    def _release(self, holder):
+        content_hash = self.holder_keys.pop(holder, None)
+        self.holder_seen.pop(holder, None)
+        if content_hash in self.entries:
+            self.entries[content_hash].holders.discard(holder)
+
+    def touch(self, holder):
+        """
+        Marks the holder's session as active. Returns False if its index was evicted
+        (the session must process its documents again).
+        """
+        with self.lock:
+            content_hash = self.holder_keys.get(holder)
+            if content_hash not in self.entries:
+                return False
+            self.holder_seen[holder] = time.time()
+            self.entries[content_hash].last_used = time.time()
+            return True
+
+    # --- 2. Eviction ---
+
+    def _evict(self):
+        now = time.time()
+        for holder, seen in list(self.holder_seen.items()):
+            if now - seen > self.holder_ttl:
+                self._release(holder)
+
+        total = sum(entry.size_bytes for entry in self.entries.values())
+        for content_hash in list(self.entries):
+            if total <= self.max_bytes:
+                break
+            entry = self.entries[content_hash]
+            if entry.holders:
+                continue
+            del self.entries[content_hash]
+            total -= entry.size_bytes
+            try:
+                # Frees the in-memory Chroma collection
+                entry.vector_db.delete_collection()
+            except Exception as e:
+                print(f"Error deleting evicted index {content_hash[:12]}: {e}")
+            print(f"Evicted shared index {content_hash[:12]} ({entry.size_bytes / 1e6:.1f} MB)")
+
+    # --- 3. Reporting ---
+
+    def memory_report(self):
+        """Per-process memory and cache statistics (estimated index sizes)."""
+        with self.lock:
+            indexes = [
+                {
+                    'content_hash': content_hash[:12],
+                    'size_mb': round(entry.size_bytes / 1e6, 2),
+                    'refcount': len(entry.holders),
+                    'idle_seconds': round(time.time() - entry.last_used),
+                }
+                for content_hash, entry in self.entries.items()
+            ]
+            return {
+                'pid': os.getpid(),
+                'process_rss_mb': round(process_memory_bytes() / 1e6, 1),
+                'index_count': len(indexes),
+                'index_mb': round(sum(index['size_mb'] for index in indexes), 2),
+                'max_index_mb': round(self.max_bytes / 1e6, 1),
+                'sessions': len(self.holder_keys),
+                'hits': self.hits,
+                'misses': self.misses,
+                'indexes': indexes,
+            }
+
+
+@st.cache_resource
+def get_shared_index_cache():
+    """One index cache per server process, shared by all sessions."""
+    return SharedIndexCache()
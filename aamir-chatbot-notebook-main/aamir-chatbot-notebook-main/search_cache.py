@@ -0,0 +1,164 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+
+# Seconds a cached search stays fresh, per use case
+SEARCH_TTLS = {
+    "chat": 15 * 60,
+    "news_daily": 3 * 3600,
+    "news_weekly": 12 * 3600,
+    "news_monthly": 24 * 3600,
+    "news_year": 3 * 24 * 3600,
+}
+DEFAULT_TTL = SEARCH_TTLS["chat"]
+MAX_ENTRIES = 512
+
+
+class TavilyBackend:
+    """Real Tavily search (TavilyClient.search) with one API key."""
+
+    def __init__(self, api_key):
+        from tavily import TavilyClient
+        self.client = TavilyClient(api_key=api_key)
+
+    def search(self, query, **params):
+        return self.client.search(query=query, **params)
+
+
+class StubSearchBackend:
+    """
+    Offline backend returning deterministic fake results in Tavily's response format.
+    Selected with SEARCH_BACKEND=stub; `calls` counts real (uncached) searches.
+    """
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def search(self, query, max_results=5, **params):
+        with self.lock:
+            self.calls += 1
+        time.sleep(self.latency)
+        return {
+            "query": query,
+            "answer": f"Stub answer for: {query}",
+            "results": [
+                {
+                    "title": f"Result {i + 1} for {query}",
+                    "url": f"https://example.com/{hashlib.sha1(query.encode('utf-8')).hexdigest()[:8]}/{i + 1}",
+                    "content": f"Stub content {i + 1} about {query}.",
+                    "published_date": time.strftime("%Y-%m-%d"),
+                    "score": round(1.0 - i / max(max_results, 1), 3),
+                }
+                for i in range(max_results)
+            ],
+        }
+
+
+def normalize_query(query):
+    """Case and whitespace do not change the results, so they do not change the key."""
+    return re.sub(r"\s+", " ", query).strip().lower()
+
+
+class SearchCache:
+    """
+    Process-wide TTL cache in front of a search backend.
+
+    Entries are keyed by the normalized query plus all search parameters. Identical
+    searches running at the same time are coalesced: the first caller queries the
+    backend, the others wait for its result. Errors are not cached.
+    """
+
+    def __init__(self, backend=None, max_entries=MAX_ENTRIES):
+        self._backend = backend
+        self._tavily_backends = {}  # Tavily key fingerprint -> TavilyBackend
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # key -> (expires_at, response), least recently used first
+        self.in_flight = {}  # key -> Event set when the search finishes
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def backend_for(self, api_key=None):
+        """
+        The backend for one search, with one client per Tavily key passed by the caller
+        (this module never reads TAVILY_API_KEY itself). Created lazily: importing this
+        module never needs a key.
+        """
+        with self.lock:
+            if self._backend is None and os.getenv("SEARCH_BACKEND") == "stub":
+                self._backend = StubSearchBackend()
+            if self._backend is not None:
+                return self._backend
+            if not api_key:
+                raise ValueError("A Tavily API key is required for web search.")
+            fingerprint = hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:12]
+            backend = self._tavily_backends.get(fingerprint)
+            if backend is None:
+                backend = self._tavily_backends[fingerprint] = TavilyBackend(api_key)
+            return backend
+
+    @staticmethod
+    def make_key(query, params):
+        payload = json.dumps([normalize_query(query), params], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def search(self, query, use_case="chat", ttl=None, api_key=None, **params):
+        """
+        Cached equivalent of TavilyClient.search(query, **params).
+
+        Args:
+            use_case: Key of SEARCH_TTLS deciding how long the result stays fresh.
+            ttl: Explicit TTL in seconds, overrides the use case.
+            api_key: Tavily API key of the caller (not part of the cache key).
+        """
+        ttl = ttl if ttl is not None else SEARCH_TTLS.get(use_case, DEFAULT_TTL)
+        key = self.make_key(query, params)
+
+        while True:
+            with self.lock:
+                entry = self.entries.get(key)
+                if entry is not None and entry[0] > time.time():
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                waiting_on = self.in_flight.get(key)
+                if waiting_on is None:
+                    self.in_flight[key] = threading.Event()
+                    self.misses += 1
+                    break
+            # Same search already running in another thread: reuse its result
+            # (if that search failed, the next loop makes this thread search itself)
+            waiting_on.wait()
+
+        try:
+            started = time.perf_counter()
+            response = self.backend_for(api_key).search(query, **params)
+            print(f"Search '{query}' ({use_case}) took {time.perf_counter() - started:.2f}s")
+            with self.lock:
+                self.entries[key] = (time.time() + ttl, response)
+                self.entries.move_to_end(key)
+                while len(self.entries) > self.max_entries:
+                    self.entries.popitem(last=False)
+            return response
+        finally:
+            with self.lock:
+                self.in_flight.pop(key).set()
+
+    def stats(self):
+        with self.lock:
+            return {"entries": len(self.entries), "hits": self.hits, "misses": self.misses}
+
+
+_search_cache = SearchCache()
+
+
+def get_search_cache():
+    """The cache shared by every graph and session in this process."""
+    return _search_cache
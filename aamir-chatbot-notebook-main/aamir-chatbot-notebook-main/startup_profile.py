@@ -0,0 +1,127 @@
+"""
+Import-time profile and cold-start benchmark for the Streamlit app.
+
+Usage:
+    python startup_profile.py                  # -X importtime report for the app's imports
+    python startup_profile.py --runs 5         # + cold import timings (fresh interpreter per run)
+    python startup_profile.py --runs 3 --render  # + time to run app.py once (first page render)
+
+Every measurement runs in a new interpreter, so nothing is cached between runs
+except what the OS caches on disk (as after a pod restart with a warm image).
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_MODULES = ["streamlit", "backend_services", "job_runner", "resource_cache"]
+
+# "import time:       412 |       1893 |   langchain_core.documents"
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+RENDER_SNIPPET = """
+import time
+started = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file("app.py", default_timeout=120)
+app.run()
+print(time.perf_counter() - started)
+"""
+
+
+def _run_python(args):
+    return subprocess.run(
+        [sys.executable] + args,
+        cwd=APP_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+# --- 1. Import-Time Profile ---
+
+def profile_imports(modules=APP_MODULES):
+    """
+    Runs `python -X importtime -c "import ..."` and parses its stderr.
+
+    Returns:
+        list of dict: {'module', 'self_ms', 'cumulative_ms', 'depth'} in import order
+    """
+    result = _run_python(["-X", "importtime", "-c", "import " + ", ".join(modules)])
+    rows = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append({
+                'module': module,
+                'self_ms': int(self_us) / 1000,
+                'cumulative_ms': int(cumulative_us) / 1000,
+                'depth': (len(indent) - 1) // 2,
+            })
+    return rows
+
+
+def print_import_report(rows, top=20):
+    """Prints the heaviest top-level imports and the modules with the most own time."""
+    total_ms = sum(row['self_ms'] for row in rows)
+    print(f"Imported {len(rows)} modules in {total_ms:.0f} ms\n")
+
+    print(f"Top {top} top-level imports by cumulative time:")
+    top_level = sorted((row for row in rows if row['depth'] == 0), key=lambda row: -row['cumulative_ms'])
+    for row in top_level[:top]:
+        print(f"  {row['cumulative_ms']:9.1f} ms  {row['module']}")
+
+    print(f"\nTop {top} modules by self time:")
+    for row in sorted(rows, key=lambda row: -row['self_ms'])[:top]:
+        print(f"  {row['self_ms']:9.1f} ms  {row['module']}")
+
+
+# --- 2. Cold-Start Benchmarks ---
+
+def _summarize(label, timings):
+    print(f"{label}: min {min(timings):.2f}s, median {statistics.median(timings):.2f}s "
+          f"over {len(timings)} runs")
+
+
+def benchmark_cold_import(modules=APP_MODULES, runs=5):
+    """Wall time of a fresh interpreter importing the app modules."""
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        _run_python(["-c", "import " + ", ".join(modules)])
+        timings.append(time.perf_counter() - started)
+    _summarize("Cold import", timings)
+    return timings
+
+
+def benchmark_first_render(runs=3):
+    """Time for a fresh interpreter to run app.py once through Streamlit's AppTest."""
+    timings = [float(_run_python(["-c", RENDER_SNIPPET]).stdout.strip().splitlines()[-1]) for _ in range(runs)]
+    _summarize("First page render", timings)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top", type=int, default=20, help="Rows per report section")
+    parser.add_argument("--runs", type=int, default=0, help="Cold-start benchmark runs (0 = skip)")
+    parser.add_argument("--render", action="store_true", help="Also benchmark a full run of app.py")
+    args = parser.parse_args()
+
+    print_import_report(profile_imports(), top=args.top)
+
+    if args.runs:
+        print()
+        benchmark_cold_import(runs=args.runs)
+        if args.render:
+            benchmark_first_render(runs=args.runs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+# Generated from shared/llm_cache.py by shared/sync_shared.py - edit the source, not this copy.
+import hashlib
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+from langchain_core.caches import BaseCache
+from langchain_core.load import dumps, loads
+
+# Opt-in cache of LLM responses for calls that are effectively deterministic (query
+# rewrites, relevance grades, map summaries of unchanged chunks, ...).
+#
+# It plugs into LangChain's own cache hook: pass `cache=get_llm_cache("namespace", ttl)`
+# when constructing the chat model of a call site. Entries are keyed by the model
+# configuration (model name + parameters, LangChain's llm_string) and a hash of the
+# exact prompt, live for the call site's TTL, and can be dropped per namespace:
+#   python llm_cache.py stats
+#   python llm_cache.py invalidate rewrite
+#
+# Disabled unless LLM_CACHE=1; then get_llm_cache() returns None and models behave
+# exactly as before.
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE", "") not in ("", "0", "false")
+LLM_CACHE_DB = os.getenv("LLM_CACHE_DB", "llm_cache.sqlite3")
+
+_connection = None
+_lock = threading.Lock()
+_caches = {}
+_stats = {}  # namespace -> {"hits": int, "misses": int}
+
+
+def _db():
+    """One connection per process (guarded by _lock), created on first use."""
+    global _connection
+    if _connection is None:
+        _connection = sqlite3.connect(LLM_CACHE_DB, check_same_thread=False)
+        _connection.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            " namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL,"
+            " created_at REAL NOT NULL, expires_at REAL,"
+            " PRIMARY KEY (namespace, key))"
+        )
+        _connection.commit()
+    return _connection
+
+
+class NamespacedSQLiteCache(BaseCache):
+    """LangChain cache storing one call site's responses under its namespace and TTL."""
+
+    def __init__(self, namespace, ttl=None):
+        self.namespace = namespace
+        self.ttl = ttl  # seconds, None = until invalidated
+
+    @staticmethod
+    def make_key(prompt, llm_string):
+        # (model + params, prompt hash): the prompt itself is never stored
+        return hashlib.sha256(f"{llm_string}\x1f{prompt}".encode("utf-8")).hexdigest()
+
+    def _count(self, outcome):
+        counts = _stats.setdefault(self.namespace, {"hits": 0, "misses": 0})
+        counts[outcome] += 1
+
+    def lookup(self, prompt, llm_string):
+        key = self.make_key(prompt, llm_string)
+        with _lock:
+            row = _db().execute(
+                "SELECT value, expires_at FROM llm_cache WHERE namespace = ? AND key = ?",
+                (self.namespace, key),
+            ).fetchone()
+            if row is not None and row[1] is not None and row[1] < time.time():
+                _db().execute("DELETE FROM llm_cache WHERE namespace = ? AND key = ?", (self.namespace, key))
+                _db().commit()
+                row = None
+            self._count("hits" if row is not None else "misses")
+        return loads(row[0]) if row is not None else None
+
+    def update(self, prompt, llm_string, return_val):
+        now = time.time()
+        expires_at = now + self.ttl if self.ttl is not None else None
+        with _lock:
+            _db().execute(
+                "INSERT OR REPLACE INTO llm_cache (namespace, key, value, created_at, expires_at) VALUES (?, ?, ?, ?, ?)",
+                (self.namespace, self.make_key(prompt, llm_string), dumps(return_val), now, expires_at),
+            )
+            _db().commit()
+
+    def clear(self, **kwargs):
+        invalidate(self.namespace)
+
+
+def get_llm_cache(namespace, ttl=None):
+    """The cache for one call site, or None when LLM_CACHE is not enabled."""
+    if not LLM_CACHE_ENABLED:
+        return None
+    with _lock:
+        if namespace not in _caches:
+            _caches[namespace] = NamespacedSQLiteCache(namespace, ttl)
+        return _caches[namespace]
+
+
+def invalidate(namespace=None):
+    """Drops every entry of `namespace` (all namespaces when None); returns the count."""
+    with _lock:
+        if namespace is None:
+            deleted = _db().execute("DELETE FROM llm_cache").rowcount
+        else:
+            deleted = _db().execute("DELETE FROM llm_cache WHERE namespace = ?", (namespace,)).rowcount
+        _db().commit()
+    return deleted
+
+
+def llm_cache_stats():
+    """Hits, misses and hit rate per namespace in this process."""
+    with _lock:
+        return {
+            namespace: {**counts, "hit_rate": round(counts["hits"] / max(counts["hits"] + counts["misses"], 1), 3)}
+            for namespace, counts in _stats.items()
+        }
+
+
+def stored_entries():
+    """Stored entries per namespace (including expired ones not yet looked up)."""
+    with _lock:
+        return dict(_db().execute("SELECT namespace, COUNT(*) FROM llm_cache GROUP BY namespace").fetchall())
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "stats"
+    if command == "invalidate":
+        namespace = sys.argv[2] if len(sys.argv) > 2 else None
+        print(f"Removed {invalidate(namespace)} entries from {namespace or 'all namespaces'}")
+    else:
+        for namespace, count in sorted(stored_entries().items()):
+            print(f"{namespace}: {count} entries")
@@ -9,6 +9,7 @@ from langchain_community.document_loaders import WebBaseLoader
 from langchain_community.vectorstores import FAISS
 from langchain_google_genai import ChatGoogleGenerativeAI , GoogleGenerativeAIEmbeddings
 from langchain_text_splitters import RecursiveCharacterTextSplitter
+from llm_cache import get_llm_cache, llm_cache_stats  # opt-in: LLM_CACHE=1
 
 embeddings = GoogleGenerativeAIEmbeddings(model="models/text-embedding-004")
 llm = ChatGoogleGenerativeAI(model="models/gemini-2.5-flash")
@@ -99,6 +100,7 @@ from typing_extensions import TypedDict
 from langchain_core.messages import BaseMessage
 
 from langgraph.graph.message import add_messages
+from context_window import prepare_model_input
 
 
 class AgentState(TypedDict):
@@ -122,9 +124,10 @@ def agent(state):
     """
     print("---CALL AGENT---")
     messages = state["messages"]
-    model = ChatGoogleGenerativeAI(model="models/gemini-2.5-flash")
-    model = model.bind_tools(tools)
-    response = model.invoke(messages)
+    summarizer = ChatGoogleGenerativeAI(model="models/gemini-2.5-flash")
+    model = summarizer.bind_tools(tools)
+    # Earlier retrieved documents are shortened and old turns summarized (see context_window.py)
+    response = model.invoke(prepare_model_input(messages, llm=summarizer))
     # We return a list, because this will get added to the existing list
     return {"messages": [response]}
 
@@ -140,6 +143,11 @@ from langchain_core.prompts import PromptTemplate
 
 from pydantic import BaseModel, Field
 
+# Grades and rewrites depend only on their prompt, so repeated questions are served
+# from the LLM cache (when enabled) instead of calling the model again
+GRADE_CACHE_TTL = 24 * 3600
+REWRITE_CACHE_TTL = 7 * 24 * 3600
+
 ### Edges
 def grade_documents(state) -> Literal["generate", "rewrite"]:
     """
@@ -161,7 +169,7 @@ def grade_documents(state) -> Literal["generate", "rewrite"]:
         binary_score: str = Field(description="Relevance score 'yes' or 'no'")
 
     # LLM
-    model = ChatGoogleGenerativeAI(model="models/gemini-2.5-flash")
+    model = ChatGoogleGenerativeAI(model="models/gemini-2.5-flash", cache=get_llm_cache("grade_documents", ttl=GRADE_CACHE_TTL))
 
     # LLM with tool and validation
     llm_with_tool = model.with_structured_output(grade)
@@ -291,7 +299,7 @@ def rewrite(state):
     ]
 
     # Grader
-    model = ChatGoogleGenerativeAI(model="models/gemini-2.5-flash")
+    model = ChatGoogleGenerativeAI(model="models/gemini-2.5-flash", cache=get_llm_cache("rewrite", ttl=REWRITE_CACHE_TTL))
     response = model.invoke(msg)
     return {"messages": [HumanMessage(content=response.content)]}
 
@@ -348,4 +356,6 @@ graph.invoke({"messages":"What is Machine learning?"})
 
 graph.invoke({"messages":"Tell me about Langgraph ecosystem"})
 
+print(f"LLM cache: {llm_cache_stats()}")
+
  
\ No newline at end of file
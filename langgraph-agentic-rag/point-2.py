@@ -9,6 +9,8 @@ from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, System
 from langgraph.graph.message import add_messages
 from langgraph.graph import END, StateGraph, START
 from langgraph.prebuilt import ToolNode, tools_condition
+from context_window import prepare_model_input
+from llm_cache import get_llm_cache, llm_cache_stats  # opt-in: LLM_CACHE=1
 
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.output_parsers import StrOutputParser
@@ -117,13 +119,20 @@ def agent(state: AgentState):
 
     # Bind tools as before
     # Assumes `tools` variable exists: [retriever_tool, retriever_tool_langchain]
-    model = ChatGoogleGenerativeAI(model="models/gemini-2.5-flash")
-    model = model.bind_tools(tools)
+    summarizer = ChatGoogleGenerativeAI(model="models/gemini-2.5-flash")
+    model = summarizer.bind_tools(tools)
 
-    response = model.invoke(messages)
+    # Earlier retrieved documents are shortened and old turns summarized (see context_window.py)
+    response = model.invoke(prepare_model_input(messages, llm=summarizer))
     return {"messages": [response]}
 
 
+# Grades and rewrites depend only on their prompt, so repeated questions are served
+# from the LLM cache (when enabled) instead of calling the model again
+GRADE_CACHE_TTL = 24 * 3600
+REWRITE_CACHE_TTL = 7 * 24 * 3600
+
+
 def grade_documents(state: AgentState) -> Literal["generate", "rewrite"]:
     """Determine whether retrieved documents are relevant."""
     print("---CHECK RELEVANCE---")
@@ -134,7 +143,7 @@ def grade_documents(state: AgentState) -> Literal["generate", "rewrite"]:
         binary_score: str = Field(description="Relevance score 'yes' or 'no'")
 
     # LLM with structured output
-    model = ChatGoogleGenerativeAI(model="models/gemini-2.5-flash")
+    model = ChatGoogleGenerativeAI(model="models/gemini-2.5-flash", cache=get_llm_cache("grade_documents", ttl=GRADE_CACHE_TTL))
     llm_with_tool = model.with_structured_output(Grade)
 
     messages = state["messages"]
@@ -216,7 +225,7 @@ def rewrite(state: AgentState):
         template=REWRITE_PROMPT_TEMPLATE, input_variables=["question"]
     )
 
-    model = ChatGoogleGenerativeAI(model="models/gemini-2.5-flash")
+    model = ChatGoogleGenerativeAI(model="models/gemini-2.5-flash", cache=get_llm_cache("rewrite", ttl=REWRITE_CACHE_TTL))
     chain = rewrite_prompt | model | StrOutputParser()
     improved_query = chain.invoke({"question": question})
 
@@ -284,6 +293,7 @@ graph.invoke({"messages": "What is Langgraph?", "attempts": 0})
 graph.invoke({"messages": "What is Langchain?", "attempts": 0})
 graph.invoke({"messages": "What is Machine learning?", "attempts": 0})
 graph.invoke({"messages": "Tell me about Langgraph ecosystem", "attempts": 0})
+print(f"LLM cache: {llm_cache_stats()}")
 
 
 #https://github.com/Alex2Yang97/yahoo-finance-mcp/tree/main
@@ -0,0 +1,251 @@
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from langchain_core.documents import Document
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from tenant_router import TenantRouter
+
+# --- Bulk Ingestion (Batched Embedding + Batched Writes) ---
+#
+# `add_documents_to_chroma` embeds and writes one user document at a time, which
+# turns tenant onboarding into thousands of small round-trips. `bulk_ingest`
+# streams (user_id, doc_name, content) records through the splitter, embeds chunks
+# from many users in one call, and writes each tenant collection with large
+# upserts (one SQLite transaction per upsert). A checkpoint file makes it resumable.
+#
+# Batching: records are buffered until `write_batch_size` chunks are pending; the
+# buffer is then embedded in `embed_batch_size` sub-batches and written with one
+# upsert per tenant collection (capped by Chroma's max batch size).
+#
+# Checkpoint: each completed document is stored with a hash of its content. A later
+# run skips a document only if its content is unchanged; changed documents are
+# ingested again. Use `reset_checkpoint=True` (or IngestCheckpoint.reset) to force a
+# full re-ingest. Re-ingesting upserts by chunk id, so chunks a shorter new version no
+# longer has stay behind - use tenant_lifecycle.replace_document to remove them.
+
+EMBED_BATCH_SIZE = 256
+WRITE_BATCH_SIZE = 5000
+
+
+@dataclass
+class IngestProgress:
+    """Running totals reported to the progress callback."""
+    documents_done: int = 0
+    documents_skipped: int = 0
+    chunks_written: int = 0
+    elapsed_seconds: float = 0.0
+
+
+def print_progress(progress: IngestProgress):
+    """Default progress callback."""
+    print(
+        f"Ingested {progress.documents_done} docs "
+        f"({progress.documents_skipped} skipped), "
+        f"{progress.chunks_written} chunks in {progress.elapsed_seconds:.1f}s"
+    )
+
+
+def content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def make_chunk_id(user_id: str, doc_name: str, chunk_index: int) -> str:
+    """Deterministic chunk id, so re-running an ingest upserts instead of duplicating."""
+    key = f"{user_id}\x1f{doc_name}\x1f{chunk_index}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+class IngestCheckpoint:
+    """
+    Append-only JSON-lines file of documents that were fully written, with the hash
+    of the content that was written. A document is skipped when an ingest is
+    restarted only if its content has not changed since.
+    """
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self.completed: Dict[Tuple[str, str], Optional[str]] = {}
+
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        # Later lines win: a document re-ingested with new content
+                        self.completed[(entry["user_id"], entry["doc_name"])] = entry.get("content_hash")
+
+    def is_done(self, user_id: str, doc_name: str, content_digest: Optional[str] = None) -> bool:
+        if (user_id, doc_name) not in self.completed:
+            return False
+        stored = self.completed[(user_id, doc_name)]
+        # Entries written before hashes were recorded only know the document name
+        return stored is None or content_digest is None or stored == content_digest
+
+    def mark_done(self, entries: List[Tuple[str, str, str]]):
+        """Records (user_id, doc_name, content hash) entries as fully written."""
+        for user_id, doc_name, digest in entries:
+            self.completed[(user_id, doc_name)] = digest
+        if not self.path:
+            return
+        with open(self.path, "a", encoding="utf-8") as f:
+            for user_id, doc_name, digest in entries:
+                f.write(json.dumps({"user_id": user_id, "doc_name": doc_name, "content_hash": digest}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def reset(self):
+        """Forgets every completed document (the next ingest writes everything again)."""
+        self.completed.clear()
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def split_record(
+    text_splitter: RecursiveCharacterTextSplitter, user_id: str, doc_name: str, content: str
+) -> List[Document]:
+    """Splits one record into chunks with the same metadata as `load_and_split_document`."""
+    return [
+        Document(
+            page_content=chunk,
+            metadata={"user_id": user_id, "source": doc_name, "chunk_index": i},
+        )
+        for i, chunk in enumerate(text_splitter.split_text(content))
+    ]
+
+
+def _write_batch(router: TenantRouter, embeddings, chunks: List[Document],
+                 embed_batch_size: int, write_batch_size: int) -> int:
+    """
+    Embeds `chunks` (across users) in sub-batches of `embed_batch_size` and upserts them
+    grouped by tenant collection, in upserts of up to `write_batch_size` records.
+    """
+    texts = [chunk.page_content for chunk in chunks]
+    vectors: List[List[float]] = []
+    for start in range(0, len(texts), embed_batch_size):
+        vectors.extend(embeddings.embed_documents(texts[start:start + embed_batch_size]))
+
+    # Group by destination collection; grouped tenants share one upsert
+    by_collection: Dict[str, Tuple[str, list]] = {}
+    for chunk, vector in zip(chunks, vectors):
+        user_id = chunk.metadata["user_id"]
+        name = router.collection_name_for(user_id)
+        by_collection.setdefault(name, (user_id, []))[1].append((chunk, vector))
+
+    max_batch = min(write_batch_size, router.client.get_max_batch_size())
+    for user_id, items in by_collection.values():
+        collection = router.get_collection(user_id)
+        for start in range(0, len(items), max_batch):
+            batch = items[start:start + max_batch]
+            collection.upsert(
+                ids=[
+                    make_chunk_id(c.metadata["user_id"], c.metadata["source"], c.metadata["chunk_index"])
+                    for c, _ in batch
+                ],
+                embeddings=[v for _, v in batch],
+                documents=[c.page_content for c, _ in batch],
+                metadatas=[c.metadata for c, _ in batch],
+            )
+
+    return len(chunks)
+
+
+def bulk_ingest(
+    records: Iterable[Tuple[str, str, str]],
+    router: TenantRouter,
+    embeddings=None,
+    embed_batch_size: int = EMBED_BATCH_SIZE,
+    write_batch_size: int = WRITE_BATCH_SIZE,
+    checkpoint_path: Optional[str] = None,
+    progress: Optional[Callable[[IngestProgress], None]] = print_progress,
+    text_splitter: Optional[RecursiveCharacterTextSplitter] = None,
+    registry=None,
+    reset_checkpoint: bool = False,
+) -> IngestProgress:
+    """
+    Ingests many (user_id, doc_name, content) records with batched embedding and writes.
+
+    Args:
+        records: Any iterable (generators are fine - records are streamed).
+        router: TenantRouter deciding which collection each user's chunks go to.
+        embeddings: Embedding model; defaults to the router's.
+        embed_batch_size: Texts per `embed_documents` call.
+        write_batch_size: Chunks buffered before a flush, and the upper bound of records
+            per upsert (capped by Chroma's max batch size).
+        checkpoint_path: Optional JSON-lines file that makes the ingest resumable.
+        progress: Callback receiving an IngestProgress after every flushed batch.
+        text_splitter: Defaults to the notebook's 1000/200 character splitter.
+        registry: Optional DocumentRegistry (tenant_lifecycle) that records the
+            chunk ids of every written document, enabling per-document delete/replace.
+        reset_checkpoint: Clear the checkpoint first, re-ingesting every record.
+
+    Returns:
+        IngestProgress: Final totals.
+    """
+    embeddings = embeddings or router.embeddings
+    text_splitter = text_splitter or RecursiveCharacterTextSplitter(
+        chunk_size=1000,
+        chunk_overlap=200,
+        length_function=len,
+        is_separator_regex=False,
+    )
+    checkpoint = IngestCheckpoint(checkpoint_path)
+    if reset_checkpoint:
+        checkpoint.reset()
+    totals = IngestProgress()
+    started = time.perf_counter()
+
+    pending_chunks: List[Document] = []
+    pending_docs: Dict[Tuple[str, str], str] = {}  # (user_id, doc_name) -> content hash
+
+    def flush():
+        if pending_chunks:
+            totals.chunks_written += _write_batch(
+                router, embeddings, pending_chunks, embed_batch_size, write_batch_size
+            )
+        if registry is not None:
+            doc_chunk_ids = {key: [] for key in pending_docs}
+            for chunk in pending_chunks:
+                meta = chunk.metadata
+                doc_chunk_ids[(meta["user_id"], meta["source"])].append(
+                    make_chunk_id(meta["user_id"], meta["source"], meta["chunk_index"])
+                )
+            registry.register_many(doc_chunk_ids)
+        # Only whole documents are checkpointed, after their chunks are written
+        checkpoint.mark_done([(user_id, doc_name, digest) for (user_id, doc_name), digest in pending_docs.items()])
+        totals.documents_done += len(pending_docs)
+        totals.elapsed_seconds = time.perf_counter() - started
+        pending_chunks.clear()
+        pending_docs.clear()
+        if progress:
+            progress(totals)
+
+    for user_id, doc_name, content in records:
+        digest = content_hash(content)
+        if checkpoint.is_done(user_id, doc_name, digest):
+            totals.documents_skipped += 1
+            continue
+
+        if (user_id, doc_name) in pending_docs:
+            # The same document twice in one batch would put duplicate ids in one
+            # upsert (Chroma rejects that): the later record replaces the earlier one
+            pending_chunks[:] = [
+                c for c in pending_chunks
+                if (c.metadata["user_id"], c.metadata["source"]) != (user_id, doc_name)
+            ]
+            totals.documents_skipped += 1
+        pending_chunks.extend(split_record(text_splitter, user_id, doc_name, content))
+        pending_docs[(user_id, doc_name)] = digest
+
+        if len(pending_chunks) >= write_batch_size:
+            flush()
+
+    if pending_docs:
+        flush()
+
+    totals.elapsed_seconds = time.perf_counter() - started
+    return totals
@@ -0,0 +1,240 @@
+import os
+import sqlite3
+from typing import Dict, List, Optional
+
+from bulk_ingest import bulk_ingest
+from tenant_router import TenantRouter
+
+# --- Tenant Data Lifecycle (Delete / Replace / Re-index / Compact) ---
+#
+# The DocumentRegistry maps (user_id, doc_name) to the chunk ids written for that
+# document, so deleting or replacing a document only touches its own chunks
+# instead of rebuilding the collection or scanning it by metadata.
+
+REGISTRY_FILENAME = "document_registry.sqlite3"
+
+
+class DocumentRegistry:
+    """SQLite table of (user_id, doc_name) -> chunk ids, stored next to the Chroma data."""
+
+    def __init__(self, persist_directory: str = "./chroma_db_multi_user"):
+        os.makedirs(persist_directory, exist_ok=True)
+        self.path = os.path.join(persist_directory, REGISTRY_FILENAME)
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS doc_chunks (
+                user_id TEXT NOT NULL,
+                doc_name TEXT NOT NULL,
+                chunk_id TEXT NOT NULL,
+                PRIMARY KEY (user_id, doc_name, chunk_id)
+            )
+            """
+        )
+        self.conn.commit()
+
+    def register(self, user_id: str, doc_name: str, chunk_ids: List[str]):
+        """Replaces the chunk ids recorded for a document."""
+        self.register_many({(user_id, doc_name): chunk_ids})
+
+    def register_many(self, entries: Dict[tuple, List[str]]):
+        """Registers several documents in one transaction: {(user_id, doc_name): chunk_ids}."""
+        with self.conn:
+            for (user_id, doc_name), chunk_ids in entries.items():
+                self.conn.execute(
+                    "DELETE FROM doc_chunks WHERE user_id = ? AND doc_name = ?", (user_id, doc_name)
+                )
+                self.conn.executemany(
+                    "INSERT INTO doc_chunks (user_id, doc_name, chunk_id) VALUES (?, ?, ?)",
+                    [(user_id, doc_name, chunk_id) for chunk_id in chunk_ids],
+                )
+
+    def chunk_ids(self, user_id: str, doc_name: str) -> List[str]:
+        rows = self.conn.execute(
+            "SELECT chunk_id FROM doc_chunks WHERE user_id = ? AND doc_name = ?", (user_id, doc_name)
+        )
+        return [row[0] for row in rows]
+
+    def documents(self, user_id: str) -> List[str]:
+        rows = self.conn.execute(
+            "SELECT DISTINCT doc_name FROM doc_chunks WHERE user_id = ? ORDER BY doc_name", (user_id,)
+        )
+        return [row[0] for row in rows]
+
+    def forget(self, user_id: str, doc_name: Optional[str] = None):
+        """Removes one document (or every document of the tenant when doc_name is None)."""
+        with self.conn:
+            if doc_name is None:
+                self.conn.execute("DELETE FROM doc_chunks WHERE user_id = ?", (user_id,))
+            else:
+                self.conn.execute(
+                    "DELETE FROM doc_chunks WHERE user_id = ? AND doc_name = ?", (user_id, doc_name)
+                )
+
+    def close(self):
+        self.conn.close()
+
+
+# --- 1. Delete / Replace ---
+
+def delete_document(router: TenantRouter, registry: DocumentRegistry, user_id: str, doc_name: str) -> int:
+    """Deletes one document's chunks by id. Returns the number of chunks removed."""
+    chunk_ids = registry.chunk_ids(user_id, doc_name)
+    if chunk_ids:
+        router.get_collection(user_id).delete(ids=chunk_ids)
+    registry.forget(user_id, doc_name)
+    print(f"Deleted {len(chunk_ids)} chunks of '{doc_name}' for User ID: {user_id}")
+    return len(chunk_ids)
+
+
+def replace_document(router: TenantRouter, registry: DocumentRegistry,
+                     user_id: str, doc_name: str, content: str) -> int:
+    """
+    Re-ingests a document and deletes chunks the new version no longer has.
+    Returns the number of chunks written.
+    """
+    old_ids = set(registry.chunk_ids(user_id, doc_name))
+    totals = bulk_ingest([(user_id, doc_name, content)], router, registry=registry, progress=None)
+
+    stale_ids = list(old_ids - set(registry.chunk_ids(user_id, doc_name)))
+    if stale_ids:
+        router.get_collection(user_id).delete(ids=stale_ids)
+
+    print(f"Replaced '{doc_name}' for User ID: {user_id} "
+          f"({totals.chunks_written} chunks written, {len(stale_ids)} stale chunks removed)")
+    return totals.chunks_written
+
+
+def delete_tenant(router: TenantRouter, registry: DocumentRegistry, user_id: str) -> int:
+    """Removes all of a tenant's data. Dedicated collections are dropped outright."""
+    removed = 0
+    if router.is_grouped:
+        for doc_name in registry.documents(user_id):
+            removed += delete_document(router, registry, user_id, doc_name)
+    else:
+        name = router.collection_name_for(user_id)
+        removed = router.get_collection(user_id).count()
+        router.close(user_id)
+        router.client.delete_collection(name)
+        registry.forget(user_id)
+        print(f"Dropped collection '{name}' ({removed} chunks) for User ID: {user_id}")
+    return removed
+
+
+# --- 2. Re-index ---
+
+def reindex_document(router: TenantRouter, registry: DocumentRegistry,
+                     user_id: str, doc_name: str, embeddings=None) -> int:
+    """
+    Re-embeds a document's stored chunks (e.g. after switching embedding models)
+    without re-reading the source. Touches only that document's chunk ids.
+    """
+    embeddings = embeddings or router.embeddings
+    chunk_ids = registry.chunk_ids(user_id, doc_name)
+    if not chunk_ids:
+        return 0
+
+    collection = router.get_collection(user_id)
+    stored = collection.get(ids=chunk_ids, include=["documents", "metadatas"])
+    vectors = embeddings.embed_documents(stored["documents"])
+    collection.upsert(
+        ids=stored["ids"],
+        embeddings=vectors,
+        documents=stored["documents"],
+        metadatas=stored["metadatas"],
+    )
+    return len(stored["ids"])
+
+
+def reindex_tenant(router: TenantRouter, registry: DocumentRegistry, user_id: str, embeddings=None) -> int:
+    """Re-embeds every registered document of a tenant."""
+    return sum(
+        reindex_document(router, registry, user_id, doc_name, embeddings=embeddings)
+        for doc_name in registry.documents(user_id)
+    )
+
+
+# --- 3. Compaction ---
+
+def _get_existing_collection(router: TenantRouter, name: str):
+    """The collection called `name`, or None if it does not exist."""
+    try:
+        return router.client.get_collection(name=name, embedding_function=None)
+    except Exception:
+        return None
+
+
+def compact_collection(router: TenantRouter, user_id: str, page_size: int = 1000) -> int:
+    """
+    Rebuilds the collection holding `user_id` from its live records.
+
+    Chroma does not shrink an HNSW index after deletes; copying the live records
+    into a fresh collection (with the same metadata, i.e. distance space and HNSW
+    parameters) and swapping names drops the tombstoned entries.
+    Run it in a maintenance window: writes to this collection during the copy are lost.
+
+    A `<name>_compact` collection left by an interrupted run is dropped when the
+    original still exists (the copy was incomplete), or renamed back when the
+    crash happened between deleting the original and renaming the copy.
+    Returns the number of records copied.
+    """
+    name = router.collection_name_for(user_id)
+    temp_name = f"{name[:50]}_compact"
+
+    stale = _get_existing_collection(router, temp_name)
+    if stale is not None:
+        if _get_existing_collection(router, name) is None:
+            # The copy was complete: only the rename is missing
+            stale.modify(name=name)
+            router.close(user_id)
+            recovered = stale.count()
+            print(f"Recovered collection '{name}' from '{temp_name}': {recovered} records")
+            return recovered
+        router.client.delete_collection(temp_name)
+        print(f"Dropped stale collection '{temp_name}'")
+
+    source = router.get_collection(user_id)
+    target = router.client.create_collection(
+        name=temp_name, metadata=source.metadata or None, embedding_function=None
+    )
+    page_size = min(page_size, router.client.get_max_batch_size())
+
+    copied = 0
+    offset = 0
+    while True:
+        page = source.get(include=["embeddings", "documents", "metadatas"], limit=page_size, offset=offset)
+        if not page["ids"]:
+            break
+        target.add(
+            ids=page["ids"],
+            embeddings=page["embeddings"],
+            documents=page["documents"],
+            metadatas=page["metadatas"],
+        )
+        copied += len(page["ids"])
+        offset += len(page["ids"])
+
+    router.close(user_id)
+    router.client.delete_collection(name)
+    target.modify(name=name)
+
+    print(f"Compacted collection '{name}': {copied} live records kept")
+    return copied
+
+
+def vacuum_store(persist_directory: str = "./chroma_db_multi_user"):
+    """
+    Reclaims free pages in `chroma.sqlite3` after heavy churn.
+    Close every client using the directory first - VACUUM needs exclusive access.
+    """
+    db_path = os.path.join(persist_directory, "chroma.sqlite3")
+    size_before = os.path.getsize(db_path)
+
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+
+    size_after = os.path.getsize(db_path)
+    print(f"VACUUM {db_path}: {size_before / 1e6:.1f} MB -> {size_after / 1e6:.1f} MB")
@@ -0,0 +1,137 @@
+import hashlib
+import re
+from collections import OrderedDict
+from typing import Optional
+
+import chromadb
+from langchain_chroma import Chroma
+from langchain_core.embeddings import Embeddings
+
+# --- Tenant Routing (Per-Tenant / Per-Group Collections) ---
+#
+# Instead of one shared collection filtered by `user_id` at query time, every
+# tenant (or a fixed group of tenants) gets its own Chroma collection. A query
+# then only walks the HNSW graph of that tenant's data, so latency follows the
+# tenant's own corpus size instead of the global one.
+
+COLLECTION_PREFIX = "tenant"
+PERSIST_DIRECTORY = "./chroma_db_multi_user"
+
+
+class TenantRouter:
+    """
+    Routes each user_id to its own Chroma collection and keeps an LRU of open handles.
+
+    Args:
+        embeddings: Embedding model used by every tenant collection.
+        persist_directory: Directory of the shared persistent Chroma client.
+        num_groups: When None every tenant gets a dedicated collection. When set,
+            tenants are hashed into `num_groups` shared collections (useful for
+            many tiny tenants); the `user_id` filter is then still applied.
+        max_open_collections: Maximum number of collection handles kept open.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        persist_directory: str = PERSIST_DIRECTORY,
+        num_groups: Optional[int] = None,
+        max_open_collections: int = 16,
+        collection_prefix: str = COLLECTION_PREFIX,
+    ):
+        if num_groups is not None and num_groups < 1:
+            raise ValueError("num_groups must be a positive integer or None.")
+        if max_open_collections < 1:
+            raise ValueError("max_open_collections must be at least 1.")
+
+        self.embeddings = embeddings
+        self.persist_directory = persist_directory
+        self.num_groups = num_groups
+        self.max_open_collections = max_open_collections
+        self.collection_prefix = collection_prefix
+
+        # One client per process; collections are opened lazily on top of it
+        self.client = chromadb.PersistentClient(path=persist_directory)
+        self._open_stores: "OrderedDict[str, Chroma]" = OrderedDict()
+
+    # --- 1. Routing ---
+
+    @property
+    def is_grouped(self) -> bool:
+        return self.num_groups is not None
+
+    def collection_name_for(self, user_id: str) -> str:
+        """Returns the deterministic collection name that stores `user_id`'s chunks."""
+        digest = hashlib.sha1(user_id.encode("utf-8")).hexdigest()
+
+        if self.is_grouped:
+            group = int(digest, 16) % self.num_groups
+            return f"{self.collection_prefix}_group_{group:04d}"
+
+        # Chroma names allow [a-zA-Z0-9._-], 3-63 chars. The digest suffix keeps
+        # ids that only differ in stripped characters from colliding.
+        safe_id = re.sub(r"[^a-zA-Z0-9_-]", "_", user_id)[:40]
+        return f"{self.collection_prefix}_{safe_id}_{digest[:10]}"
+
+    # --- 2. Lazy Open / Close with LRU ---
+
+    def get_vector_store(self, user_id: str) -> Chroma:
+        """Returns the (lazily opened) vector store holding `user_id`'s data."""
+        name = self.collection_name_for(user_id)
+
+        store = self._open_stores.get(name)
+        if store is not None:
+            self._open_stores.move_to_end(name)
+            return store
+
+        store = Chroma(
+            client=self.client,
+            collection_name=name,
+            embedding_function=self.embeddings,
+        )
+        self._open_stores[name] = store
+
+        while len(self._open_stores) > self.max_open_collections:
+            evicted_name, _ = self._open_stores.popitem(last=False)
+            print(f"Closed idle collection handle: {evicted_name}")
+
+        return store
+
+    def get_collection(self, user_id: str):
+        """
+        Returns the raw Chroma collection for `user_id`. Used for bulk writes that
+        bring their own embeddings, bypassing the LangChain wrapper.
+        """
+        return self.client.get_or_create_collection(
+            name=self.collection_name_for(user_id),
+            embedding_function=None,
+        )
+
+    def close(self, user_id: str) -> None:
+        """Drops the open handle for `user_id`'s collection, if any."""
+        self._open_stores.pop(self.collection_name_for(user_id), None)
+
+    def close_all(self) -> None:
+        """Drops every open collection handle."""
+        self._open_stores.clear()
+
+    def open_collections(self) -> list:
+        """Names of the currently open collections, least recently used first."""
+        return list(self._open_stores.keys())
+
+    # --- 3. Retrieval ---
+
+    def search_kwargs_for(self, user_id: str, k: int = 3) -> dict:
+        """
+        Search kwargs for a tenant query. Grouped collections are shared, so the
+        `user_id` filter is still required there to keep tenants isolated.
+        """
+        search_kwargs = {"k": k}
+        if self.is_grouped:
+            search_kwargs["filter"] = {"user_id": user_id}
+        return search_kwargs
+
+    def as_retriever(self, user_id: str, k: int = 3):
+        """Returns a retriever scoped to `user_id`'s collection."""
+        store = self.get_vector_store(user_id)
+        return store.as_retriever(search_kwargs=self.search_kwargs_for(user_id, k=k))
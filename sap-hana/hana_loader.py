@@ -0,0 +1,67 @@
+import json
+import time
+from typing import Dict, List, Optional
+
+from langchain_core.documents import Document
+
+from hana_pool import HanaConnectionPool
+from hana_sql import build_insert_sql, format_vector
+
+# --- Bulk Vector Loader ---
+#
+# `HanaDB.from_documents` embeds and inserts with no control over batch size. The
+# loader below embeds in batches and writes with `executemany`, so a nightly reindex
+# costs one round-trip per batch instead of one per row.
+
+EMBED_BATCH_SIZE = 256
+INSERT_BATCH_SIZE = 2000
+
+
+def bulk_load_documents(
+    pool: HanaConnectionPool,
+    schema: str,
+    table_name: str,
+    documents: List[Document],
+    embedding_model,
+    embed_batch_size: int = EMBED_BATCH_SIZE,
+    insert_batch_size: int = INSERT_BATCH_SIZE,
+    metadata_columns: Optional[Dict[str, str]] = None,
+) -> int:
+    """
+    Embeds `documents` and inserts them into the vector table with large `executemany` batches.
+    Metadata keys listed in `metadata_columns` are also written to their typed columns.
+
+    Each insert batch is committed on its own, so a failure only rolls back the
+    batch in flight. Returns the number of rows inserted.
+    """
+    metadata_columns = metadata_columns or {}
+    sql = build_insert_sql(schema, table_name, metadata_columns)
+    inserted = 0
+    started = time.perf_counter()
+
+    with pool.connection() as connection:
+        cursor = connection.cursor()
+        try:
+            for batch_start in range(0, len(documents), insert_batch_size):
+                batch = documents[batch_start:batch_start + insert_batch_size]
+                texts = [doc.page_content for doc in batch]
+
+                vectors = []
+                for embed_start in range(0, len(texts), embed_batch_size):
+                    vectors.extend(embedding_model.embed_documents(texts[embed_start:embed_start + embed_batch_size]))
+
+                rows = [
+                    (doc.page_content, format_vector(vector), json.dumps(doc.metadata))
+                    + tuple(doc.metadata.get(key) for key in metadata_columns)
+                    for doc, vector in zip(batch, vectors)
+                ]
+                cursor.executemany(sql, rows)
+                connection.commit()
+
+                inserted += len(rows)
+                print(f"Inserted {inserted}/{len(documents)} rows "
+                      f"({time.perf_counter() - started:.1f}s elapsed)")
+        finally:
+            cursor.close()
+
+    return inserted
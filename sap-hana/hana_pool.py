@@ -0,0 +1,170 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, List, Tuple
+
+# --- HANA Connection Pool ---
+#
+# `setup_hana_connection` opens a single connection for the whole script. The pool
+# below hands out up to `max_size` DB-API connections to concurrent callers,
+# health-checks connections that sat idle, and replaces broken ones. It only relies
+# on the DB-API surface (cursor/execute/close), so any DB-API factory works:
+# `hdbcli.dbapi.connect` in production, the SQLite stand-in of test_hana_stand_in.py in tests.
+
+HEALTH_CHECK_SQL = "SELECT 1 FROM DUMMY"
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no connection becomes available within the acquire timeout."""
+
+
+class HanaConnectionPool:
+    """
+    Thread-safe pool of DB-API connections.
+
+    Args:
+        connect: Zero-argument factory returning a new DB-API connection.
+        max_size: Maximum number of connections open at the same time.
+        health_check_sql: Cheap statement used to validate idle connections.
+        idle_check_seconds: Connections idle for longer than this are health-checked
+            before being handed out.
+        acquire_timeout: Seconds to wait for a free connection before failing.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], object],
+        max_size: int = 5,
+        health_check_sql: str = HEALTH_CHECK_SQL,
+        idle_check_seconds: float = 30.0,
+        acquire_timeout: float = 30.0,
+    ):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1.")
+
+        self._connect = connect
+        self.max_size = max_size
+        self.health_check_sql = health_check_sql
+        self.idle_check_seconds = idle_check_seconds
+        self.acquire_timeout = acquire_timeout
+
+        self._idle: List[Tuple[object, float]] = []  # (connection, last released at)
+        self._open_count = 0
+        self._closed = False
+        self._cond = threading.Condition(threading.Lock())
+
+    # --- 1. Health Checks ---
+
+    def is_healthy(self, connection) -> bool:
+        """Runs the health check statement; any error marks the connection as broken."""
+        cursor = None
+        try:
+            cursor = connection.cursor()
+            cursor.execute(self.health_check_sql)
+            cursor.fetchall()
+            return True
+        except Exception:
+            return False
+        finally:
+            if cursor is not None:
+                try:
+                    cursor.close()
+                except Exception:
+                    pass
+
+    def _discard(self, connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._open_count -= 1
+            self._cond.notify()
+
+    # --- 2. Acquire / Release ---
+
+    def acquire(self, timeout: float = None):
+        """Returns a healthy connection, opening a new one if the pool is below max_size."""
+        timeout = self.acquire_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+
+        while True:
+            with self._cond:
+                if self._closed:
+                    raise RuntimeError("Connection pool is closed.")
+
+                while not self._idle and self._open_count >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolTimeoutError(
+                            f"No HANA connection available after {timeout:.1f}s (max_size={self.max_size})."
+                        )
+                    self._cond.wait(remaining)
+
+                if self._idle:
+                    # LIFO keeps a small set of connections warm
+                    connection, released_at = self._idle.pop()
+                else:
+                    connection, released_at = None, None
+                    self._open_count += 1
+
+            if connection is None:
+                try:
+                    return self._connect()
+                except Exception:
+                    with self._cond:
+                        self._open_count -= 1
+                        self._cond.notify()
+                    raise
+
+            if time.monotonic() - released_at < self.idle_check_seconds or self.is_healthy(connection):
+                return connection
+
+            print("Discarding broken HANA connection from pool.")
+            self._discard(connection)
+
+    def release(self, connection, broken: bool = False):
+        """Returns a connection to the pool (or closes it when `broken`)."""
+        if broken or self._closed:
+            self._discard(connection)
+            return
+        with self._cond:
+            self._idle.append((connection, time.monotonic()))
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self, timeout: float = None):
+        """
+        Context manager around acquire/release. The transaction is rolled back and the
+        connection health-checked if the block raises.
+        """
+        conn = self.acquire(timeout=timeout)
+        try:
+            yield conn
+        except Exception:
+            broken = False
+            try:
+                conn.rollback()
+            except Exception:
+                broken = True
+            self.release(conn, broken=broken or not self.is_healthy(conn))
+            raise
+        else:
+            self.release(conn)
+
+    def close_all(self):
+        """Closes idle connections and refuses new acquisitions."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for connection, _ in idle:
+            self._discard(connection)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "open": self._open_count,
+                "idle": len(self._idle),
+                "in_use": self._open_count - len(self._idle),
+                "max_size": self.max_size,
+            }
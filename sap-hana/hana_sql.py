@@ -0,0 +1,251 @@
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+# --- HANA Vector SQL (DDL, HNSW Index, Filtered KNN) ---
+#
+# Pure string builders for the vector table, its HNSW index and KNN queries, so the
+# generated SQL can be checked without a live HANA. Filterable metadata lives in
+# typed columns (e.g. SOURCE NVARCHAR(256)) instead of only in the METADATA NCLOB,
+# which lets metadata filters run as plain SQL predicates next to the vector search.
+
+SIMILARITY_FUNCTIONS = {
+    # similarity function -> ORDER BY direction (best match first)
+    "COSINE_SIMILARITY": "DESC",
+    "L2DISTANCE": "ASC",
+}
+
+FILTER_OPERATORS = {
+    "$eq": "=",
+    "$ne": "<>",
+    "$gt": ">",
+    "$gte": ">=",
+    "$lt": "<",
+    "$lte": "<=",
+}
+
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+_COLUMN_TYPE = re.compile(r"^[A-Z]+(\(\d+(,\s*\d+)?\))?$")
+
+
+def _quote(identifier: str) -> str:
+    if not _IDENTIFIER.match(identifier):
+        raise ValueError(f"Invalid SQL identifier: {identifier!r}")
+    return f'"{identifier}"'
+
+
+def _column_name(metadata_key: str) -> str:
+    """Typed metadata columns are the upper-cased metadata key, e.g. 'source' -> SOURCE."""
+    return metadata_key.upper()
+
+
+def _validate_metadata_columns(metadata_columns: Optional[Dict[str, str]]) -> Dict[str, str]:
+    metadata_columns = metadata_columns or {}
+    for key, column_type in metadata_columns.items():
+        _quote(_column_name(key))
+        if not _COLUMN_TYPE.match(column_type.upper()):
+            raise ValueError(f"Invalid column type for metadata key {key!r}: {column_type!r}")
+    return metadata_columns
+
+
+# --- 1. DDL ---
+
+def build_create_table_sql(schema: str, table_name: str, vector_dimension: int = 1536,
+                           metadata_columns: Optional[Dict[str, str]] = None) -> str:
+    """
+    CREATE TABLE for the vector table.
+
+    Args:
+        metadata_columns: Metadata keys promoted to typed columns, e.g.
+            {"source": "NVARCHAR(256)", "page": "INTEGER"}. The full metadata is still
+            kept in the METADATA NCLOB so HanaDB can read it back.
+    """
+    metadata_columns = _validate_metadata_columns(metadata_columns)
+    columns = [
+        "ID BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY",
+        "TEXT_CONTENT NCLOB",
+        f"VECTOR_EMBEDDING REAL_VECTOR({int(vector_dimension)})",
+        "METADATA NCLOB",
+    ]
+    columns += [
+        f"{_quote(_column_name(key))} {column_type.upper()}"
+        for key, column_type in metadata_columns.items()
+    ]
+    body = ",\n    ".join(columns)
+    return f"CREATE TABLE {_quote(schema)}.{_quote(table_name)} (\n    {body}\n)"
+
+
+def build_create_hnsw_index_sql(schema: str, table_name: str, index_name: Optional[str] = None,
+                                similarity_function: str = "COSINE_SIMILARITY",
+                                m: int = 64, ef_construction: int = 128, ef_search: int = 200,
+                                online: bool = True) -> str:
+    """
+    CREATE HNSW VECTOR INDEX on VECTOR_EMBEDDING.
+
+    `m` and `ef_construction` trade build time and memory for recall; `ef_search`
+    is the default candidate list size at query time (higher = better recall, slower).
+    """
+    if similarity_function not in SIMILARITY_FUNCTIONS:
+        raise ValueError(f"Unsupported similarity function: {similarity_function}")
+
+    index_name = index_name or f"{table_name}_HNSW_IDX"
+    build_config = json.dumps({"M": int(m), "efConstruction": int(ef_construction)})
+    search_config = json.dumps({"efSearch": int(ef_search)})
+
+    sql = (
+        f"CREATE HNSW VECTOR INDEX {_quote(index_name)} "
+        f"ON {_quote(schema)}.{_quote(table_name)} (VECTOR_EMBEDDING)\n"
+        f"SIMILARITY FUNCTION {similarity_function}\n"
+        f"BUILD CONFIGURATION '{build_config}'\n"
+        f"SEARCH CONFIGURATION '{search_config}'"
+    )
+    if online:
+        sql += "\nONLINE"
+    return sql
+
+
+# --- 2. DML ---
+
+def build_insert_sql(schema: str, table_name: str,
+                     metadata_columns: Optional[Dict[str, str]] = None) -> str:
+    """Parameterised INSERT: text, vector (as TO_REAL_VECTOR text), metadata JSON, typed columns."""
+    metadata_columns = _validate_metadata_columns(metadata_columns)
+    columns = ["TEXT_CONTENT", "VECTOR_EMBEDDING", "METADATA"]
+    columns += [_quote(_column_name(key)) for key in metadata_columns]
+    placeholders = ["?", "TO_REAL_VECTOR(?)", "?"] + ["?"] * len(metadata_columns)
+    return (
+        f"INSERT INTO {_quote(schema)}.{_quote(table_name)} ({', '.join(columns)}) "
+        f"VALUES ({', '.join(placeholders)})"
+    )
+
+
+def build_filter_clause(search_filter: Optional[Dict[str, Any]],
+                        metadata_columns: Optional[Dict[str, str]] = None) -> Tuple[str, List[Any]]:
+    """
+    Translates a metadata filter into a WHERE clause over the typed columns.
+
+    Supports {"key": value}, {"key": [v1, v2]} (IN) and
+    {"key": {"$gte": 1, "$lt": 5, "$in": [...]}}. Keys without a typed column raise
+    ValueError: filtering them would need the NCLOB and cannot use the index.
+    """
+    metadata_columns = _validate_metadata_columns(metadata_columns)
+    if not search_filter:
+        return "", []
+
+    predicates: List[str] = []
+    params: List[Any] = []
+    for key, condition in search_filter.items():
+        if key not in metadata_columns:
+            raise ValueError(
+                f"Cannot filter on metadata key {key!r}: it is not stored in a typed column. "
+                f"Filterable keys: {sorted(metadata_columns)}"
+            )
+        column = _quote(_column_name(key))
+
+        if isinstance(condition, dict):
+            operations = condition.items()
+        elif isinstance(condition, (list, tuple, set)):
+            operations = [("$in", condition)]
+        else:
+            operations = [("$eq", condition)]
+
+        for operator, value in operations:
+            if operator == "$in":
+                values = list(value)
+                if not values:
+                    raise ValueError(f"Empty $in list for metadata key {key!r}")
+                predicates.append(f"{column} IN ({', '.join('?' * len(values))})")
+                params.extend(values)
+            elif operator in FILTER_OPERATORS:
+                predicates.append(f"{column} {FILTER_OPERATORS[operator]} ?")
+                params.append(value)
+            else:
+                raise ValueError(f"Unsupported filter operator: {operator}")
+
+    return "WHERE " + " AND ".join(predicates), params
+
+
+def build_knn_query(schema: str, table_name: str, k: int = 2,
+                    search_filter: Optional[Dict[str, Any]] = None,
+                    metadata_columns: Optional[Dict[str, str]] = None,
+                    similarity_function: str = "COSINE_SIMILARITY") -> Tuple[str, List[Any]]:
+    """
+    Top-k vector search with metadata filters pushed into SQL.
+
+    Returns (sql, filter_params). The first placeholder is the query vector, so
+    execute with `[format_vector(query_vector)] + filter_params`.
+    """
+    if similarity_function not in SIMILARITY_FUNCTIONS:
+        raise ValueError(f"Unsupported similarity function: {similarity_function}")
+
+    where, params = build_filter_clause(search_filter, metadata_columns)
+    sql = (
+        f"SELECT TOP {int(k)} TEXT_CONTENT, METADATA, "
+        f"{similarity_function}(VECTOR_EMBEDDING, TO_REAL_VECTOR(?)) AS SCORE\n"
+        f"FROM {_quote(schema)}.{_quote(table_name)}\n"
+    )
+    if where:
+        sql += where + "\n"
+    sql += f"ORDER BY SCORE {SIMILARITY_FUNCTIONS[similarity_function]}"
+    return sql, params
+
+
+# --- 3. Query Execution ---
+
+def format_vector(vector: List[float]) -> str:
+    """Text form accepted by HANA's TO_REAL_VECTOR, e.g. '[0.1,0.2]'."""
+    return "[" + ",".join(repr(float(value)) for value in vector) + "]"
+
+
+def knn_search(connection, embedding_model, schema: str, table_name: str, query: str, k: int = 2,
+               search_filter: Optional[Dict[str, Any]] = None,
+               metadata_columns: Optional[Dict[str, str]] = None,
+               similarity_function: str = "COSINE_SIMILARITY") -> List[Document]:
+    """Embeds `query` and runs the filtered KNN query on `connection`."""
+    sql, params = build_knn_query(schema, table_name, k, search_filter, metadata_columns, similarity_function)
+    query_vector = format_vector(embedding_model.embed_query(query))
+
+    cursor = connection.cursor()
+    try:
+        cursor.execute(sql, [query_vector] + params)
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+
+    documents = []
+    for text, metadata, score in rows:
+        metadata = json.loads(metadata) if metadata else {}
+        metadata["score"] = score
+        documents.append(Document(page_content=text, metadata=metadata))
+    return documents
+
+
+class HanaKnnRetriever(BaseRetriever):
+    """Retriever running `knn_search` on a pooled connection (usable in create_retrieval_chain)."""
+
+    pool: Any
+    embedding_model: Any
+    schema_name: str
+    table_name: str
+    k: int = 2
+    search_filter: Optional[Dict[str, Any]] = None
+    metadata_columns: Optional[Dict[str, str]] = None
+    similarity_function: str = "COSINE_SIMILARITY"
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        with self.pool.connection() as connection:
+            return knn_search(
+                connection,
+                self.embedding_model,
+                self.schema_name,
+                self.table_name,
+                query,
+                k=self.k,
+                search_filter=self.search_filter,
+                metadata_columns=self.metadata_columns,
+                similarity_function=self.similarity_function,
+            )
@@ -26,6 +26,10 @@ except ImportError as e:
     # Exit gracefully if key dependencies are missing
     sys.exit(1)
 
+from hana_pool import HanaConnectionPool
+from hana_loader import bulk_load_documents
+from hana_sql import HanaKnnRetriever, build_create_hnsw_index_sql, build_create_table_sql
+
 
 # --- 2. Configuration (Reads from your .env or environment) ---
 
@@ -41,6 +45,12 @@ HANA_PASSWORD = os.environ.get("HANA_PASSWORD")
 HANA_SCHEMA = os.environ.get("HANA_SCHEMA", "RAG_SCHEMA")
 HANA_TABLE_NAME = "LANGCHAIN_DOCS"
 
+# Metadata keys stored in typed columns so filters can be pushed into SQL
+HANA_METADATA_COLUMNS = {"source": "NVARCHAR(256)"}
+
+# HNSW index parameters (build: M / efConstruction, search: efSearch)
+HANA_INDEX_PARAMS = {"m": 64, "ef_construction": 128, "ef_search": 200}
+
 if not all([HANA_HOST, HANA_PORT, HANA_USER, HANA_PASSWORD]):
     raise ValueError("One or more HANA credential environment variables (HANA_HOST, HANA_PORT, HANA_USER, HANA_PASSWORD) are not set.")
 
@@ -71,36 +81,31 @@ def setup_hana_connection():
         # Re-raise the exception to stop execution if connection fails
         raise
 
-def create_vector_table(connection, table_name, vector_dimension=1536):
-    """Creates the necessary vector table in the specified HANA schema."""
+def setup_hana_pool(max_size=5):
+    """Creates a pool of HANA connections, each using HANA_SCHEMA as its current schema."""
+    def connect():
+        conn = setup_hana_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute(f'SET SCHEMA "{HANA_SCHEMA}"')
+        finally:
+            cursor.close()
+        return conn
+
+    return HanaConnectionPool(connect, max_size=max_size)
+
+def _execute_ddl(connection, ddl_sql, object_label):
+    """Executes one DDL statement, treating 'already exists' as a warning."""
     cursor = None
     try:
         cursor = connection.cursor()
-        
-        # 1. Define the SQL DDL for the vector table
-        # We ensure the table is created in the specified schema
-        full_table_name = f'"{HANA_SCHEMA}"."{table_name}"'
-        
-        # The REAL_VECTOR data type is critical for the vector embedding column
-        ddl_sql = f"""
-        CREATE TABLE {full_table_name} (
-            ID BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
-            TEXT_CONTENT NCLOB,
-            VECTOR_EMBEDDING REAL_VECTOR({vector_dimension}),
-            METADATA NCLOB
-        );
-        """
-        
-        # 2. Execute the SQL
-        print(f"\n--- Creating Vector Table: {full_table_name} ---")
         cursor.execute(ddl_sql)
         connection.commit()
-        print("Vector table created successfully.")
-        
+        print(f"{object_label} created successfully.")
     except hana_db_api.Error as e:
-        # Catch common error if table already exists
-        if "already exists" in str(e):
-            print(f"Warning: Table {full_table_name} already exists. Skipping creation.")
+        # Catch common error if the object already exists
+        if "already exists" in str(e) or "duplicate" in str(e).lower():
+            print(f"Warning: {object_label} already exists. Skipping creation.")
         else:
             print(f"Error executing DDL: {e}")
             raise
@@ -108,10 +113,37 @@ def create_vector_table(connection, table_name, vector_dimension=1536):
         if cursor:
             cursor.close()
 
+def create_vector_table(connection, table_name, vector_dimension=1536, metadata_columns=None,
+                        create_index=False, index_params=None):
+    """
+    Creates the necessary vector table in the specified HANA schema.
+
+    Args:
+        metadata_columns: Metadata keys to store in typed columns, e.g. {"source": "NVARCHAR(256)"}.
+        create_index: Also create an HNSW vector index, so KNN searches stop being full scans.
+        index_params: HNSW tuning passed to build_create_hnsw_index_sql (m, ef_construction, ef_search).
+    """
+    # 1. Define the SQL DDL for the vector table
+    # The REAL_VECTOR data type is critical for the vector embedding column
+    full_table_name = f'"{HANA_SCHEMA}"."{table_name}"'
+    ddl_sql = build_create_table_sql(HANA_SCHEMA, table_name, vector_dimension, metadata_columns)
+
+    # 2. Execute the SQL
+    print(f"\n--- Creating Vector Table: {full_table_name} ---")
+    _execute_ddl(connection, ddl_sql, f"Vector table {full_table_name}")
+
+    # 3. Optional HNSW vector index
+    if create_index:
+        index_sql = build_create_hnsw_index_sql(HANA_SCHEMA, table_name, **(index_params or {}))
+        print(f"\n--- Creating HNSW Vector Index on {full_table_name} ---")
+        _execute_ddl(connection, index_sql, f"HNSW index on {full_table_name}")
 
-def load_and_index_data(documents: list[Document], table_name: str, connection, embedding_model):
+
+def load_and_index_data(documents: list[Document], table_name: str, pool: HanaConnectionPool,
+                        embedding_model, insert_batch_size=2000, metadata_columns=None):
     """
-    Splits documents, embeds them, and stores them in the SAP HANA Vector Store.
+    Splits documents, embeds them in batches, and bulk-inserts them into the vector table.
+    Returns the number of inserted rows.
     """
     print("\n--- Starting Data Indexing Process ---")
     
@@ -123,23 +155,50 @@ def load_and_index_data(documents: list[Document], table_name: str, connection,
     split_documents = text_splitter.split_documents(documents)
     print(f"Split {len(documents)} document(s) into {len(split_documents)} chunks.")
 
-    # 2. Create the HanaDB vector store and populate it
-    # This calls the HanaDB API to connect, embed, and insert data
-    vector_store = HanaDB.from_documents(
-        documents=split_documents,
-        embedding=embedding_model,
-        connection=connection,
+    # 2. Embed and insert with executemany batches (one round-trip per batch, not per row)
+    inserted = bulk_load_documents(
+        pool=pool,
+        schema=HANA_SCHEMA,
         table_name=table_name,
-        # Required to tell HanaDB which schema to use
-        schema=HANA_SCHEMA
+        documents=split_documents,
+        embedding_model=embedding_model,
+        insert_batch_size=insert_batch_size,
+        metadata_columns=metadata_columns
     )
     
     print("--- Data Indexing Complete ---")
-    return vector_store
+    return inserted
+
+def get_vector_store(connection, table_name: str, embedding_model):
+    """Wraps the existing vector table in a HanaDB store for retrieval."""
+    return HanaDB(
+        connection=connection,
+        embedding=embedding_model,
+        table_name=table_name,
+        content_column="TEXT_CONTENT",
+        metadata_column="METADATA",
+        vector_column="VECTOR_EMBEDDING"
+    )
+
+def get_knn_retriever(pool: HanaConnectionPool, table_name: str, embedding_model, k=2, search_filter=None):
+    """
+    Retriever that runs TOP-k vector search (served by the HNSW index) with metadata
+    filters pushed into SQL, e.g. search_filter={"source": "hana_rag_whitepaper.pdf"}.
+    """
+    return HanaKnnRetriever(
+        pool=pool,
+        embedding_model=embedding_model,
+        schema_name=HANA_SCHEMA,
+        table_name=table_name,
+        k=k,
+        search_filter=search_filter,
+        metadata_columns=HANA_METADATA_COLUMNS
+    )
 
-def run_rag_query(vector_store, query: str):
+def run_rag_query(vector_store, query: str, retriever=None):
     """
     Defines and executes the RAG chain.
+    Pass `retriever` (e.g. from get_knn_retriever) to bypass vector_store.as_retriever.
     """
     print(f"\n--- Running RAG Query: '{query}' ---")
     
@@ -163,7 +222,8 @@ def run_rag_query(vector_store, query: str):
 
     # 3. Define the Retriever
     # HanaDB.as_retriever() uses the underlying HANA vector search capabilities
-    retriever = vector_store.as_retriever(search_kwargs={"k": 2})
+    if retriever is None:
+        retriever = vector_store.as_retriever(search_kwargs={"k": 2})
 
     # 4. Create the main Retrieval Chain
     retrieval_chain = create_retrieval_chain(retriever, document_chain)
@@ -211,30 +271,43 @@ if __name__ == "__main__":
         ),
     ]
 
-    # 1. Connect to SAP HANA
-    hana_conn = setup_hana_connection()
+    # 1. Create the SAP HANA connection pool
+    hana_pool = setup_hana_pool(max_size=5)
 
     # 2. MANDATORY STEP: Create the vector table structure
-    # This is done using the direct DB connection before LangChain uses it for insertion
-    create_vector_table(
-        connection=hana_conn,
-        table_name=HANA_TABLE_NAME,
-        vector_dimension=1536
-    )
+    # This is done using the direct DB connection before LangChain uses it for retrieval
+    with hana_pool.connection() as hana_conn:
+        create_vector_table(
+            connection=hana_conn,
+            table_name=HANA_TABLE_NAME,
+            vector_dimension=1536,
+            metadata_columns=HANA_METADATA_COLUMNS,
+            create_index=True,
+            index_params=HANA_INDEX_PARAMS
+        )
 
     # 3. Index the data into SAP HANA
-    hana_vector_store = load_and_index_data(
+    load_and_index_data(
         documents=sample_documents,
         table_name=HANA_TABLE_NAME,
-        connection=hana_conn,
-        embedding_model=embeddings
+        pool=hana_pool,
+        embedding_model=embeddings,
+        metadata_columns=HANA_METADATA_COLUMNS
     )
     
     # 4. Run the RAG query
     user_query = "What is the key benefit of using the SAP HANA Vector Engine for RAG?"
-    run_rag_query(hana_vector_store, user_query)
+    with hana_pool.connection() as hana_conn:
+        hana_vector_store = get_vector_store(hana_conn, HANA_TABLE_NAME, embeddings)
+        run_rag_query(hana_vector_store, user_query)
+
+    # 5. Same query with the metadata filter pushed into SQL (TOP-k over the HNSW index)
+    knn_retriever = get_knn_retriever(
+        hana_pool, HANA_TABLE_NAME, embeddings, k=2,
+        search_filter={"source": "hana_rag_whitepaper.pdf"}
+    )
+    run_rag_query(None, user_query, retriever=knn_retriever)
     
-    # 5. Close the connection
-    if hana_conn:
-        hana_conn.close()
-        print("\nHANA Connection successfully closed.")
+    # 6. Close the pooled connections
+    hana_pool.close_all()
+    print("\nHANA connection pool successfully closed.")
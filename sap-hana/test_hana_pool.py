@@ -0,0 +1,114 @@
+import threading
+import time
+
+import pytest
+
+from hana_pool import HanaConnectionPool, PoolTimeoutError
+
+# Checkout timeout and health-check/reconnect behaviour of the pool, with fake DB-API
+# connections instead of a database:
+#   pytest test_hana_pool.py
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def execute(self, sql, parameters=()):
+        if self.connection.broken:
+            raise OSError("connection reset by peer")
+        self.connection.statements.append(sql)
+
+    def fetchall(self):
+        return [(1,)]
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    """Records its statements; once `broken`, every statement fails."""
+
+    def __init__(self):
+        self.broken = False
+        self.closed = False
+        self.statements = []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def rollback(self):
+        if self.broken:
+            raise OSError("connection reset by peer")
+
+    def close(self):
+        self.closed = True
+
+
+class FakeConnect:
+    """Connection factory keeping every connection it opened."""
+
+    def __init__(self):
+        self.opened = []
+
+    def __call__(self):
+        self.opened.append(FakeConnection())
+        return self.opened[-1]
+
+
+def test_acquire_times_out_when_pool_is_exhausted():
+    pool = HanaConnectionPool(FakeConnect(), max_size=1, acquire_timeout=0.1)
+    held = pool.acquire()
+
+    started = time.monotonic()
+    with pytest.raises(PoolTimeoutError):
+        pool.acquire()
+    assert time.monotonic() - started >= 0.1
+    assert pool.stats() == {"open": 1, "idle": 0, "in_use": 1, "max_size": 1}
+
+    pool.release(held)
+    assert pool.acquire(timeout=0.1) is held
+
+
+def test_waiting_acquire_gets_released_connection():
+    pool = HanaConnectionPool(FakeConnect(), max_size=1, acquire_timeout=5)
+    held = pool.acquire()
+    threading.Timer(0.05, pool.release, args=(held,)).start()
+    assert pool.acquire() is held
+
+
+def test_broken_idle_connection_is_replaced():
+    connect = FakeConnect()
+    pool = HanaConnectionPool(connect, max_size=1, idle_check_seconds=0)
+    with pool.connection() as first:
+        pass
+    first.broken = True
+
+    with pool.connection() as second:
+        assert second is not first
+    assert first.closed
+    assert len(connect.opened) == 2
+    assert pool.stats()["open"] == 1
+
+
+def test_healthy_idle_connection_is_checked_and_reused():
+    pool = HanaConnectionPool(FakeConnect(), idle_check_seconds=0)
+    with pool.connection() as first:
+        pass
+    with pool.connection() as second:
+        assert second is first
+    assert first.statements == ["SELECT 1 FROM DUMMY"]
+
+
+def test_connection_failing_inside_block_is_discarded():
+    connect = FakeConnect()
+    pool = HanaConnectionPool(connect, max_size=1)
+    with pytest.raises(OSError):
+        with pool.connection() as connection:
+            connection.broken = True
+            connection.cursor().execute("SELECT * FROM DOCS")
+    assert connection.closed
+    assert pool.stats()["open"] == 0
+
+    with pool.connection() as replacement:
+        assert replacement is not connection
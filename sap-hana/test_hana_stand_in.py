@@ -0,0 +1,190 @@
+import json
+import math
+import re
+import sqlite3
+from typing import List
+
+import pytest
+from langchain_core.documents import Document
+
+from hana_loader import bulk_load_documents
+from hana_pool import HanaConnectionPool
+from hana_sql import build_create_hnsw_index_sql, build_create_table_sql, build_knn_query, format_vector
+
+# Runs the pool, the bulk loader and the generated KNN/filter SQL against the SQLite
+# stand-in, so the statements are exercised without a live HANA:
+#   pytest test_hana_stand_in.py
+
+SCHEMA = "RAG_SCHEMA"
+TABLE = "DOCS"
+METADATA_COLUMNS = {"source": "NVARCHAR(256)", "page": "INTEGER"}
+
+
+# --- SQLite Stand-in ---
+#
+# SQLite does not parse HANA-only syntax, so the stand-in rewrites it before execution:
+# identity columns become SQLite rowid aliases, `SELECT TOP n` becomes `LIMIT n`, and
+# HNSW index DDL is accepted as a no-op (a full scan returns the exact top-k).
+# COSINE_SIMILARITY and L2DISTANCE are registered as functions over the text vectors.
+
+_IDENTITY_COLUMN = re.compile(r"\bBIGINT\s+GENERATED\s+BY\s+DEFAULT\s+AS\s+IDENTITY\b", re.IGNORECASE)
+_SELECT_TOP = re.compile(r"^\s*SELECT\s+TOP\s+(\d+)\s+", re.IGNORECASE)
+_CREATE_HNSW_INDEX = re.compile(r"^\s*CREATE\s+HNSW\s+VECTOR\s+INDEX\b", re.IGNORECASE)
+
+
+def translate_hana_sql(sql: str) -> str:
+    """Rewrites the HANA statements built in hana_sql.py into SQLite syntax."""
+    if _CREATE_HNSW_INDEX.match(sql):
+        return "SELECT 1"
+    sql = _IDENTITY_COLUMN.sub("INTEGER", sql)
+    top = _SELECT_TOP.match(sql)
+    if top:
+        sql = "SELECT " + sql[top.end():] + f" LIMIT {int(top.group(1))}"
+    return sql
+
+
+def _parse_vector(value) -> List[float]:
+    return json.loads(value) if isinstance(value, str) else list(value)
+
+
+def _cosine_similarity(a, b):
+    a, b = _parse_vector(a), _parse_vector(b)
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return sum(x * y for x, y in zip(a, b)) / norm if norm else 0.0
+
+
+def _l2_distance(a, b):
+    return math.sqrt(sum((x - y) ** 2 for x, y in zip(_parse_vector(a), _parse_vector(b))))
+
+
+class _StandInCursor(sqlite3.Cursor):
+    def execute(self, sql, parameters=()):
+        return super().execute(translate_hana_sql(sql), parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return super().executemany(translate_hana_sql(sql), seq_of_parameters)
+
+
+class _StandInConnection(sqlite3.Connection):
+    def cursor(self, factory=_StandInCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+def connect_sqlite_stand_in(schema: str = "RAG_SCHEMA", path: str = ":memory:"):
+    """
+    Returns a SQLite connection that accepts the statements used against HANA in this
+    project: `"SCHEMA"."TABLE"` names, `SELECT 1 FROM DUMMY`, the DDL, inserts and KNN
+    queries of hana_sql.py (translated by `translate_hana_sql`), `TO_REAL_VECTOR(?)`,
+    COSINE_SIMILARITY and L2DISTANCE. Vectors are stored as their text form. Pass a
+    file `path` to share data between pooled connections.
+    """
+    connection = sqlite3.connect(path, check_same_thread=False, factory=_StandInConnection)
+    schema_path = ":memory:" if path == ":memory:" else f"{path}.{schema}"
+    connection.execute(f"ATTACH DATABASE ? AS \"{schema}\"", (schema_path,))
+    connection.execute("CREATE TEMP TABLE DUMMY (DUMMY TEXT)")
+    connection.execute("INSERT INTO DUMMY VALUES ('X')")
+    connection.create_function("TO_REAL_VECTOR", 1, lambda value: value)
+    connection.create_function("COSINE_SIMILARITY", 2, _cosine_similarity)
+    connection.create_function("L2DISTANCE", 2, _l2_distance)
+    connection.commit()
+    return connection
+
+
+VECTORS = {
+    "apples are red": [1.0, 0.0, 0.0],
+    "bananas are yellow": [0.0, 1.0, 0.0],
+    "cherries are red too": [0.9, 0.1, 0.0],
+    "the sky is blue": [0.0, 0.0, 1.0],
+}
+
+
+class FakeEmbeddings:
+    """Fixed vectors per text; counts the embed_documents calls."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def embed_documents(self, texts):
+        self.calls += 1
+        return [VECTORS[text] for text in texts]
+
+    def embed_query(self, text):
+        return VECTORS[text]
+
+
+@pytest.fixture
+def pool(tmp_path):
+    path = str(tmp_path / "stand_in.sqlite3")
+    pool = HanaConnectionPool(lambda: connect_sqlite_stand_in(SCHEMA, path), max_size=2)
+    with pool.connection() as connection:
+        connection.execute(build_create_table_sql(SCHEMA, TABLE, 3, METADATA_COLUMNS))
+        connection.execute(build_create_hnsw_index_sql(SCHEMA, TABLE))
+        connection.commit()
+    yield pool
+    pool.close_all()
+
+
+def load(pool, embeddings):
+    documents = [
+        Document(page_content=text, metadata={"source": "fruit.pdf" if i < 3 else "sky.pdf", "page": i})
+        for i, text in enumerate(VECTORS)
+    ]
+    return bulk_load_documents(pool, SCHEMA, TABLE, documents, embeddings,
+                               embed_batch_size=2, insert_batch_size=3, metadata_columns=METADATA_COLUMNS)
+
+
+def run_knn(pool, query, k=2, search_filter=None, similarity_function="COSINE_SIMILARITY"):
+    sql, params = build_knn_query(SCHEMA, TABLE, k, search_filter, METADATA_COLUMNS, similarity_function)
+    with pool.connection() as connection:
+        cursor = connection.cursor()
+        cursor.execute(sql, [format_vector(VECTORS[query])] + params)
+        return cursor.fetchall()
+
+
+def test_bulk_load_inserts_every_document_in_batches(pool):
+    embeddings = FakeEmbeddings()
+    assert load(pool, embeddings) == 4
+    assert embeddings.calls == 3  # insert batches of 3 + 1, embedded 2 + 1 and 1
+
+    with pool.connection() as connection:
+        rows = connection.execute(f'SELECT ID, SOURCE, PAGE, METADATA FROM "{SCHEMA}"."{TABLE}" ORDER BY ID').fetchall()
+    assert [row[0] for row in rows] == [1, 2, 3, 4]  # identity column
+    assert rows[3][1:3] == ("sky.pdf", 3)
+    assert json.loads(rows[3][3]) == {"source": "sky.pdf", "page": 3}
+
+
+def test_knn_query_returns_top_k_by_similarity(pool):
+    load(pool, FakeEmbeddings())
+    rows = run_knn(pool, "apples are red", k=2)
+    assert [row[0] for row in rows] == ["apples are red", "cherries are red too"]
+    assert rows[0][2] == pytest.approx(1.0)
+
+    rows = run_knn(pool, "apples are red", k=1, similarity_function="L2DISTANCE")
+    assert rows[0][0] == "apples are red"
+    assert rows[0][2] == pytest.approx(0.0)
+
+
+def test_knn_query_applies_metadata_filters(pool):
+    load(pool, FakeEmbeddings())
+    rows = run_knn(pool, "apples are red", k=4, search_filter={"source": "sky.pdf"})
+    assert [row[0] for row in rows] == ["the sky is blue"]
+
+    rows = run_knn(pool, "apples are red", k=4, search_filter={"page": {"$gte": 1, "$lt": 3}})
+    assert [row[0] for row in rows] == ["cherries are red too", "bananas are yellow"]
+
+    rows = run_knn(pool, "apples are red", k=4, search_filter={"page": [0, 3]})
+    assert [row[0] for row in rows] == ["apples are red", "the sky is blue"]
+
+
+def test_pool_reuses_connections(pool):
+    with pool.connection() as first:
+        pass
+    with pool.connection() as second:
+        assert second is first
+    assert pool.stats()["open"] == 1
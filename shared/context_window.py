@@ -0,0 +1,162 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+from langchain_core.messages.utils import count_tokens_approximately
+
+# Pre-model hook for the model nodes of the agent graphs (chatbots, ReAct/RAG agents).
+#
+# The graphs keep every message in state, so without this each model call would
+# resend all earlier tool outputs (e.g. full retrieved chunks) and turns. The hook
+# only changes what is *sent* to the model, never the state itself:
+#   1. ToolMessages from older tool-call rounds are cut down to a short preview.
+#   2. If the prompt is still over `max_tokens`, the oldest turns and tool rounds are
+#      replaced by a summary (when an llm is given) or dropped.
+# Usage inside a model node:  llm.invoke(prepare_model_input(messages, llm=llm))
+
+MAX_CONTEXT_TOKENS = 4000
+KEEP_TOOL_ROUNDS = 1  # tool-call rounds whose outputs are sent in full
+STALE_TOOL_CHARS = 300  # preview length for older tool outputs
+SUMMARY_CACHE_SIZE = 128
+
+_summary_cache = OrderedDict()  # hash of a message prefix -> summary of that prefix
+_summary_cache_lock = threading.Lock()  # graphs run nodes of many sessions in parallel
+
+
+def compress_stale_tool_messages(messages, keep_tool_rounds=KEEP_TOOL_ROUNDS, max_chars=STALE_TOOL_CHARS):
+    """Shortens ToolMessages answering all but the last `keep_tool_rounds` tool-call rounds.
+
+    The messages themselves are kept: models reject tool calls without their results."""
+    rounds = [i for i, message in enumerate(messages) if isinstance(message, AIMessage) and message.tool_calls]
+    if keep_tool_rounds <= 0:
+        fresh_from = len(messages)
+    elif len(rounds) > keep_tool_rounds:
+        fresh_from = rounds[-keep_tool_rounds]
+    else:
+        return list(messages)
+
+    compressed = []
+    for i, message in enumerate(messages):
+        if (i < fresh_from and isinstance(message, ToolMessage)
+                and isinstance(message.content, str) and len(message.content) > max_chars):
+            removed = len(message.content) - max_chars
+            message = message.model_copy(update={
+                "content": message.content[:max_chars] + f"\n... [{removed} characters of earlier tool output removed]"
+            })
+        compressed.append(message)
+    return compressed
+
+
+def _starts_window(message):
+    """A window may start at a user turn or at an AI message making tool calls."""
+    return isinstance(message, HumanMessage) or (isinstance(message, AIMessage) and bool(message.tool_calls))
+
+
+def split_live_window(messages, keep_tokens):
+    """Returns (old, recent): recent is the newest messages that fit in keep_tokens.
+
+    The window starts at a HumanMessage or at an AIMessage making tool calls, so a tool
+    result is never separated from the call that requested it. In a long tool loop of
+    one question the window therefore moves past old tool rounds. When it starts at a
+    tool call, the HumanMessage that opened the turn is pinned in front of it: the model
+    keeps seeing the question, and some models (e.g. Gemini) reject a conversation that
+    starts with an AI turn. At least the last turn or tool round is always kept."""
+    tokens = [count_tokens_approximately([message]) for message in messages]
+    starts = [i for i, message in enumerate(messages) if _starts_window(message)]
+    if not starts:
+        return [], list(messages)
+
+    def question_for(start):
+        """Index of the HumanMessage pinned in front of a window starting at `start`."""
+        if isinstance(messages[start], HumanMessage):
+            return None
+        return next((i for i in range(start - 1, -1, -1) if isinstance(messages[i], HumanMessage)), None)
+
+    def window_tokens(start):
+        question = question_for(start)
+        return sum(tokens[start:]) + (tokens[question] if question is not None else 0)
+
+    start = starts[-1]
+    for candidate in reversed(starts[:-1]):
+        if window_tokens(candidate) > keep_tokens:
+            break
+        start = candidate
+
+    question = question_for(start)
+    if question is None:
+        return list(messages[:start]), list(messages[start:])
+    old = list(messages[:question]) + list(messages[question + 1:start])
+    return old, [messages[question]] + list(messages[start:])
+
+
+def _prefix_hashes(messages):
+    """Running hash of every prefix, so a summary can be extended instead of redone."""
+    digest = hashlib.sha1()
+    hashes = []
+    for message in messages:
+        digest.update(f"{message.type}\x1f{message.content}\x1e".encode("utf-8"))
+        hashes.append(digest.hexdigest())
+    return hashes
+
+
+def summarize_messages(llm, messages):
+    """Summary of `messages`, reusing the cached summary of the longest known prefix."""
+    hashes = _prefix_hashes(messages)
+    with _summary_cache_lock:
+        if hashes[-1] in _summary_cache:
+            _summary_cache.move_to_end(hashes[-1])
+            return _summary_cache[hashes[-1]]
+
+        previous, new_from = "", 0
+        for i in range(len(hashes) - 2, -1, -1):
+            if hashes[i] in _summary_cache:
+                previous, new_from = _summary_cache[hashes[i]], i + 1
+                break
+
+    transcript = "\n".join(f"{message.type.upper()}: {message.content}" for message in messages[new_from:])
+    instruction = (
+        f"This is the summary of the conversation so far:\n{previous}\n\n"
+        f"Extend it with these new messages:\n{transcript}\n\n"
+        if previous else
+        f"Summarize this conversation:\n{transcript}\n\n"
+    ) + "Keep facts, names, decisions and key tool results. Be concise."
+    summary = llm.invoke([HumanMessage(content=instruction)]).content
+
+    # The model call runs unlocked; only the cache update is serialized
+    with _summary_cache_lock:
+        _summary_cache[hashes[-1]] = summary
+        if len(_summary_cache) > SUMMARY_CACHE_SIZE:
+            _summary_cache.popitem(last=False)
+    return summary
+
+
+def prepare_model_input(messages, llm=None, max_tokens=MAX_CONTEXT_TOKENS,
+                        keep_tool_rounds=KEEP_TOOL_ROUNDS, stale_tool_chars=STALE_TOOL_CHARS):
+    """Pre-model hook: the messages to send to the model, bounded by `max_tokens`.
+
+    Leading SystemMessages are always kept (merged with the summary into one)."""
+    messages = list(messages)
+    system = []
+    while messages and isinstance(messages[0], SystemMessage):
+        system.append(messages.pop(0))
+
+    messages = compress_stale_tool_messages(messages, keep_tool_rounds, stale_tool_chars)
+    system_tokens = count_tokens_approximately(system)
+    if system_tokens + count_tokens_approximately(messages) <= max_tokens:
+        return system + messages
+
+    # Half the budget stays verbatim, the rest is room for the summary
+    old, recent = split_live_window(messages, max(max_tokens - system_tokens, 0) // 2)
+    if llm is not None and old:
+        summary = summarize_messages(llm, old)
+        # The summary only gets what the system prompt and the live window leave of the budget
+        while summary:
+            note = SystemMessage(content=f"Summary of the earlier conversation:\n{summary}")
+            excess = count_tokens_approximately(system + [note] + recent) - max_tokens
+            if excess <= 0:
+                system.append(note)
+                break
+            summary = summary[:len(summary) - excess * 4 - 4].rstrip()
+    if len(system) > 1:
+        system = [SystemMessage(content="\n\n".join(message.content for message in system))]
+    return system + recent
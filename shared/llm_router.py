@@ -0,0 +1,326 @@
+import asyncio
+import contextvars
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, List
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+# Latency-aware routing over several chat models.
+#
+# RouterChatModel is a regular LangChain chat model (usable with invoke, `prompt | llm`,
+# bind_tools and LangGraph streaming). Each call goes to the fastest healthy provider
+# that has the required capability tag, ranked by its rolling p50 latency:
+#   * a provider with too many recent errors, or one that was just rate limited, is
+#     skipped until its cooldown ends (and is only used as a last resort);
+#   * a failed call falls back to the next provider;
+#   * if the chosen provider is slower than its own p95, the same request is hedged to
+#     the next provider and whichever answers first wins.
+# FakeChatModel providers make the routing testable without any API key.
+
+LATENCY_WINDOW = 50  # calls kept per provider for p50/p95 and error rate
+MIN_SAMPLES = 5  # calls needed before a provider's p95 is trusted for hedging
+MAX_ERROR_RATE = 0.5
+RATE_LIMIT_COOLDOWN = 30.0  # seconds a rate-limited provider is skipped
+ERROR_COOLDOWN = 10.0  # seconds an unhealthy provider is skipped
+MIN_HEDGE_DELAY = 0.25  # never hedge earlier than this many seconds
+
+_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="llm-router")
+
+
+def is_rate_limit_error(error):
+    status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    text = f"{type(error).__name__} {error}".lower()
+    return status == 429 or "ratelimit" in text or "rate limit" in text or "resource_exhausted" in text
+
+
+class ModelStats:
+    """Rolling latency and error statistics of one provider (thread-safe)."""
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self.calls = deque(maxlen=window)  # (latency in seconds, ok)
+        self.cooldown_until = 0.0
+        self.lock = threading.Lock()
+
+    def record(self, latency, ok, error=None):
+        with self.lock:
+            self.calls.append((latency, ok))
+            if error is not None and is_rate_limit_error(error):
+                self.cooldown_until = time.monotonic() + RATE_LIMIT_COOLDOWN
+            elif not ok and len(self.calls) >= MIN_SAMPLES and self._error_rate() > MAX_ERROR_RATE:
+                self.cooldown_until = time.monotonic() + ERROR_COOLDOWN
+
+    def _error_rate(self):
+        return sum(1 for _, ok in self.calls if not ok) / len(self.calls) if self.calls else 0.0
+
+    def _percentile(self, q):
+        latencies = sorted(latency for latency, ok in self.calls if ok)
+        if not latencies:
+            return None
+        return latencies[min(int(q * len(latencies)), len(latencies) - 1)]
+
+    def healthy(self):
+        with self.lock:
+            return time.monotonic() >= self.cooldown_until
+
+    def p50(self):
+        with self.lock:
+            return self._percentile(0.5)
+
+    def hedge_delay(self):
+        """Seconds to wait before hedging, or None while there are too few samples."""
+        with self.lock:
+            if sum(1 for _, ok in self.calls if ok) < MIN_SAMPLES:
+                return None
+            return max(self._percentile(0.95), MIN_HEDGE_DELAY)
+
+    def snapshot(self):
+        with self.lock:
+            p50, p95 = self._percentile(0.5), self._percentile(0.95)
+            return {
+                "calls": len(self.calls),
+                "p50_ms": round(p50 * 1000) if p50 is not None else None,
+                "p95_ms": round(p95 * 1000) if p95 is not None else None,
+                "error_rate": round(self._error_rate(), 3),
+                "cooling_down": time.monotonic() < self.cooldown_until,
+            }
+
+
+class Provider:
+    """A chat model the router can use, with its capability tags and statistics."""
+
+    def __init__(self, name, model, capabilities=("chat",), stats=None):
+        self.name = name
+        self.model = model
+        self.capabilities = frozenset(capabilities)
+        self.stats = stats or ModelStats()
+
+    def with_model(self, model):
+        # Bound variants (bind_tools, ...) share the statistics of the underlying model
+        return Provider(self.name, model, self.capabilities, self.stats)
+
+
+class FakeChatModel(BaseChatModel):
+    """Offline provider: answers after a random latency and fails at `error_rate`."""
+
+    name: str = "fake"
+    latency: tuple = (0.05, 0.2)  # uniform range in seconds
+    error_rate: float = 0.0
+    rate_limited: bool = False
+    response: str = "Fake answer"
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def _answer(self, messages):
+        if self.rate_limited:
+            raise RuntimeError(f"{self.name}: 429 rate limit exceeded")
+        if random.random() < self.error_rate:
+            raise RuntimeError(f"{self.name}: provider error")
+        last = messages[-1].content if messages else ""
+        return AIMessage(content=f"[{self.name}] {self.response}: {str(last)[:80]}")
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        time.sleep(random.uniform(*self.latency))
+        return ChatResult(generations=[ChatGeneration(message=self._answer(messages))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        await asyncio.sleep(random.uniform(*self.latency))
+        return ChatResult(generations=[ChatGeneration(message=self._answer(messages))])
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+
+class RouterChatModel(BaseChatModel):
+    """Chat model that routes every call to the fastest healthy provider (see module notes)."""
+
+    providers: List[Any]
+    capability: str = "chat"
+    hedge: bool = True
+
+    @property
+    def _llm_type(self) -> str:
+        return "router"
+
+    @property
+    def model_name(self) -> str:
+        return "router[" + ",".join(provider.name for provider in self.providers) + "]"
+
+    def ranked_providers(self, capability=None):
+        """Providers with the capability: healthy ones by p50 (unmeasured first), then the rest."""
+        capability = capability or self.capability
+        candidates = [provider for provider in self.providers if capability in provider.capabilities]
+        if not candidates:
+            raise ValueError(f"No provider has the capability '{capability}'")
+
+        def speed(provider):
+            p50 = provider.stats.p50()
+            return -1.0 if p50 is None else p50
+
+        healthy = sorted((p for p in candidates if p.stats.healthy()), key=speed)
+        cooling = sorted((p for p in candidates if not p.stats.healthy()), key=lambda p: p.stats.cooldown_until)
+        return healthy + cooling
+
+    def _call(self, provider, messages, stop, **kwargs):
+        started = time.perf_counter()
+        try:
+            message = provider.model.invoke(messages, stop=stop, **kwargs)
+        except Exception as e:
+            provider.stats.record(time.perf_counter() - started, False, e)
+            raise
+        provider.stats.record(time.perf_counter() - started, True)
+        return message
+
+    async def _acall(self, provider, messages, stop, **kwargs):
+        started = time.perf_counter()
+        try:
+            message = await provider.model.ainvoke(messages, stop=stop, **kwargs)
+        except Exception as e:
+            provider.stats.record(time.perf_counter() - started, False, e)
+            raise
+        provider.stats.record(time.perf_counter() - started, True)
+        return message
+
+    @staticmethod
+    def _result(provider, message, hedged):
+        message.response_metadata = {**message.response_metadata, "router_provider": provider.name, "hedged": hedged}
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        queue = self.ranked_providers()
+        pending = {}
+        errors = []
+
+        def start_next():
+            provider = queue.pop(0)
+            # A fresh context: inner calls must not report to the caller's callbacks
+            # (LangGraph would stream hedged duplicates); the router reports the result
+            future = _executor.submit(contextvars.Context().run, self._call, provider, messages, stop, **kwargs)
+            pending[future] = provider
+
+        start_next()
+        while pending:
+            delay = next(iter(pending.values())).stats.hedge_delay() if len(pending) == 1 else None
+            timeout = delay if self.hedge and queue and delay is not None else None
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                print(f"Router: hedging to {queue[0].name} after {timeout:.2f}s")
+                start_next()
+                continue
+            for future in done:
+                provider = pending.pop(future)
+                try:
+                    return self._result(provider, future.result(), hedged=len(pending) > 0)
+                except Exception as e:
+                    print(f"Router: {provider.name} failed ({e})")
+                    errors.append(f"{provider.name}: {e}")
+            if not pending and queue:
+                start_next()
+        raise RuntimeError("All providers failed: " + "; ".join(errors))
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        queue = self.ranked_providers()
+        pending = {}
+        errors = []
+
+        def start_next():
+            provider = queue.pop(0)
+            task = asyncio.get_running_loop().create_task(
+                self._acall(provider, messages, stop, **kwargs), context=contextvars.Context()
+            )
+            pending[task] = provider
+
+        start_next()
+        try:
+            while pending:
+                delay = next(iter(pending.values())).stats.hedge_delay() if len(pending) == 1 else None
+                timeout = delay if self.hedge and queue and delay is not None else None
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    print(f"Router: hedging to {queue[0].name} after {timeout:.2f}s")
+                    start_next()
+                    continue
+                for task in done:
+                    provider = pending.pop(task)
+                    try:
+                        return self._result(provider, task.result(), hedged=len(pending) > 0)
+                    except Exception as e:
+                        print(f"Router: {provider.name} failed ({e})")
+                        errors.append(f"{provider.name}: {e}")
+                if not pending and queue:
+                    start_next()
+        finally:
+            for task in pending:
+                task.cancel()
+        raise RuntimeError("All providers failed: " + "; ".join(errors))
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        # Streams from the best provider; falls back only if it fails before the first token
+        errors = []
+        for provider in self.ranked_providers():
+            started = time.perf_counter()
+            streamed = False
+            try:
+                for chunk in provider.model.stream(messages, stop=stop, **kwargs):
+                    streamed = True
+                    if run_manager and chunk.content:
+                        run_manager.on_llm_new_token(chunk.content)
+                    yield ChatGenerationChunk(message=chunk if isinstance(chunk, AIMessageChunk) else AIMessageChunk(content=chunk.content))
+            except Exception as e:
+                provider.stats.record(time.perf_counter() - started, False, e)
+                if streamed:
+                    raise
+                errors.append(f"{provider.name}: {e}")
+                continue
+            provider.stats.record(time.perf_counter() - started, True)
+            return
+        raise RuntimeError("All providers failed: " + "; ".join(errors))
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        errors = []
+        for provider in self.ranked_providers():
+            started = time.perf_counter()
+            streamed = False
+            try:
+                async for chunk in provider.model.astream(messages, stop=stop, **kwargs):
+                    streamed = True
+                    if run_manager and chunk.content:
+                        await run_manager.on_llm_new_token(chunk.content)
+                    yield ChatGenerationChunk(message=chunk if isinstance(chunk, AIMessageChunk) else AIMessageChunk(content=chunk.content))
+            except Exception as e:
+                provider.stats.record(time.perf_counter() - started, False, e)
+                if streamed:
+                    raise
+                errors.append(f"{provider.name}: {e}")
+                continue
+            provider.stats.record(time.perf_counter() - started, True)
+            return
+        raise RuntimeError("All providers failed: " + "; ".join(errors))
+
+    def _with_models(self, transform, capability):
+        return RouterChatModel(
+            providers=[provider.with_model(transform(provider.model)) for provider in self.providers
+                       if capability in provider.capabilities],
+            capability=capability,
+            hedge=self.hedge,
+        )
+
+    def bind_tools(self, tools, **kwargs):
+        """Router over the tool-capable providers, each with the tools bound."""
+        return self._with_models(lambda model: model.bind_tools(tools, **kwargs), "tools")
+
+    def with_structured_output(self, schema, **kwargs):
+        """Structured output from the first healthy provider able to produce it, with fallbacks."""
+        ranked = [provider for provider in self.ranked_providers("structured_output")]
+        runnables = [provider.model.with_structured_output(schema, **kwargs) for provider in ranked]
+        return runnables[0].with_fallbacks(runnables[1:]) if len(runnables) > 1 else runnables[0]
+
+    def stats_report(self):
+        return {provider.name: provider.stats.snapshot() for provider in self.providers}
@@ -0,0 +1,67 @@
+import os
+import sys
+
+# Single source for the helper modules several projects use.
+#
+# Each project runs on its own (its own requirements, started from its own folder), so
+# it imports a local copy of these modules. The copies are generated from the files in
+# this folder and must not be edited by hand:
+#   python shared/sync_shared.py           # rewrite every copy from its source
+#   python shared/sync_shared.py --check   # exit 1 if a copy differs from its source
+
+SHARED_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(SHARED_DIR)
+
+COPIES = {
+    "llm_cache.py": [
+        "langgraph-agentic-rag/llm_cache.py",
+        "agenticRAG/llm_cache.py",
+        "aamir-chatbot-notebook-main/aamir-chatbot-notebook-main/llm_cache.py",
+    ],
+    "llm_router.py": [
+        "AIChatBot/src/langgraphagenticai/LLMS/llm_router.py",
+        "aamir-chatbot-notebook-main/aamir-chatbot-notebook-main/llm_router.py",
+    ],
+    "context_window.py": [
+        "AIChatBot/src/langgraphagenticai/nodes/context_window.py",
+        "langgraph-agentic-rag/context_window.py",
+        "LangGraph-Course-freeCodeCamp-main/LangGraph-Course-freeCodeCamp-main/Agents/context_window.py",
+    ],
+}
+
+HEADER = "# Generated from shared/{source} by shared/sync_shared.py - edit the source, not this copy.\n"
+
+
+def render(source):
+    with open(os.path.join(SHARED_DIR, source), "r", encoding="utf-8") as f:
+        return HEADER.format(source=source) + f.read()
+
+
+def sync(check=False):
+    """Writes every copy (or, with `check`, lists the copies that are out of date)."""
+    stale = []
+    for source, targets in COPIES.items():
+        content = render(source)
+        for target in targets:
+            path = os.path.join(REPO_ROOT, target)
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    current = f.read()
+            except FileNotFoundError:
+                current = None
+            if current == content:
+                continue
+            stale.append(target)
+            if not check:
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(content)
+    return stale
+
+
+if __name__ == "__main__":
+    check = "--check" in sys.argv[1:]
+    stale = sync(check=check)
+    if check and stale:
+        print("Out of date (run python shared/sync_shared.py):\n  " + "\n  ".join(stale))
+        sys.exit(1)
+    print(f"{len(stale)} copies {'out of date' if check else 'updated'}")
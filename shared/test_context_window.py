@@ -0,0 +1,88 @@
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+from langchain_core.messages.utils import count_tokens_approximately
+
+import context_window
+from context_window import prepare_model_input, split_live_window
+
+# The prompt sent to the model must stay within max_tokens however many tool rounds
+# the agent loop has run:  pytest shared/test_context_window.py
+
+MAX_TOKENS = 4000
+
+
+class FakeLLM:
+    """Summarizer stand-in returning a summary of `length` characters."""
+
+    def __init__(self, length=400):
+        self.length = length
+        self.calls = 0
+
+    def invoke(self, messages):
+        self.calls += 1
+        return AIMessage(content="s" * self.length)
+
+
+def tool_loop(rounds, output_chars=1500):
+    """One question answered through `rounds` tool calls, as in ReAct.py / RAG_Agent.py."""
+    messages = [SystemMessage(content="You are a research agent."), HumanMessage(content="What changed in Q3?")]
+    for i in range(rounds):
+        messages.append(AIMessage(content="", tool_calls=[{"name": "retriever_tool", "args": {"query": f"q{i}"}, "id": f"call_{i}"}]))
+        messages.append(ToolMessage(content=f"chunk {i} " + "x" * output_chars, tool_call_id=f"call_{i}"))
+    return messages
+
+
+def chat(turns):
+    messages = []
+    for i in range(turns):
+        messages.append(HumanMessage(content=f"question {i} " + "q" * 400))
+        messages.append(AIMessage(content=f"answer {i} " + "a" * 800))
+    return messages
+
+
+def assert_well_formed(output):
+    body = [message for message in output if not isinstance(message, SystemMessage)]
+    assert isinstance(body[0], HumanMessage)
+    # Every tool result is sent together with the call that requested it
+    call_ids = {call["id"] for message in body if isinstance(message, AIMessage) for call in message.tool_calls}
+    assert all(message.tool_call_id in call_ids for message in body if isinstance(message, ToolMessage))
+
+
+@pytest.fixture(autouse=True)
+def clear_summary_cache():
+    context_window._summary_cache.clear()
+
+
+@pytest.mark.parametrize("llm", [None, FakeLLM(), FakeLLM(length=50000)], ids=["drop", "summary", "long-summary"])
+def test_tool_loop_stays_within_budget(llm):
+    sizes = []
+    for rounds in (5, 20, 40, 60):
+        output = prepare_model_input(tool_loop(rounds), llm=llm, max_tokens=MAX_TOKENS)
+        sizes.append(count_tokens_approximately(output))
+        assert sizes[-1] <= MAX_TOKENS, (rounds, sizes)
+        assert_well_formed(output)
+        assert output[1].content == "What changed in Q3?"  # the question stays in view
+    # The prompt stops growing with the loop count
+    assert sizes[-1] <= sizes[-2] + 100, sizes
+
+
+def test_chat_stays_within_budget():
+    for turns in (5, 50, 200):
+        output = prepare_model_input(chat(turns), llm=FakeLLM(), max_tokens=MAX_TOKENS)
+        assert count_tokens_approximately(output) <= MAX_TOKENS
+        assert_well_formed(output)
+        assert output[-1].content.startswith(f"answer {turns - 1}")
+
+
+def test_window_pins_the_question_before_a_tool_round():
+    messages = tool_loop(10)[1:]
+    old, recent = split_live_window(messages, 1000)
+    assert recent[0] is messages[0]
+    assert isinstance(recent[1], AIMessage) and recent[1].tool_calls
+    assert messages[0] not in old
+    assert len(old) + len(recent) == len(messages)
+
+
+def test_short_prompt_is_unchanged():
+    messages = tool_loop(1)
+    assert prepare_model_input(messages, max_tokens=MAX_TOKENS) == messages